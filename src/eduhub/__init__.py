@@ -0,0 +1,5 @@
+"""EduHub MongoDB toolkit.
+
+Reusable building blocks for the EduHub e-learning database that sit next to
+the walkthrough script in ``src/eduhub_queries.py``.
+"""
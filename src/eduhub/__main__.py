@@ -0,0 +1,28 @@
+"""``python -m eduhub <command>``: setup, seed, queries and bench entry points."""
+
+import importlib
+import sys
+
+COMMANDS = {
+    "setup": ("eduhub.setup_db", "create collections, validators and indexes"),
+    "seed": ("eduhub.seed", "load the sample or a generated dataset"),
+    "queries": ("eduhub.queries", "run the Part 3-4 queries"),
+    "bench": ("eduhub.benchmark", "benchmark the queries"),
+    "load": ("eduhub.loadtest", "concurrent load test of the write and read paths"),
+}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS:
+        print("usage: python -m eduhub {%s} [options]\n" % ",".join(COMMANDS))
+        for name, (_, help_text) in COMMANDS.items():
+            print(f"  {name:<8} {help_text}")
+        return 2
+    module = importlib.import_module(COMMANDS[argv[0]][0])
+    sys.argv[0] = f"python -m eduhub {argv[0]}"
+    return module.main(argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+"""Learner-activity events stored with the bucket pattern.
+
+An enrollment only keeps the latest ``progress``; the individual lesson
+views, completions and submissions behind it are lost, and trend queries
+can only use ``enrollDate``.  Storing one document per event would work
+but grows the index and the working set with every click.  Instead events
+go into ``activity_buckets``, one document per student, course and day,
+holding up to ``MAX_EVENTS`` events plus running aggregates::
+
+    {"studentId": "u001", "courseId": "c001", "bucketStart": 2025-06-02T00:00,
+     "count": 3, "first": ..., "last": ...,
+     "events": [{"t": ..., "type": "lesson_viewed", "lessonId": "l001", "seconds": 540}, ...],
+     "stats": {"byType": {"lesson_viewed": 2, "assignment_submitted": 1},
+               "seconds": 1260, "maxProgress": 35.0, "lessons": ["l001", "l002"]}}
+
+``ActivityWriter`` buffers events and turns each flush into one unordered
+``bulk_write`` with a single ``UpdateOne`` per bucket (``$push`` with
+``$each`` plus ``$inc``/``$min``/``$max``/``$addToSet`` on the aggregates).
+The update only matches a bucket with room left and upserts otherwise, so a
+busy day spills into further documents for the same key.
+
+Trend queries (``daily_activity``, ``engagement``) group the ``stats`` of
+the buckets and never unwind ``events``.
+
+A time-series collection (MongoDB 5.0+) would bucket internally, but it
+cannot keep per-bucket aggregates.  It also limits updates and deletes,
+and sorted reads by student and course would need secondary indexes on the
+meta field.
+
+``counters.submit`` and ``counters.set_progress`` record
+``assignment_submitted`` and ``progress`` events as they write (switch off
+with ``EDUHUB_RECORD_ACTIVITY=0``).  Lesson views come from the front end
+through an ``ActivityWriter``.
+
+Usage::
+
+    python -m eduhub.activity simulate --events 200000
+    python -m eduhub.activity daily --course c001 --days 30
+"""
+
+import argparse
+import random
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from pymongo import UpdateOne
+
+from eduhub import connection
+from eduhub.workload import IndexSpec
+
+BUCKETS = "activity_buckets"
+BUCKET_SPAN = timedelta(days=1)
+MAX_EVENTS = 200
+EVENT_TYPES = {"lesson_viewed", "lesson_completed", "assignment_submitted", "progress"}
+
+INDEXES = [
+    # Bucket lookup on every write; also per-student timelines.
+    IndexSpec(BUCKETS, [("studentId", 1), ("courseId", 1), ("bucketStart", 1)]),
+    # Course trends over a date range.
+    IndexSpec(BUCKETS, [("courseId", 1), ("bucketStart", 1)]),
+]
+
+
+def ensure_indexes(db):
+    for spec in INDEXES:
+        spec.create(db)
+
+
+def bucket_start(t, span=BUCKET_SPAN):
+    """Start of the bucket containing ``t`` (buckets are aligned to ``datetime.min``)."""
+    return datetime.min + (t - datetime.min) // span * span
+
+
+def event(student_id, course_id, event_type, t=None, lesson_id=None, assignment_id=None, seconds=None,
+          progress=None):
+    """An activity event; ``t`` defaults to now.  Raises ValueError for an unknown type."""
+    if event_type not in EVENT_TYPES:
+        raise ValueError(f"unknown event type {event_type!r}")
+    e = {"studentId": student_id, "courseId": course_id, "type": event_type, "t": t or datetime.now()}
+    for key, value in (("lessonId", lesson_id), ("assignmentId", assignment_id), ("seconds", seconds),
+                       ("progress", progress)):
+        if value is not None:
+            e[key] = value
+    return e
+
+
+def _bucket_update(key, events):
+    """One upserting ``UpdateOne`` appending ``events`` (same key) to a bucket with room."""
+    student_id, course_id, start = key
+    stored = [{k: v for k, v in e.items() if k not in ("studentId", "courseId")} for e in events]
+    inc = {"count": len(events)}
+    by_type = defaultdict(int)
+    for e in events:
+        by_type[e["type"]] += 1
+    inc.update({f"stats.byType.{t}": n for t, n in by_type.items()})
+    seconds = sum(e.get("seconds") or 0 for e in events)
+    if seconds:
+        inc["stats.seconds"] = seconds
+    update = {
+        "$push": {"events": {"$each": stored}},
+        "$inc": inc,
+        "$min": {"first": min(e["t"] for e in events)},
+        "$max": {"last": max(e["t"] for e in events)},
+    }
+    progress = [e["progress"] for e in events if e.get("progress") is not None]
+    if progress:
+        update["$max"]["stats.maxProgress"] = max(progress)
+    lessons = sorted({e["lessonId"] for e in events if e.get("lessonId")})
+    if lessons:
+        update["$addToSet"] = {"stats.lessons": {"$each": lessons}}
+    return UpdateOne({"studentId": student_id, "courseId": course_id, "bucketStart": start,
+                      "count": {"$lte": MAX_EVENTS - len(events)}}, update, upsert=True)
+
+
+def bucket_ops(events, span=BUCKET_SPAN):
+    """Group ``events`` by bucket key into the fewest ``UpdateOne``s."""
+    groups = defaultdict(list)
+    for e in events:
+        groups[(e["studentId"], e["courseId"], bucket_start(e["t"], span))].append(e)
+    ops = []
+    for key, group in groups.items():
+        group.sort(key=lambda e: e["t"])
+        ops.extend(_bucket_update(key, group[i:i + MAX_EVENTS]) for i in range(0, len(group), MAX_EVENTS))
+    return ops
+
+
+class ActivityWriter:
+    """Thread-safe event buffer flushed as bucket ``bulk_write``s.
+
+    Flushes when ``batch_size`` events are buffered or the oldest buffered
+    event is ``max_delay`` seconds old (checked on ``add``); call ``flush``
+    or use the writer as a context manager to write the rest.
+    """
+
+    def __init__(self, db, batch_size=5000, max_delay=1.0, span=BUCKET_SPAN):
+        self.collection = db[BUCKETS]
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.span = span
+        self.written = 0
+        self.writes = 0
+        self._buffer = []
+        self._since = None
+        self._lock = threading.Lock()
+
+    def add(self, e):
+        with self._lock:
+            if not self._buffer:
+                self._since = time.monotonic()
+            self._buffer.append(e)
+            due = len(self._buffer) >= self.batch_size or time.monotonic() - self._since >= self.max_delay
+            batch = self._take() if due else None
+        if batch:
+            self._write(batch)
+
+    def extend(self, events):
+        for e in events:
+            self.add(e)
+
+    def _take(self):
+        batch, self._buffer = self._buffer, []
+        return batch
+
+    def _write(self, batch):
+        ops = bucket_ops(batch, self.span)
+        self.collection.bulk_write(ops, ordered=False)
+        with self._lock:
+            self.written += len(batch)
+            self.writes += len(ops)
+
+    def flush(self):
+        with self._lock:
+            batch = self._take()
+        if batch:
+            self._write(batch)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+
+def record(db, events, span=BUCKET_SPAN, session=None):
+    """Write ``events`` in one bulk batch (for callers that already batch).
+
+    ``eduhub.counters`` calls this for every submission and progress change,
+    inside its transaction when it uses one.
+    """
+    ops = bucket_ops(events, span)
+    if ops:
+        db[BUCKETS].bulk_write(ops, ordered=False, session=session)
+    return len(ops)
+
+
+# --- reads ---
+
+def _range_match(course_id=None, student_id=None, start=None, end=None):
+    match = {}
+    if course_id:
+        match["courseId"] = course_id
+    if student_id:
+        match["studentId"] = student_id
+    if start or end:
+        match["bucketStart"] = {}
+        if start:
+            match["bucketStart"]["$gte"] = bucket_start(start)
+        if end:
+            match["bucketStart"]["$lt"] = end
+    return match
+
+
+def daily_activity_pipeline(course_id=None, student_id=None, start=None, end=None, unit="day"):
+    """Events, time spent and active learners per ``unit`` (day, week, month) from bucket stats."""
+    return [
+        {"$match": _range_match(course_id, student_id, start, end)},
+        {"$group": {
+            "_id": {"$dateTrunc": {"date": "$bucketStart", "unit": unit}},
+            "events": {"$sum": "$count"},
+            "seconds": {"$sum": {"$ifNull": ["$stats.seconds", 0]}},
+            "lessonViews": {"$sum": {"$ifNull": ["$stats.byType.lesson_viewed", 0]}},
+            "submissions": {"$sum": {"$ifNull": ["$stats.byType.assignment_submitted", 0]}},
+            "students": {"$addToSet": "$studentId"},
+        }},
+        {"$project": {"_id": 0, "period": "$_id", "events": 1, "seconds": 1, "lessonViews": 1,
+                      "submissions": 1, "activeStudents": {"$size": "$students"}}},
+        {"$sort": {"period": 1}},
+    ]
+
+
+def daily_activity(db, course_id=None, student_id=None, start=None, end=None, unit="day"):
+    return list(db[BUCKETS].aggregate(daily_activity_pipeline(course_id, student_id, start, end, unit)))
+
+
+def engagement(db, course_id, start=None, end=None):
+    """Per student in a course: events, time spent, distinct lessons, best progress, last seen."""
+    return list(db[BUCKETS].aggregate([
+        {"$match": _range_match(course_id, None, start, end)},
+        {"$group": {
+            "_id": "$studentId",
+            "events": {"$sum": "$count"},
+            "seconds": {"$sum": {"$ifNull": ["$stats.seconds", 0]}},
+            "lessons": {"$push": {"$ifNull": ["$stats.lessons", []]}},
+            "maxProgress": {"$max": "$stats.maxProgress"},
+            "lastSeen": {"$max": "$last"},
+        }},
+        {"$project": {"_id": 0, "studentId": "$_id", "events": 1, "seconds": 1, "maxProgress": 1,
+                      "lastSeen": 1,
+                      "lessons": {"$size": {"$reduce": {"input": "$lessons", "initialValue": [],
+                                                        "in": {"$setUnion": ["$$value", "$$this"]}}}}}},
+        {"$sort": {"events": -1}},
+    ]))
+
+
+def timeline(db, student_id, course_id, start=None, end=None):
+    """The raw events of one student in one course, oldest first."""
+    buckets = db[BUCKETS].find(_range_match(course_id, student_id, start, end), {"events": 1}) \
+        .sort("bucketStart", 1)
+    return sorted((e for b in buckets for e in b.get("events", [])), key=lambda e: e["t"])
+
+
+# --- synthetic load ---
+
+def simulate(db, n=100_000, days=30, batch_size=5000, seed=42):
+    """Generate ``n`` events over existing enrollments and lessons; returns throughput figures."""
+    rng = random.Random(seed)
+    enrollments = list(db.enrollments.find({}, {"_id": 0, "studentId": 1, "courseId": 1}))
+    lessons = defaultdict(list)
+    for lesson in db.lessons.find({}, {"_id": 0, "lessonId": 1, "courseId": 1}):
+        lessons[lesson["courseId"]].append(lesson["lessonId"])
+    assignments = defaultdict(list)
+    for a in db.assignments.find({}, {"_id": 0, "assignmentId": 1, "courseId": 1}):
+        assignments[a["courseId"]].append(a["assignmentId"])
+    if not enrollments:
+        raise ValueError("no enrollments to simulate activity for")
+
+    now = datetime.now()
+    start = time.perf_counter()
+    with ActivityWriter(db, batch_size=batch_size, max_delay=float("inf")) as writer:
+        for _ in range(n):
+            enr = rng.choice(enrollments)
+            t = now - timedelta(seconds=rng.randrange(days * 86400))
+            course = enr["courseId"]
+            roll = rng.random()
+            if roll < 0.05 and assignments[course]:
+                e = event(enr["studentId"], course, "assignment_submitted", t,
+                          assignment_id=rng.choice(assignments[course]))
+            elif roll < 0.15:
+                e = event(enr["studentId"], course, "progress", t, progress=float(rng.randrange(101)))
+            elif lessons[course]:
+                kind = "lesson_completed" if roll < 0.3 else "lesson_viewed"
+                e = event(enr["studentId"], course, kind, t, lesson_id=rng.choice(lessons[course]),
+                          seconds=rng.randrange(30, 1800))
+            else:
+                e = event(enr["studentId"], course, "progress", t, progress=float(rng.randrange(101)))
+            writer.add(e)
+    seconds = time.perf_counter() - start
+    return {"events": writer.written, "bucketWrites": writer.writes, "seconds": round(seconds, 3),
+            "eventsPerSecond": writer.written / seconds if seconds else None,
+            "buckets": db[BUCKETS].estimated_document_count()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bucketed learner-activity events.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("simulate", help="write synthetic events for the existing enrollments")
+    p.add_argument("--events", type=int, default=100_000)
+    p.add_argument("--days", type=int, default=30)
+    p.add_argument("--batch-size", type=int, default=5000)
+    p = sub.add_parser("daily", help="activity per day (or week/month)")
+    p.add_argument("--course")
+    p.add_argument("--student")
+    p.add_argument("--days", type=int, default=30)
+    p.add_argument("--unit", choices=["day", "week", "month"], default="day")
+    args = parser.parse_args(argv)
+
+    db = connection.get_db()
+    ensure_indexes(db)
+    if args.command == "simulate":
+        print(simulate(db, args.events, args.days, args.batch_size))
+    else:
+        since = datetime.now() - timedelta(days=args.days)
+        for row in daily_activity(db, args.course, args.student, since, unit=args.unit):
+            print(f"{row['period']:%Y-%m-%d}  {row['events']:>7} events  {row['activeStudents']:>5} students  "
+                  f"{row['seconds'] / 3600:8.1f} h  {row['submissions']:>5} submissions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""Index advisor for the EduHub workload.
+
+Works from the registered queries in ``eduhub.workload``:
+
+1. Explain every query and note collection scans, in-memory sorts and
+   ``$lookup`` stages that scan the foreign collection.
+2. Derive candidate indexes from the query shapes: the leading ``$match`` /
+   find filter and sort (fields ordered Equality, Sort, Range), ``$lookup``
+   foreign fields, and covering indexes for a ``$group`` right after the
+   leading ``$match`` or ``$sort``.  A pipeline that opens with ``$group``
+   gets no candidate: with nothing to bound or order the scan the planner
+   reads the collection anyway.  Candidates already served by an existing
+   index, or by a longer candidate on the same collection, are dropped.
+3. Optionally create the candidates, re-run explain and keep only the ones
+   that measurably helped.
+4. Separately, flag existing indexes that are redundant (a prefix of another
+   index) or unused according to ``$indexStats``; every index costs write
+   throughput.
+
+Usage::
+
+    python -m eduhub.advisor            # report only
+    python -m eduhub.advisor --apply    # create, verify, keep the improving ones
+"""
+
+import argparse
+import json
+from dataclasses import asdict, dataclass, field
+
+
+from eduhub import connection
+from eduhub.explain import explain, summarize
+from eduhub.workload import get_queries
+
+EQUALITY_OPS = {"$eq", "$in"}
+# Operators with no useful index bounds; the field is left out of candidates.
+UNINDEXABLE_OPS = {"$nin", "$not", "$where", "$expr", "$exists"}
+
+
+@dataclass
+class Recommendation:
+    collection: str
+    keys: list
+    reasons: list = field(default_factory=list)
+    queries: list = field(default_factory=list)
+    verified: bool = None
+    before: dict = field(default_factory=dict)
+    after: dict = field(default_factory=dict)
+
+    @property
+    def name(self):
+        return "_".join(f"{k}_{v}" for k, v in self.keys)
+
+
+@dataclass
+class _Shape:
+    """The indexable part of one query against one collection."""
+
+    collection: str
+    query: str
+    reason: str
+    equality: list = field(default_factory=list)
+    sort: list = field(default_factory=list)
+    range: list = field(default_factory=list)
+    covered: list = field(default_factory=list)
+
+    def keys(self):
+        """Index keys in ESR order: equality, then sort, then range."""
+        keys = [(f, 1) for f in self.equality]
+        seen = set(self.equality)
+        for f, direction in self.sort:
+            if f not in seen:
+                keys.append((f, direction))
+                seen.add(f)
+        for f in self.range + self.covered:
+            if f not in seen:
+                keys.append((f, 1))
+                seen.add(f)
+        return keys
+
+
+def classify_filter(flt):
+    """Split a find filter into (equality fields, range fields, notes)."""
+    equality, ranges, notes = [], [], []
+    for key, cond in flt.items():
+        if key == "$and":
+            for sub in cond:
+                e, r, n = classify_filter(sub)
+                equality += e
+                ranges += r
+                notes += n
+        elif key == "$text":
+            notes.append("$text queries use the text index")
+        elif key.startswith("$"):
+            notes.append(f"{key} is not handled by the advisor")
+        elif isinstance(cond, dict) and any(op.startswith("$") for op in cond):
+            ops = set(cond)
+            if "$regex" in ops:
+                pattern = str(cond["$regex"])
+                if pattern.startswith("^") and "i" not in cond.get("$options", ""):
+                    ranges.append(key)
+                else:
+                    notes.append(f"unanchored or case-insensitive $regex on {key} cannot use index bounds")
+            elif ops & UNINDEXABLE_OPS:
+                notes.append(f"{', '.join(sorted(ops & UNINDEXABLE_OPS))} on {key} has no index bounds")
+            elif ops <= EQUALITY_OPS:
+                equality.append(key)
+            else:
+                ranges.append(key)
+        else:
+            equality.append(key)
+    return equality, ranges, notes
+
+
+def _group_fields(group):
+    """Fields referenced by a ``$group`` stage's ``_id`` and accumulators."""
+    fields = []
+
+    def walk(expr):
+        if isinstance(expr, str) and expr.startswith("$") and not expr.startswith("$$"):
+            fields.append(expr[1:])
+        elif isinstance(expr, dict):
+            for v in expr.values():
+                walk(v)
+        elif isinstance(expr, list):
+            for v in expr:
+                walk(v)
+
+    walk(group.get("_id"))
+    for name, acc in group.items():
+        if name != "_id":
+            walk(acc)
+    return list(dict.fromkeys(fields))
+
+
+def query_shapes(query):
+    """Indexable shapes of one ``NamedQuery``, plus notes on what was skipped."""
+    shapes, notes = [], []
+    if query.kind == "find":
+        stages = [{"$match": query.resolved_filter()}]
+        if query.sort:
+            stages.append({"$sort": dict(query.sort)})
+    else:
+        stages = query.resolved_pipeline()
+
+    head = _Shape(query.collection, query.name, "filter/sort")
+    i = 0
+    if stages and "$match" in stages[0]:
+        head.equality, head.range, n = classify_filter(stages[0]["$match"])
+        notes += n
+        i = 1
+    if i < len(stages) and "$sort" in stages[i]:
+        head.sort = list(stages[i]["$sort"].items())
+        i += 1
+    if i < len(stages) and "$group" in stages[i]:
+        if i == 0:
+            notes.append("leading $group without $match/$sort reads the whole collection; no index helps")
+        else:
+            # The index already chosen for the match/sort can also carry the
+            # grouped fields, so the group is fed without fetching documents.
+            head.covered = _group_fields(stages[i]["$group"])
+            head.reason = "filter/sort, covering the following $group"
+    if head.keys():
+        shapes.append(head)
+
+    if query.kind == "aggregate":
+        for stage in stages:
+            lookup = stage.get("$lookup")
+            if lookup and "foreignField" in lookup:
+                shapes.append(_Shape(lookup["from"], query.name,
+                                     f"$lookup from {query.collection}", equality=[lookup["foreignField"]]))
+    return shapes, notes
+
+
+def _index_keys(index):
+    # Key directions may come back as doubles (1.0) depending on the client
+    # that created the index.
+    return [(k, int(v) if isinstance(v, float) else v) for k, v in index["key"].items()]
+
+
+def _serves(existing_keys, keys):
+    """True if an index with ``existing_keys`` can serve ``keys`` (prefix match,
+    in the same or the fully reversed direction)."""
+    head = existing_keys[:len(keys)]
+    if len(head) < len(keys) or [f for f, _ in head] != [f for f, _ in keys]:
+        return False
+    if head == keys:
+        return True
+    return all(isinstance(a, int) and isinstance(b, int) and a == -b for (_, a), (_, b) in zip(head, keys))
+
+
+def recommend(db, queries=None):
+    """Derive index recommendations for ``queries`` (all registered by default).
+
+    Returns ``(recommendations, diagnostics)`` where diagnostics holds the
+    explain summary and notes for every query.
+    """
+    queries = queries or get_queries()
+    diagnostics = {}
+    candidates = {}
+    for query in queries:
+        shapes, notes = query_shapes(query)
+        plan = summarize(explain(db, query.command()))
+        diagnostics[query.name] = {"explain": plan, "notes": notes}
+        for shape in shapes:
+            keys = shape.keys()
+            key = (shape.collection, tuple(keys))
+            rec = candidates.setdefault(key, Recommendation(shape.collection, keys))
+            rec.reasons.append(f"{shape.reason} ({shape.query})")
+            rec.queries.append(shape.query)
+            rec.before.setdefault(shape.query, plan)
+
+    existing = {}
+    for coll in {c for c, _ in candidates}:
+        existing[coll] = [_index_keys(ix) for ix in db[coll].list_indexes()]
+
+    recommendations = []
+    for (coll, keys), rec in candidates.items():
+        if any(_serves(ix, rec.keys) for ix in existing[coll]):
+            continue
+        # Fold into a longer candidate on the same collection that starts
+        # with the same keys; one index then serves both query shapes.
+        wider = [other for (c, k), other in candidates.items()
+                 if c == coll and other is not rec and len(k) > len(keys) and _serves(list(k), rec.keys)]
+        if wider:
+            widest = max(wider, key=lambda r: len(r.keys))
+            widest.reasons += rec.reasons
+            widest.queries += rec.queries
+            for name, plan in rec.before.items():
+                widest.before.setdefault(name, plan)
+            continue
+        recommendations.append(rec)
+    return recommendations, diagnostics
+
+
+def _improved(before, after):
+    return (
+        (before["collscan"] and not after["collscan"])
+        or (before["inMemorySort"] and not after["inMemorySort"])
+        or after["lookupCollectionScans"] < before["lookupCollectionScans"]
+        or (after["totalDocsExamined"] or 0) < (before["totalDocsExamined"] or 0)
+    )
+
+
+def apply(db, recommendations, drop_unhelpful=True, queries=None):
+    """Create each recommended index and confirm it with a fresh explain.
+
+    ``queries`` must be the queries the recommendations were derived from
+    (all registered by default).  ``rec.verified`` is set to whether any
+    motivating query improved (fewer documents examined, no COLLSCAN, no
+    in-memory SORT, or fewer ``$lookup`` collection scans).  Indexes that did
+    not help are dropped again unless ``drop_unhelpful`` is False.
+    """
+    by_name = {q.name: q for q in queries or get_queries()}
+    for rec in recommendations:
+        db[rec.collection].create_index(rec.keys, name=rec.name)
+        for name in dict.fromkeys(rec.queries):
+            rec.after[name] = summarize(explain(db, by_name[name].command()))
+        rec.verified = any(_improved(rec.before[n], rec.after[n]) for n in rec.after)
+        if not rec.verified and drop_unhelpful:
+            db[rec.collection].drop_index(rec.name)
+    return recommendations
+
+
+def redundant_indexes(db, collections):
+    """Indexes whose keys are a prefix of another index on the same collection.
+
+    ``_id``, unique, partial and TTL indexes are skipped: they do more than
+    speed up reads.
+    """
+    findings = []
+    for coll in collections:
+        indexes = list(db[coll].list_indexes())
+        for ix in indexes:
+            if ix["name"] == "_id_" or ix.get("unique") or "partialFilterExpression" in ix \
+                    or "expireAfterSeconds" in ix:
+                continue
+            keys = _index_keys(ix)
+            for other in indexes:
+                if other is not ix and len(other["key"]) > len(keys) and _index_keys(other)[:len(keys)] == keys:
+                    findings.append({"collection": coll, "index": ix["name"], "coveredBy": other["name"]})
+                    break
+    return findings
+
+
+def unused_indexes(db, collections):
+    """Indexes with no recorded accesses in ``$indexStats``.
+
+    Counters reset when mongod restarts, so ``since`` says how long the
+    observation window is; run the workload before trusting the result.
+    """
+    findings = []
+    for coll in collections:
+        for stat in db[coll].aggregate([{"$indexStats": {}}]):
+            if stat["name"] == "_id_" or stat["accesses"]["ops"]:
+                continue
+            findings.append({
+                "collection": coll,
+                "index": stat["name"],
+                "since": stat["accesses"]["since"],
+                "enforcesUniqueness": bool(stat.get("spec", {}).get("unique")),
+            })
+    return findings
+
+
+def report(db, queries=None, do_apply=False, drop_unhelpful=True):
+    """Run the whole advisor and return a JSON-friendly report."""
+    queries = queries or get_queries()
+    recommendations, diagnostics = recommend(db, queries)
+    if do_apply:
+        apply(db, recommendations, drop_unhelpful, queries)
+    collections = sorted({q.collection for q in queries} | {r.collection for r in recommendations})
+    return {
+        "recommendations": [asdict(r) | {"name": r.name} for r in recommendations],
+        "diagnostics": diagnostics,
+        "redundant": redundant_indexes(db, collections),
+        "unused": unused_indexes(db, collections),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recommend and verify indexes for the EduHub workload.")
+    parser.add_argument("--queries", nargs="*", help="query names (default: all)")
+    parser.add_argument("--apply", action="store_true", help="create and verify the recommendations")
+    parser.add_argument("--keep-all", action="store_true", help="keep applied indexes even if they did not help")
+    parser.add_argument("--out", help="write the full report as JSON")
+    args = parser.parse_args(argv)
+
+    db = connection.get_db()
+    result = report(db, get_queries(args.queries), args.apply, not args.keep_all)
+
+    for name, diag in result["diagnostics"].items():
+        ex = diag["explain"]
+        flags = [f for f, on in (("COLLSCAN", ex["collscan"]), ("SORT", ex["inMemorySort"]),
+                                 ("LOOKUP-SCAN", ex["lookupCollectionScans"])) if on]
+        print(f"{name:<30} docs={ex['totalDocsExamined']} keys={ex['totalKeysExamined']} {' '.join(flags)}")
+    for rec in result["recommendations"]:
+        status = {None: "proposed", True: "verified", False: "no improvement"}[rec["verified"]]
+        print(f"[{status}] db.{rec['collection']}.create_index({rec['keys']})  <- {', '.join(rec['reasons'])}")
+    for finding in result["redundant"]:
+        print(f"[redundant] {finding['collection']}.{finding['index']} is a prefix of {finding['coveredBy']}")
+    for finding in result["unused"]:
+        print(f"[unused] {finding['collection']}.{finding['index']} since {finding['since']}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
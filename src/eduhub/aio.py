@@ -0,0 +1,125 @@
+"""asyncio access to the EduHub workload.
+
+Runs the registered queries and pipelines from ``eduhub.workload`` on an
+async client so that independent ones (e.g. the five Task 4.2 dashboard
+pipelines) are in flight at the same time: a page costs about as much as
+its slowest query instead of the sum of all of them, and one worker can
+serve many pages concurrently.
+
+PyMongo's native ``AsyncMongoClient`` (pymongo >= 4.10) is used when
+available; older installs fall back to Motor, the async driver it replaces.
+
+Usage::
+
+    python -m eduhub.aio --concurrency 5
+"""
+
+import argparse
+import asyncio
+import inspect
+import time
+
+from eduhub import config, connection
+from eduhub.workload import get_queries
+
+try:
+    from pymongo import AsyncMongoClient
+except ImportError:  # pymongo < 4.10
+    from motor.motor_asyncio import AsyncIOMotorClient as AsyncMongoClient
+
+DASHBOARD = ["enroll_stats", "completion_rates", "instructor_stats", "monthly_trends", "popular_cats"]
+
+
+def get_database(uri=None, db_name=None, **client_kwargs):
+    """Async database handle; the client must be created inside the event loop.
+
+    Pool, timeout, compression and read preference settings are the same as
+    for the shared sync client (``eduhub.connection``).
+    """
+    options = connection.client_options(**client_kwargs)
+    return AsyncMongoClient(uri or config.MONGO_URI, **options)[db_name or config.DB_NAME]
+
+
+async def open_cursor(db, query, timeout=None, batch_size=None):
+    """Open an async cursor for a ``NamedQuery``.
+
+    ``timeout`` (seconds) is also sent as ``maxTimeMS`` so the server stops
+    working on a query the caller has given up on.  ``find`` and ``aggregate``
+    spell both options differently.
+    """
+    kwargs = {}
+    if timeout:
+        kwargs["max_time_ms" if query.kind == "find" else "maxTimeMS"] = int(timeout * 1000)
+    if batch_size:
+        kwargs["batch_size" if query.kind == "find" else "batchSize"] = batch_size
+    cursor = query.cursor(db, **kwargs)
+    # Native async aggregate() is a coroutine; Motor returns the cursor directly.
+    if inspect.isawaitable(cursor):
+        cursor = await cursor
+    return cursor
+
+
+async def stream(db, query, timeout=None, batch_size=None):
+    """Yield a query's results one document at a time as batches arrive."""
+    cursor = await open_cursor(db, query, timeout, batch_size)
+    async for doc in cursor:
+        yield doc
+
+
+async def run_query(db, query, timeout=None):
+    """All results of one query as a list, bounded by ``timeout`` seconds."""
+    async def collect():
+        return [doc async for doc in stream(db, query, timeout)]
+    return await asyncio.wait_for(collect(), timeout)
+
+
+async def run_many(db, queries, concurrency=8, timeout=None):
+    """Run ``queries`` concurrently, at most ``concurrency`` at a time.
+
+    Returns ``{name: results}``; a query that failed or timed out maps to its
+    exception so one slow panel does not take the whole page down.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(query):
+        async with semaphore:
+            return await run_query(db, query, timeout)
+
+    results = await asyncio.gather(*(bounded(q) for q in queries), return_exceptions=True)
+    return {q.name: r for q, r in zip(queries, results)}
+
+
+async def dashboard(db, concurrency=len(DASHBOARD), timeout=10.0):
+    """The Task 4.2 dashboard panels, fetched concurrently."""
+    return await run_many(db, get_queries(DASHBOARD), concurrency, timeout)
+
+
+async def _compare(concurrency, timeout):
+    db = get_database()
+    queries = get_queries(DASHBOARD)
+
+    start = time.perf_counter()
+    for query in queries:
+        await run_query(db, query, timeout)
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = await run_many(db, queries, concurrency, timeout)
+    concurrent = time.perf_counter() - start
+
+    for name, result in results.items():
+        status = f"{len(result)} docs" if isinstance(result, list) else f"error: {result!r}"
+        print(f"{name:<20} {status}")
+    print(f"serial: {serial * 1000:.1f}ms, concurrent: {concurrent * 1000:.1f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch the EduHub dashboard concurrently.")
+    parser.add_argument("--concurrency", type=int, default=len(DASHBOARD))
+    parser.add_argument("--timeout", type=float, default=10.0)
+    args = parser.parse_args(argv)
+    asyncio.run(_compare(args.concurrency, args.timeout))
+
+
+if __name__ == "__main__":
+    main()
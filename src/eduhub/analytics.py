@@ -0,0 +1,314 @@
+"""Task 4.2 dashboards computed live in fewer, cheaper passes.
+
+``rollups`` serves the dashboards from precomputed collections.  This
+module computes them from the source collections, for when a refresh lag is
+not acceptable or the rollups are not maintained.  The Part 4 pipelines
+read ``enrollments`` four times (``enroll_stats``, ``completion_rates``,
+``monthly_trends``, ``popular_cats``) plus once more through the
+``instructor_stats`` ``$lookup``.  ``popular_cats`` joins every enrollment
+to its course, and ``student_grades`` joins every student to ``users``
+before keeping five.
+
+``dashboard_pipeline`` does one scan of ``enrollments``:
+
+1. ``$group`` by course and month, then by course, so the rest of the
+   pipeline sees one row per course (totals, distinct students, per-month
+   counts);
+2. one ``$lookup`` into ``courses`` per course;
+3. a ``$facet`` deriving ``enroll_stats``, ``instructor_stats``,
+   ``monthly_trends`` and ``popular_cats`` from those rows.
+
+All four come back in one document, so their combined size must stay
+under the 16 MB BSON limit.  There is one row per category, per month,
+per instructor (about 100 bytes each, i.e. roughly 150k instructors) and
+the top ``popular_limit`` categories.  ``completion_rates`` has one row per
+course with no bound, so it is not part of the ``$facet``.  It runs as its
+own cursor (``completion_rates_pipeline``).  A single course's distinct
+students are also collected into one array, bounded by that course's
+enrollments.
+
+``top_students`` is the ``student_grades`` leaderboard with the join done
+last: group (a covered scan of the ``submissions`` ``studentId_1_grade_1``
+index), ``$sort`` and ``$limit`` first, then ``$lookup`` only the candidates.
+The original drops students without a ``users`` document before limiting.
+To keep that behaviour the candidate list is doubled until enough of them
+join.
+
+All reads accept ``secondary=True`` to run on a secondary
+(``secondaryPreferred``), keeping the primary free for writes.
+
+``check_equivalence`` compares every result with the original pipeline in
+``eduhub.workload``, and ``benchmark`` times both::
+
+    python -m eduhub.analytics --check
+    python -m eduhub.analytics --bench 20 --secondary
+"""
+
+import argparse
+import math
+import time
+
+from pymongo import ReadPreference
+from pymongo.errors import OperationFailure
+
+from eduhub import connection
+from eduhub.benchmark import percentile
+from eduhub.workload import QUERIES_BY_NAME, IndexSpec
+
+ENROLLMENT_DASHBOARDS = ["enroll_stats", "completion_rates", "instructor_stats", "monthly_trends", "popular_cats"]
+GRADES_INDEX = IndexSpec("submissions", [("studentId", 1), ("grade", 1)])
+
+INDEXES = [
+    GRADES_INDEX,
+    # $lookup targets.
+    IndexSpec("users", [("userId", 1)]),
+    IndexSpec("courses", [("courseId", 1)]),
+]
+
+
+def ensure_indexes(db):
+    for spec in INDEXES:
+        spec.create(db)
+
+
+def _collection(db, name, secondary=False):
+    if secondary:
+        return db.get_collection(name, read_preference=ReadPreference.SECONDARY_PREFERRED)
+    return db[name]
+
+
+def _has_course():
+    return {"$match": {"course": {"$exists": True}}}
+
+
+def dashboard_pipeline(popular_limit=3):
+    """One pass over ``enrollments`` producing ``{dashboard name: rows}`` (see the module docstring)."""
+    return [
+        {"$group": {
+            "_id": {"c": "$courseId", "m": {"$dateToString": {"format": "%Y-%m", "date": "$enrollDate"}}},
+            "n": {"$sum": 1},
+            "students": {"$addToSet": "$studentId"},
+        }},
+        {"$group": {
+            "_id": "$_id.c",
+            "total": {"$sum": "$n"},
+            "students": {"$push": "$students"},
+            "months": {"$push": {"m": "$_id.m", "n": "$n"}},
+        }},
+        {"$set": {"students": {"$reduce": {"input": "$students", "initialValue": [],
+                                           "in": {"$setUnion": ["$$value", "$$this"]}}}}},
+        {"$lookup": {"from": "courses", "localField": "_id", "foreignField": "courseId", "as": "course"}},
+        # One row per matching course document, none without one (like $unwind in the originals).
+        {"$unwind": {"path": "$course", "preserveNullAndEmptyArrays": True}},
+        {"$project": {"total": 1, "students": 1, "months": 1,
+                      "course.category": 1, "course.instructorId": 1, "course.price": 1}},
+        {"$facet": {
+            "enroll_stats": [
+                _has_course(),
+                {"$group": {"_id": "$course.category", "avgEnrollments": {"$avg": "$total"}}},
+            ],
+            "instructor_stats": [
+                _has_course(),
+                # One row per (course, student); the course's revenue rides on its first row only.
+                {"$unwind": {"path": "$students", "includeArrayIndex": "i", "preserveNullAndEmptyArrays": True}},
+                {"$group": {
+                    "_id": {"instructor": "$course.instructorId", "studentId": "$students"},
+                    "revenue": {"$sum": {"$cond": [{"$gt": ["$i", 0]}, 0,
+                                                   {"$multiply": ["$course.price", "$total"]}]}},
+                }},
+                {"$group": {
+                    "_id": "$_id.instructor",
+                    "totalStudents": {"$sum": {"$cond": [{"$eq": [{"$type": "$_id.studentId"}, "missing"]}, 0, 1]}},
+                    "totalRevenue": {"$sum": "$revenue"},
+                }},
+            ],
+            "monthly_trends": [
+                {"$group": {"_id": "$_id", "months": {"$first": "$months"}}},
+                {"$unwind": "$months"},
+                {"$group": {"_id": "$months.m", "count": {"$sum": "$months.n"}}},
+                {"$sort": {"_id": 1}},
+            ],
+            "popular_cats": [
+                _has_course(),
+                {"$group": {"_id": "$course.category", "enrollCount": {"$sum": "$total"}}},
+                {"$sort": {"enrollCount": -1}},
+                {"$limit": popular_limit},
+            ],
+        }},
+    ]
+
+
+def completion_rates_pipeline():
+    """One row per course, streamed as a cursor (unbounded, so not in the ``$facet``)."""
+    return [
+        {"$group": {"_id": "$courseId", "total": {"$sum": 1},
+                    "completed": {"$sum": {"$cond": [{"$eq": ["$isCompleted", True]}, 1, 0]}}}},
+        {"$project": {"completionRate": {"$multiply": [{"$divide": ["$completed", "$total"]}, 100]}}},
+    ]
+
+
+def enrollment_dashboards(db, popular_limit=3, secondary=False):
+    """The five enrollment dashboards: one ``$facet`` round trip plus the completion-rate cursor."""
+    coll = _collection(db, "enrollments", secondary)
+    result = next(coll.aggregate(dashboard_pipeline(popular_limit), allowDiskUse=True))
+    result["completion_rates"] = list(coll.aggregate(completion_rates_pipeline(), allowDiskUse=True))
+    return result
+
+
+def top_students_pipeline(k=5, candidates=None):
+    return [
+        {"$group": {"_id": "$studentId", "avgGrade": {"$avg": "$grade"}}},
+        {"$sort": {"avgGrade": -1}},
+        {"$limit": candidates or k},
+        {"$lookup": {"from": "users", "localField": "_id", "foreignField": "userId", "as": "student"}},
+        {"$unwind": "$student"},
+        {"$limit": k},
+    ]
+
+
+def top_students(db, k=5, secondary=False):
+    """``student_grades`` with sort+limit before the ``$lookup``."""
+    coll = _collection(db, "submissions", secondary)
+    candidates, students = k, None
+    while True:
+        pipeline = top_students_pipeline(k, candidates)
+        try:
+            rows = list(coll.aggregate(pipeline, hint=GRADES_INDEX.name))
+        except OperationFailure:
+            rows = list(coll.aggregate(pipeline))  # index missing: same result, collection scan
+        if len(rows) >= k:
+            return rows
+        # Fewer than k joined: some candidates have no user document, widen the window
+        # (unless there are no more students to try).  Counted once, on the first miss.
+        if students is None:
+            students = _student_count(coll)
+        if candidates >= students:
+            return rows
+        candidates *= 2
+
+
+def _student_count(coll):
+    return next(coll.aggregate([{"$group": {"_id": "$studentId"}}, {"$count": "n"}]), {"n": 0})["n"]
+
+
+def dashboard(db, secondary=False):
+    """All six Task 4.2 dashboards (same shapes as ``rollups.dashboard``)."""
+    result = enrollment_dashboards(db, secondary=secondary)
+    result["student_grades"] = top_students(db, secondary=secondary)
+    return result
+
+
+# --- equivalence with the Part 4 pipelines ---
+
+def _original(db, name, secondary=False):
+    query = QUERIES_BY_NAME[name]
+    return list(_collection(db, query.collection, secondary).aggregate(query.resolved_pipeline()))
+
+
+def _close(a, b):
+    if isinstance(a, float) or isinstance(b, float):
+        return (a is None) == (b is None) and (a is None or math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9))
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_close(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_close(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def _by_id(rows):
+    return sorted(rows, key=lambda d: (d["_id"] is not None, str(d["_id"])))
+
+
+def _same_top(expected, actual, metric):
+    """Top-K results agree up to the order of ties at the cut-off."""
+    if not _close([d[metric] for d in expected], [d[metric] for d in actual]):
+        return False
+    cut = expected[-1][metric] if expected else None
+
+    def above(rows):
+        return _by_id(d for d in rows if d[metric] != cut)
+    actual_ids = {str(d["_id"]): d for d in actual}
+    return _close(above(expected), above(actual)) and all(
+        _close(d, actual_ids.get(str(d["_id"]), d)) for d in expected)
+
+
+COMPARE = {
+    "enroll_stats": lambda e, a: _close(_by_id(e), _by_id(a)),
+    "completion_rates": lambda e, a: _close(_by_id(e), _by_id(a)),
+    "instructor_stats": lambda e, a: _close(_by_id(e), _by_id(a)),
+    "monthly_trends": _close,
+    "popular_cats": lambda e, a: _same_top(e, a, "enrollCount"),
+    "student_grades": lambda e, a: _same_top(e, a, "avgGrade"),
+}
+
+
+def check_equivalence(db, secondary=False):
+    """``{dashboard: {"equal", "expected", "actual"}}`` comparing with the original pipelines.
+
+    Floats (averages, revenue) are compared with a relative tolerance of
+    1e-9, since summing in a different order can change the last bits.
+    """
+    optimized = dashboard(db, secondary)
+    report = {}
+    for name, same in COMPARE.items():
+        expected = _original(db, name, secondary)
+        report[name] = {"equal": same(expected, optimized[name]), "expected": len(expected),
+                        "actual": len(optimized[name])}
+    return report
+
+
+# --- benchmark ---
+
+def _time(fn, iterations, warmup):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return {"p50": percentile(samples, 50), "p95": percentile(samples, 95)}
+
+
+def benchmark(db, iterations=20, warmup=3, secondary=False):
+    """Latency of the original pipelines vs. this module; ``speedup`` is the p50 ratio."""
+    cases = {
+        "enrollment_dashboards": (lambda: [_original(db, n, secondary) for n in ENROLLMENT_DASHBOARDS],
+                                  lambda: enrollment_dashboards(db, secondary=secondary)),
+        "student_grades": (lambda: _original(db, "student_grades", secondary),
+                           lambda: top_students(db, secondary=secondary)),
+        "dashboard": (lambda: [_original(db, n, secondary) for n in COMPARE],
+                      lambda: dashboard(db, secondary)),
+    }
+    results = {}
+    for name, (original, optimized) in cases.items():
+        before = _time(original, iterations, warmup)
+        after = _time(optimized, iterations, warmup)
+        results[name] = {"originalMs": before, "optimizedMs": after,
+                         "speedup": before["p50"] / after["p50"] if after["p50"] else None}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Single-pass Task 4.2 dashboards.")
+    parser.add_argument("--check", action="store_true", help="compare with the original pipelines")
+    parser.add_argument("--bench", type=int, metavar="N", help="time original vs. optimized, N iterations")
+    parser.add_argument("--secondary", action="store_true", help="read from a secondary if available")
+    args = parser.parse_args(argv)
+
+    db = connection.get_db()
+    ensure_indexes(db)
+    if args.check:
+        for name, r in check_equivalence(db, args.secondary).items():
+            print(f"{name:<18} {'same' if r['equal'] else 'DIFFERENT':<10} {r['expected']} / {r['actual']} rows")
+    if args.bench:
+        for name, r in benchmark(db, args.bench, secondary=args.secondary).items():
+            print(f"{name:<22} original p50 {r['originalMs']['p50']:8.2f} ms  "
+                  f"optimized p50 {r['optimizedMs']['p50']:8.2f} ms  x{r['speedup']:.1f}")
+    if not args.check and not args.bench:
+        for name, rows in dashboard(db, args.secondary).items():
+            print(name, rows[:5])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""Repeatable latency benchmark for the EduHub workload.
+
+Each registered query is run ``warmup`` times untimed and then ``iterations``
+times with the cursor fully drained, so the numbers cover the query and the
+result transfer rather than a single ``explain`` round trip.  One explain per
+query adds the server-side view (execution time, keys and documents examined).
+
+The suite can repeat itself with each Part 5 index hidden in turn (together
+with every other index the planner falls back to, so the variant really runs
+without index support), and at several data scales.  Results are written as JSON and can be compared with a
+previous run to flag regressions::
+
+    python -m eduhub.benchmark --scales 1 10 --out bench.json --baseline old.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+
+import pymongo
+from pymongo.errors import OperationFailure
+
+from eduhub import connection, datagen
+from eduhub.explain import explain, plan_indexes, summarize, winning_plan
+from eduhub.workload import INDEXES, create_indexes, get_queries
+
+BASELINE_VARIANT = "all_indexes"
+
+
+def percentile(samples, pct):
+    """Linear-interpolated percentile of ``samples`` (``pct`` in 0-100)."""
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def time_query(db, query, iterations=20, warmup=3):
+    """Benchmark one ``NamedQuery``; returns a JSON-friendly result dict."""
+    if iterations < 1:
+        raise ValueError("iterations must be at least 1")
+    for _ in range(warmup):
+        query.run(db)
+
+    samples = []
+    n_results = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        n_results = len(query.run(db))
+        samples.append((time.perf_counter() - start) * 1000.0)
+
+    return {
+        "query": query.name,
+        "collection": query.collection,
+        "kind": query.kind,
+        "iterations": iterations,
+        "results": n_results,
+        "latencyMs": {
+            "p50": percentile(samples, 50),
+            "p95": percentile(samples, 95),
+            "p99": percentile(samples, 99),
+            "mean": statistics.fmean(samples),
+            "min": min(samples),
+            "max": max(samples),
+        },
+        "explain": summarize(explain(db, query.command())),
+    }
+
+
+def _safe_time_query(db, query, iterations, warmup):
+    try:
+        return time_query(db, query, iterations, warmup)
+    except OperationFailure as e:
+        # e.g. a $text query with its text index dropped
+        return {"query": query.name, "collection": query.collection, "error": str(e)}
+
+
+def _set_hidden(db, collection, names, hidden):
+    for name in names:
+        db.command("collMod", collection, index={"name": name, "hidden": hidden})
+
+
+def _time_without(db, query, spec, iterations, warmup):
+    """Time ``query`` with ``spec`` hidden, plus any index the planner picks instead.
+
+    Other modules add indexes of their own (search, rollups, analytics, ...);
+    left visible they would serve the query and the variant would not measure
+    what its name says.  The hidden indexes are listed in ``hiddenIndexes``
+    and made visible again afterwards.
+    """
+    hidden = [spec.name]
+    try:
+        _set_hidden(db, spec.collection, hidden, True)
+        while True:
+            try:
+                used = plan_indexes(winning_plan(explain(db, query.command())))
+            except OperationFailure:
+                break  # e.g. $text without a text index; the timing records the error
+            fallback = [name for name in used if name != "_id_" and name not in hidden]
+            if not fallback:
+                break
+            _set_hidden(db, spec.collection, fallback, True)
+            hidden += fallback
+        result = _safe_time_query(db, query, iterations, warmup)
+    finally:
+        _set_hidden(db, spec.collection, hidden, False)
+    result["hiddenIndexes"] = hidden
+    return result
+
+
+def run_suite(db, queries=None, iterations=20, warmup=3, index_variants=True):
+    """Run ``queries`` with all indexes, then without each Part 5 index in turn.
+
+    Only queries on the collection that owns the index are re-run for its
+    variant, with that index and any fallback index hidden (MongoDB 4.4+)
+    rather than dropped, so nothing has to be rebuilt afterwards.
+    """
+    queries = queries or get_queries()
+    failed = create_indexes(db)
+    for name, error in failed.items():
+        print(f"Index {name} not created, skipping its variant: {error}")
+    results = []
+    for query in queries:
+        result = _safe_time_query(db, query, iterations, warmup)
+        result["variant"] = BASELINE_VARIANT
+        results.append(result)
+
+    if not index_variants:
+        return results
+
+    for spec in INDEXES:
+        affected = [q for q in queries if q.collection == spec.collection]
+        if not affected or spec.name in failed:
+            continue
+        for query in affected:
+            result = _time_without(db, query, spec, iterations, warmup)
+            result["variant"] = f"without:{spec.collection}.{spec.name}"
+            results.append(result)
+    return results
+
+
+def reseed(db, scale, workers=None):
+    """Replace the collection contents with a generated dataset of ``scale``."""
+    for name in datagen.COLLECTIONS:
+        db[name].delete_many({})
+    return datagen.load(scale, db_name=db.name, workers=workers)
+
+
+def run_scales(db, scales, **kwargs):
+    """Reseed at each scale and run the suite; results are tagged with ``scale``."""
+    results = []
+    for scale in scales:
+        counts = reseed(db, scale)
+        for result in run_suite(db, **kwargs):
+            result["scale"] = scale
+            result["counts"] = counts
+            results.append(result)
+    return results
+
+
+def write_report(db, results, path):
+    """Write results plus run metadata to ``path`` as JSON."""
+    report = {
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "serverVersion": db.client.server_info().get("version"),
+        "pymongoVersion": pymongo.version,
+        "python": platform.python_version(),
+        "host": platform.node(),
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    return report
+
+
+def _key(result):
+    return result.get("scale"), result["query"], result.get("variant")
+
+
+def compare(baseline, current, metric="p95", threshold=0.2):
+    """Results whose ``metric`` latency grew by more than ``threshold`` (20%).
+
+    Both arguments are report dicts as written by ``write_report``.  Plan
+    changes (a query that starts examining more documents) are reported too,
+    since they usually precede latency regressions at larger scale.
+    """
+    previous = {_key(r): r for r in baseline["results"] if "error" not in r}
+    regressions = []
+    for result in current["results"]:
+        old = previous.get(_key(result))
+        if old is None or "error" in result:
+            continue
+        before, after = old["latencyMs"][metric], result["latencyMs"][metric]
+        docs_before = old["explain"].get("totalDocsExamined") or 0
+        docs_after = result["explain"].get("totalDocsExamined") or 0
+        if (before and after > before * (1 + threshold)) or docs_after > docs_before * (1 + threshold):
+            regressions.append({
+                "query": result["query"],
+                "variant": result.get("variant"),
+                "scale": result.get("scale"),
+                metric + "Before": before,
+                metric + "After": after,
+                "docsExaminedBefore": docs_before,
+                "docsExaminedAfter": docs_after,
+            })
+    return regressions
+
+
+def print_results(results):
+    for r in results:
+        if "error" in r:
+            print(f"{r['query']:<30} {r.get('variant', ''):<40} ERROR {r['error'][:60]}")
+            continue
+        lat, ex = r["latencyMs"], r["explain"]
+        print(f"{r['query']:<30} {r.get('variant', ''):<40} "
+              f"p50={lat['p50']:.2f}ms p95={lat['p95']:.2f}ms p99={lat['p99']:.2f}ms "
+              f"keys={ex['totalKeysExamined']} docs={ex['totalDocsExamined']} "
+              f"server={ex['executionTimeMillis']}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the EduHub query workload.")
+    parser.add_argument("--queries", nargs="*", help="query names (default: all)")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--scales", type=float, nargs="*",
+                        help="reseed with generated data at each scale (default: use current data)")
+    parser.add_argument("--no-index-variants", action="store_true")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", help="previous report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    db = connection.get_db()
+    kwargs = dict(queries=get_queries(args.queries), iterations=args.iterations,
+                  warmup=args.warmup, index_variants=not args.no_index_variants)
+    results = run_scales(db, args.scales, **kwargs) if args.scales else run_suite(db, **kwargs)
+    report = write_report(db, results, args.out)
+    print_results(results)
+    print(f"Report written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(json.load(f), report, threshold=args.threshold)
+        for reg in regressions:
+            print("REGRESSION:", reg)
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""Bulk grade and progress updates.
+
+End-of-term imports deliver tens of thousands of grade and progress changes
+at once; sent through ``counters.grade``/``counters.set_progress`` each one
+costs several round trips.  ``apply_grades`` and ``apply_progress`` take any
+iterable of changes (dicts or CSV rows) and send them as unordered
+``bulk_write`` batches of ``UpdateOne`` (with ``upsert`` for grades that
+carry ``studentId`` and ``assignmentId``), optionally from several worker
+threads.
+
+Per batch the current documents are read with one ``$in`` query so that the
+``eduhub.counters`` deltas (grade sums, completions) can be computed and
+applied as one more ``bulk_write`` of aggregated ``$inc`` updates.  The two
+writes are not atomic, and parallel workers may read the same document's
+before-image if it appears in two batches; ``counters.reconcile`` repairs
+drift from either.
+
+Like ``counters.set_progress`` and ``counters.submit``, progress changes and
+upserted (new) submissions are recorded as ``progress`` and
+``assignment_submitted`` activity events, buffered in one
+``activity.ActivityWriter`` per run (``EDUHUB_RECORD_ACTIVITY=0`` turns this
+off).
+
+A bad item (missing id, non-numeric grade, a validation failure on the
+server) is reported with its position in the input and does not stop the
+rest of its batch.  Usage::
+
+    python -m eduhub.bulk grades grades.csv --workers 4
+    python -m eduhub.bulk progress progress.csv --batch-size 2000
+"""
+
+import argparse
+import csv
+import math
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from eduhub import activity, config, connection, counters
+
+
+@dataclass
+class BulkReport:
+    items: int = 0
+    batches: int = 0
+    matched: int = 0
+    modified: int = 0
+    upserted: int = 0
+    errors: list = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def throughput(self):
+        """Items per second."""
+        return self.items / self.seconds if self.seconds else None
+
+    def add(self, other):
+        self.batches += other.batches
+        self.matched += other.matched
+        self.modified += other.modified
+        self.upserted += other.upserted
+        self.errors.extend(other.errors)
+
+    def as_dict(self):
+        return {"items": self.items, "batches": self.batches, "matched": self.matched,
+                "modified": self.modified, "upserted": self.upserted, "errors": len(self.errors),
+                "seconds": round(self.seconds, 3), "itemsPerSecond": self.throughput}
+
+
+def read_csv(path):
+    """Rows of a CSV file as dicts; empty cells are dropped."""
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            yield {k: v for k, v in row.items() if v not in (None, "")}
+
+
+def _bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "y")
+    return bool(value)
+
+
+# --- change -> write op ---
+
+def _grade_op(item, upsert, now):
+    """``UpdateOne`` for a grade change; raises ValueError for a malformed item."""
+    submission_id = item.get("submissionId")
+    if not submission_id:
+        raise ValueError("missing submissionId")
+    # Converted once here (CSV values are strings) so the counter deltas see the same number.
+    item["grade"] = float(item["grade"])
+    if not math.isfinite(item["grade"]):
+        raise ValueError(f"grade {item['grade']} is not a finite number")
+    update = {"$set": {"grade": item["grade"], "updatedAt": now}}
+    if item.get("feedback") is not None:
+        update["$set"]["feedback"] = item["feedback"]
+    can_insert = upsert and item.get("studentId") and item.get("assignmentId")
+    if can_insert:
+        update["$setOnInsert"] = {"studentId": item["studentId"], "assignmentId": item["assignmentId"],
+                                  "submissionDate": now}
+    return submission_id, UpdateOne({"submissionId": submission_id}, update, upsert=bool(can_insert))
+
+
+def _progress_op(item, upsert, now):
+    enrollment_id = item.get("enrollmentId")
+    if not enrollment_id:
+        raise ValueError("missing enrollmentId")
+    item["progress"] = progress = float(item["progress"])
+    if not 0 <= progress <= 100:
+        raise ValueError(f"progress {progress} out of range")
+    update = {"progress": progress, "updatedAt": now}
+    if item.get("isCompleted") is not None:
+        update["isCompleted"] = _bool(item["isCompleted"])
+    return enrollment_id, UpdateOne({"enrollmentId": enrollment_id}, {"$set": update})
+
+
+# --- counter deltas from before-images ---
+
+def _course_keys(db, course_ids):
+    courses = db.courses.find({"courseId": {"$in": list(course_ids)}}, {"_id": 0, "courseId": 1, "instructorId": 1})
+    return {c["courseId"]: c.get("instructorId") for c in courses}
+
+
+def _grade_deltas(db, batch, before, upsert):
+    """Aggregated ``{(kind, key): {field: delta}}`` for a batch of grade items."""
+    assignment_ids = {(before.get(i) or item).get("assignmentId") for i, item, _ in batch}
+    assignments = {a["assignmentId"]: a.get("courseId") for a in db.assignments.find(
+        {"assignmentId": {"$in": [a for a in assignment_ids if a]}}, {"_id": 0, "assignmentId": 1, "courseId": 1})}
+    instructors = _course_keys(db, {c for c in assignments.values() if c})
+
+    deltas = defaultdict(lambda: defaultdict(int))
+    for doc_id, item, _ in batch:
+        doc = before.get(doc_id)
+        if doc is None:
+            if not (upsert and item.get("studentId") and item.get("assignmentId")):
+                continue  # no match and not upserted: nothing changes
+            doc, old = item, None  # upserted: a new graded submission
+        else:
+            old = doc.get("grade")
+        course_id = assignments.get(doc.get("assignmentId"))
+        keys = {"course": course_id, "instructor": instructors.get(course_id), "student": doc.get("studentId")}
+        for kind, key in keys.items():
+            if key is not None:
+                deltas[(kind, key)]["gradeSum"] += item["grade"] - (old or 0)
+                deltas[(kind, key)]["gradeCount"] += 0 if old is not None else 1
+    return deltas
+
+
+def _progress_deltas(db, batch, before, upsert):
+    instructors = _course_keys(db, {d["courseId"] for d in before.values() if d.get("courseId")})
+    deltas = defaultdict(lambda: defaultdict(int))
+    for doc_id, item, _ in batch:
+        doc = before.get(doc_id)
+        if doc is None or item.get("isCompleted") is None:
+            continue
+        delta = int(_bool(item["isCompleted"])) - int(bool(doc.get("isCompleted")))
+        if not delta:
+            continue
+        keys = {"course": doc["courseId"], "instructor": instructors.get(doc["courseId"]),
+                "student": doc.get("studentId")}
+        for kind, key in keys.items():
+            if key is not None:
+                deltas[(kind, key)]["completed"] += delta
+    return deltas
+
+
+# --- activity events for the written items ---
+
+def _grade_events(db, batch, before, upserted, now):
+    """``assignment_submitted`` for the submissions the batch inserted (regrades record nothing)."""
+    courses = {a["assignmentId"]: a.get("courseId") for a in db.assignments.find(
+        {"assignmentId": {"$in": list({item["assignmentId"] for item in upserted})}},
+        {"_id": 0, "assignmentId": 1, "courseId": 1})} if upserted else {}
+    return [activity.event(item["studentId"], courses[item["assignmentId"]], "assignment_submitted", now,
+                           assignment_id=item["assignmentId"])
+            for item in upserted if courses.get(item["assignmentId"])]
+
+
+def _progress_events(db, batch, before, upserted, now):
+    """A ``progress`` event per existing enrollment in the batch."""
+    return [activity.event(doc["studentId"], doc["courseId"], "progress", now, progress=item["progress"])
+            for doc, item in ((before.get(doc_id), item) for doc_id, item, _ in batch) if doc]
+
+
+@dataclass
+class _Kind:
+    collection: str
+    id_field: str
+    make_op: object
+    deltas: object
+    events: object
+    before_fields: dict
+
+
+GRADES = _Kind("submissions", "submissionId", _grade_op, _grade_deltas, _grade_events,
+               {"_id": 0, "submissionId": 1, "studentId": 1, "assignmentId": 1, "grade": 1})
+PROGRESS = _Kind("enrollments", "enrollmentId", _progress_op, _progress_deltas, _progress_events,
+                 {"_id": 0, "enrollmentId": 1, "studentId": 1, "courseId": 1, "isCompleted": 1})
+
+
+def _send(db, kind, batch, upsert, update_counters, writer=None, now=None):
+    """Write one batch; returns a ``BulkReport`` for it."""
+    report = BulkReport(batches=1)
+    before = {}
+    if update_counters or writer is not None:
+        ids = [doc_id for doc_id, _, _ in batch]
+        before = {d[kind.id_field]: d for d in db[kind.collection].find({kind.id_field: {"$in": ids}},
+                                                                         kind.before_fields)}
+    failed = set()
+    try:
+        result = db[kind.collection].bulk_write([op for _, _, op in batch], ordered=False)
+        details = result.bulk_api_result
+    except BulkWriteError as e:
+        details = e.details
+        for err in details.get("writeErrors", []):
+            doc_id, item, _ = batch[err["index"]]
+            failed.add(err["index"])
+            report.errors.append({"item": item.get("_line"), "id": doc_id, "error": err.get("errmsg")})
+    report.matched = details.get("nMatched", 0)
+    report.modified = details.get("nModified", 0)
+    report.upserted = details.get("nUpserted", 0)
+
+    ok = [entry for i, entry in enumerate(batch) if i not in failed]
+    if update_counters:
+        counters.apply_deltas(db, kind.deltas(db, ok, before, upsert))
+    if writer is not None:
+        upserted = [batch[u["index"]][1] for u in details.get("upserted", [])]
+        writer.extend(kind.events(db, ok, before, upserted, now))
+    return report
+
+
+def apply(db, kind, changes, batch_size=1000, workers=1, upsert=False, update_counters=True):
+    """Send ``changes`` as unordered bulk batches; returns a ``BulkReport``.
+
+    A document id appearing twice in one batch starts a new batch, so the
+    before-image used for counter deltas is always current.
+    """
+    report = BulkReport()
+    start = time.perf_counter()
+    now = datetime.now()
+    writer = activity.ActivityWriter(db) if config.RECORD_ACTIVITY else None
+
+    def batches():
+        batch, ids = [], set()
+        for line, item in enumerate(changes, 1):
+            report.items += 1
+            item = dict(item, _line=line)
+            try:
+                doc_id, op = kind.make_op(item, upsert, now)
+            except (KeyError, TypeError, ValueError) as e:
+                report.errors.append({"item": line, "id": item.get(kind.id_field), "error": repr(e)})
+                continue
+            if doc_id in ids or len(batch) >= batch_size:
+                yield batch
+                batch, ids = [], set()
+            batch.append((doc_id, item, op))
+            ids.add(doc_id)
+        if batch:
+            yield batch
+
+    if workers <= 1:
+        for batch in batches():
+            report.add(_send(db, kind, batch, upsert, update_counters, writer, now))
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = set()
+            for batch in batches():
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for f in done:
+                        report.add(f.result())
+                pending.add(executor.submit(_send, db, kind, batch, upsert, update_counters, writer, now))
+            for f in pending:
+                report.add(f.result())
+    if writer is not None:
+        writer.flush()
+
+    report.errors.sort(key=lambda e: e["item"] or 0)
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def apply_grades(db, changes, batch_size=1000, workers=1, upsert=False, update_counters=True):
+    """Grade changes: ``{"submissionId", "grade"[, "feedback", "studentId", "assignmentId"]}``.
+
+    With ``upsert=True`` a change for an unknown submission that names its
+    student and assignment creates the submission.
+    """
+    return apply(db, GRADES, changes, batch_size, workers, upsert, update_counters)
+
+
+def apply_progress(db, changes, batch_size=1000, workers=1, update_counters=True):
+    """Progress changes: ``{"enrollmentId", "progress"[, "isCompleted"]}``."""
+    return apply(db, PROGRESS, changes, batch_size, workers, False, update_counters)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply grade or progress changes from a CSV file.")
+    parser.add_argument("kind", choices=["grades", "progress"])
+    parser.add_argument("csv", help="CSV with submissionId,grade[,...] or enrollmentId,progress[,isCompleted]")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--upsert", action="store_true", help="create missing submissions (grades only)")
+    parser.add_argument("--no-counters", action="store_true", help="skip the counters update")
+    args = parser.parse_args(argv)
+
+    db = connection.get_db()
+    rows = read_csv(args.csv)
+    if args.kind == "grades":
+        report = apply_grades(db, rows, args.batch_size, args.workers, args.upsert, not args.no_counters)
+    else:
+        report = apply_progress(db, rows, args.batch_size, args.workers, not args.no_counters)
+    print(report.as_dict())
+    for err in report.errors[:20]:
+        print(f"  line {err['item']}: {err['id']}: {err['error']}")
+
+
+if __name__ == "__main__":
+    main()
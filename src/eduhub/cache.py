@@ -0,0 +1,282 @@
+"""Read-through cache for catalog queries.
+
+Catalog reads (published courses with instructor, courses by category, tag
+and title searches) dominate traffic while course and user data rarely
+change.  ``QueryCache`` keeps their results in process, keyed by the
+normalized query shape and parameters, bounded by entry count (LRU) and age
+(TTL).
+
+Entries are invalidated precisely on writes.  Each entry records what it
+depends on:
+
+* ``("doc", collection, id)`` for every document in a find result, so an
+  update to ``c001`` only drops entries that returned ``c001``;
+* ``("field", collection, path)`` for every field its filter or sort uses,
+  so publishing a course drops the entries that filter on ``isPublished``;
+* ``("*", collection)`` for aggregations and anything the cache cannot
+  analyse, dropped on any write to that collection (or a ``$lookup`` target).
+
+Writes made through ``eduhub.denormalize`` (``insert_user``, ``update_user``,
+``insert_course``, ``update_course``) notify ``default_cache``.  Hit, miss,
+eviction, expiry and invalidation counters are available from ``stats()``.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+
+from bson import json_util
+
+from eduhub.workload import QUERIES_BY_NAME, NamedQuery
+
+# Business key used to tag cached documents, per collection.
+ID_FIELDS = {"courses": "courseId", "users": "userId", "enrollments": "enrollmentId",
+             "lessons": "lessonId", "assignments": "assignmentId", "submissions": "submissionId"}
+
+
+@dataclass
+class _Entry:
+    value: list
+    expires: float
+    tags: set
+
+
+def _canonical(value):
+    """Filter with keys sorted recursively; key order in a filter is irrelevant."""
+    if isinstance(value, dict):
+        return {k: _canonical(value[k]) for k in sorted(value)}
+    if isinstance(value, list):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def cache_key(query):
+    """Normalized shape + parameters of a ``NamedQuery`` (its name is ignored)."""
+    if query.kind == "aggregate":
+        shape = ["aggregate", query.collection, query.resolved_pipeline()]
+    else:
+        shape = ["find", query.collection, _canonical(query.resolved_filter()), query.projection,
+                 query.sort, query.limit]
+    return json_util.dumps(shape)
+
+
+def _filter_fields(flt):
+    """Field paths referenced by a filter, or None if it uses operators we do not model."""
+    fields = set()
+    for key, cond in flt.items():
+        if key in ("$and", "$or", "$nor"):
+            for sub in cond:
+                sub_fields = _filter_fields(sub)
+                if sub_fields is None:
+                    return None
+                fields |= sub_fields
+        elif key.startswith("$"):
+            return None
+        else:
+            fields.add(key)
+    return fields
+
+
+def _dependencies(query):
+    """Static tags of a query and the id field to tag its result documents with."""
+    coll = query.collection
+    if query.kind == "aggregate":
+        tags = {("*", coll)}
+        for stage in query.resolved_pipeline():
+            if "$lookup" in stage:
+                tags.add(("*", stage["$lookup"]["from"]))
+            if "$unionWith" in stage:
+                target = stage["$unionWith"]
+                tags.add(("*", target if isinstance(target, str) else target["coll"]))
+        return tags, None
+    fields = _filter_fields(query.resolved_filter())
+    id_field = ID_FIELDS.get(coll)
+    if fields is None or id_field is None:
+        return {("*", coll)}, None
+    fields |= {f for f, _ in (query.sort or [])}
+    return {("field", coll, f) for f in fields}, id_field
+
+
+def _with_id(projection, id_field):
+    """Projection that also returns ``id_field``; second value says to strip it again."""
+    if not projection:
+        return projection, False
+    inclusion = any(v for k, v in projection.items() if k != "_id")
+    if inclusion and not projection.get(id_field):
+        return dict(projection, **{id_field: 1}), True
+    if not inclusion and id_field in projection:
+        return {k: v for k, v in projection.items() if k != id_field}, True
+    return projection, False
+
+
+def _overlaps(a, b):
+    return a == b or a.startswith(b + ".") or b.startswith(a + ".")
+
+
+def changed_fields(update):
+    """Top-level paths modified by an update document (``$set``, ``$push``, ...)."""
+    if not update:
+        return None
+    if not any(k.startswith("$") for k in update):
+        return None  # replacement document: every field may have changed
+    return {path for op, spec in update.items() for path in spec}
+
+
+class QueryCache:
+    """Thread-safe LRU + TTL cache of query results with tag invalidation."""
+
+    def __init__(self, max_entries=1024, ttl=300.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._by_tag = {}
+        self._lock = threading.Lock()
+        # Bumped by every invalidation so that a result computed before a
+        # write is not stored after it.
+        self._generation = 0
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    # --- reads ---
+
+    def get_or_run(self, db, query):
+        """Cached result of ``query``, running it on a miss.
+
+        The returned list is shared between callers; treat it as read-only.
+        """
+        key = cache_key(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.value
+                self._remove(key)
+                self.expirations += 1
+            self.misses += 1
+            generation = self._generation
+
+        tags, id_field = _dependencies(query)
+        if id_field:
+            projection, strip = _with_id(query.projection, id_field)
+            docs = replace(query, projection=projection).run(db)
+            tags |= {("doc", query.collection, d.get(id_field)) for d in docs}
+            if strip:
+                for d in docs:
+                    d.pop(id_field, None)
+        else:
+            docs = query.run(db)
+
+        with self._lock:
+            if generation == self._generation:
+                self._store(key, docs, tags)
+        return docs
+
+    def _store(self, key, value, tags):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _Entry(value, self.clock() + self.ttl, tags)
+        for tag in tags:
+            self._by_tag.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        for tag in entry.tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+    # --- invalidation ---
+
+    def _invalidate(self, match):
+        with self._lock:
+            self._generation += 1
+            keys = set()
+            for tag in [t for t in self._by_tag if match(t)]:
+                keys |= self._by_tag[tag]
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def invalidate_collection(self, collection):
+        """Drop every entry that depends on ``collection`` (e.g. after an insert)."""
+        return self._invalidate(lambda tag: tag[1] == collection)
+
+    def on_write(self, collection, doc_id=None, update=None):
+        """Invalidate after a write to one document of ``collection``.
+
+        ``doc_id`` is the business key (``courseId``, ``userId``, ...).  With no
+        ``doc_id`` (inserts, multi-document writes) the whole collection is
+        invalidated.  ``update`` limits field-based invalidation to the paths
+        it modifies; omit it for deletes, which cannot add new matches.
+        """
+        if doc_id is None:
+            return self.invalidate_collection(collection)
+        fields = changed_fields(update) if update is not None else set()
+
+        def match(tag):
+            if tag[1] != collection:
+                return False
+            if tag[0] == "*" or (tag[0] == "doc" and tag[2] == doc_id):
+                return True
+            if tag[0] == "field":
+                return fields is None or any(_overlaps(tag[2], f) for f in fields)
+            return False
+        return self._invalidate(match)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._by_tag.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxEntries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": self.hits / lookups if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+default_cache = QueryCache()
+
+
+# --- cached catalog reads ---
+
+def published_courses_with_instructor(db, cache=default_cache):
+    return cache.get_or_run(db, QUERIES_BY_NAME["course_with_instructor"])
+
+
+def courses_in_category(db, category, cache=default_cache):
+    return cache.get_or_run(db, NamedQuery("courses_in_category", "courses",
+                                           filter={"category": category}, projection={"_id": 0}))
+
+
+def courses_with_tags(db, tags, cache=default_cache):
+    return cache.get_or_run(db, NamedQuery("courses_with_tags", "courses",
+                                           filter={"tags": {"$in": sorted(tags)}},
+                                           projection={"_id": 0, "title": 1}))
+
+
+def search_titles(db, text, cache=default_cache):
+    """Case-insensitive partial title match, as in Task 3.2."""
+    return cache.get_or_run(db, NamedQuery("search_titles", "courses",
+                                           filter={"title": {"$regex": re.escape(text), "$options": "i"}},
+                                           projection={"_id": 0}))
@@ -0,0 +1,51 @@
+"""Connection settings shared by the EduHub modules.
+
+Values come from environment variables so the same code can point at a local
+``mongod`` during development and at a bigger deployment for load tests.
+"""
+
+import os
+
+MONGO_URI = os.environ.get("EDUHUB_MONGO_URI", "mongodb://localhost:27017/")
+DB_NAME = os.environ.get("EDUHUB_DB_NAME", "eduhub_db")
+
+# Embed instructor/course/student summaries into courses and enrollments on
+# write (see eduhub.denormalize).
+DENORMALIZED = os.environ.get("EDUHUB_DENORMALIZED", "0") == "1"
+
+# Record submissions and progress changes made through eduhub.counters as
+# learner-activity events (see eduhub.activity).
+RECORD_ACTIVITY = os.environ.get("EDUHUB_RECORD_ACTIVITY", "1") == "1"
+
+# Where exports (sample_data.json, NDJSON/BSON/Parquet dumps) are written.
+DATA_DIR = os.environ.get(
+    "EDUHUB_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, "data"),
+)
+
+
+def _int(name, default=None):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+# MongoClient tuning (see eduhub.connection).  Unset values keep the driver
+# defaults.
+MAX_POOL_SIZE = _int("EDUHUB_MAX_POOL_SIZE", 100)
+MIN_POOL_SIZE = _int("EDUHUB_MIN_POOL_SIZE", 0)
+MAX_IDLE_TIME_MS = _int("EDUHUB_MAX_IDLE_TIME_MS")
+WAIT_QUEUE_TIMEOUT_MS = _int("EDUHUB_WAIT_QUEUE_TIMEOUT_MS")
+CONNECT_TIMEOUT_MS = _int("EDUHUB_CONNECT_TIMEOUT_MS")
+SERVER_SELECTION_TIMEOUT_MS = _int("EDUHUB_SERVER_SELECTION_TIMEOUT_MS")
+SOCKET_TIMEOUT_MS = _int("EDUHUB_SOCKET_TIMEOUT_MS")
+# Comma-separated, in order of preference, e.g. "zstd,snappy,zlib"
+# (zstd and snappy need the zstandard / python-snappy packages).
+COMPRESSORS = os.environ.get("EDUHUB_COMPRESSORS", "")
+# primary, primaryPreferred, secondary, secondaryPreferred or nearest.
+READ_PREFERENCE = os.environ.get("EDUHUB_READ_PREFERENCE", "")
+APP_NAME = os.environ.get("EDUHUB_APP_NAME", "eduhub")
+
+# Command monitoring (see eduhub.monitoring): attach the latency/slow-query
+# listeners to the shared client, and the threshold for the slow-query log.
+MONITORING = os.environ.get("EDUHUB_MONITORING", "0") == "1"
+SLOW_QUERY_MS = float(os.environ.get("EDUHUB_SLOW_QUERY_MS", "100"))
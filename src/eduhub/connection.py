@@ -0,0 +1,72 @@
+"""The process-wide MongoDB client.
+
+``get_client()`` creates one ``MongoClient`` on first use and returns it from
+then on; every module and CLI shares its connection pool.  The client is
+built with ``connect=False``, so importing the package or creating the
+client does no network I/O: the first connection is opened by the first
+operation.  Pool size, timeouts, compression and read preference come from
+``eduhub.config`` (``EDUHUB_*`` environment variables); with monitoring
+enabled the ``eduhub.monitoring`` listeners are attached.
+
+A forked child (e.g. a ``ProcessPoolExecutor`` worker) gets its own client
+on first use instead of reusing the parent's sockets.
+"""
+
+import os
+import threading
+
+from pymongo import MongoClient
+
+from eduhub import config
+
+_client = None
+_pid = None
+_lock = threading.Lock()
+
+
+def client_options(**overrides):
+    """``MongoClient`` keyword arguments from the configuration, plus ``overrides``."""
+    options = {
+        "maxPoolSize": config.MAX_POOL_SIZE,
+        "minPoolSize": config.MIN_POOL_SIZE,
+        "maxIdleTimeMS": config.MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": config.WAIT_QUEUE_TIMEOUT_MS,
+        "connectTimeoutMS": config.CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": config.SERVER_SELECTION_TIMEOUT_MS,
+        "socketTimeoutMS": config.SOCKET_TIMEOUT_MS,
+        "compressors": config.COMPRESSORS or None,
+        "readPreference": config.READ_PREFERENCE or None,
+        "appname": config.APP_NAME,
+    }
+    options.update(overrides)
+    return {k: v for k, v in options.items() if v is not None}
+
+
+def get_client():
+    """The shared client, created lazily (and again after a fork)."""
+    global _client, _pid
+    if _client is None or _pid != os.getpid():
+        from eduhub import monitoring  # imports this module
+
+        # Resolved outside _lock: listener setup may call back into this module.
+        listeners = monitoring.listeners()
+        with _lock:
+            if _client is None or _pid != os.getpid():
+                _client = MongoClient(config.MONGO_URI, connect=False, event_listeners=listeners,
+                                      **client_options())
+                _pid = os.getpid()
+    return _client
+
+
+def get_db(name=None):
+    """A database handle on the shared client (no round trip)."""
+    return get_client()[name or config.DB_NAME]
+
+
+def close():
+    """Close the shared client; the next ``get_client()`` opens a new one."""
+    global _client
+    with _lock:
+        if _client is not None and _pid == os.getpid():
+            _client.close()
+        _client = None
@@ -0,0 +1,352 @@
+"""Enrollment and submission writes that keep aggregate counters current.
+
+Every write through this module also applies ``$inc`` updates to counter
+documents in the ``counters`` collection, one per course, instructor and
+student::
+
+    {"_id": "course:c001", "kind": "course", "key": "c001",
+     "enrollments": 2, "completed": 0, "revenue": 99.98,
+     "gradeSum": 179.0, "gradeCount": 2}
+
+All three counters touched by a write go out in a single ``bulk_write``, and
+with ``use_transaction=True`` (replica set required) the source write and the
+counter update commit atomically.  Completion rates and average grades are
+then single-document reads instead of a full aggregation.
+
+``revenue`` adds the course price at enrollment time, which ``enroll``
+stores on the enrollment as ``pricePaid``; ``unenroll`` and ``reconcile`` use
+that stored price, so later price changes do not make the counters drift.
+Enrollments written elsewhere without ``pricePaid`` fall back to the current
+course price, which is also what the Part 4 ``instructor_stats`` pipeline
+sums.  ``reconcile`` recomputes every counter from the source collections and
+reports (or fixes) any drift, e.g. after writes that bypassed this module or
+a crash between the two writes.
+"""
+
+import argparse
+import numbers
+import threading
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from eduhub import activity, config, connection, denormalize
+from eduhub.workload import IndexSpec
+
+COUNTERS = "counters"
+KINDS = {"course": "courseId", "instructor": "instructorId", "student": "studentId"}
+FIELDS = ["enrollments", "completed", "revenue", "gradeSum", "gradeCount"]
+
+# Point lookups done on every write.
+INDEXES = [
+    IndexSpec("enrollments", [("enrollmentId", 1)]),
+    IndexSpec("submissions", [("submissionId", 1)]),
+    IndexSpec("assignments", [("assignmentId", 1)]),
+    IndexSpec("courses", [("courseId", 1)]),
+]
+
+
+def ensure_indexes(db):
+    for spec in INDEXES:
+        spec.create(db)
+
+
+def counter_id(kind, key):
+    return f"{kind}:{key}"
+
+
+def _inc_ops(keys, inc):
+    """One upserting ``$inc`` per counter; ``keys`` maps kind -> key."""
+    inc = {f: v for f, v in inc.items() if v}
+    if not inc:
+        return []
+    return [
+        UpdateOne({"_id": counter_id(kind, key)},
+                  {"$inc": inc, "$setOnInsert": {"kind": kind, "key": key}}, upsert=True)
+        for kind, key in keys.items() if key is not None
+    ]
+
+
+def _course(db, course_id, session):
+    return db.courses.find_one({"courseId": course_id}, {"_id": 0, "instructorId": 1, "price": 1},
+                               session=session) or {}
+
+
+def _course_of_assignment(db, assignment_id, session):
+    assignment = db.assignments.find_one({"assignmentId": assignment_id}, {"_id": 0, "courseId": 1},
+                                         session=session) or {}
+    course_id = assignment.get("courseId")
+    return course_id, _course(db, course_id, session) if course_id else {}
+
+
+# Transaction attempts beyond the first in this thread: write conflicts and
+# other transient errors that ``with_transaction`` retried (see eduhub.loadtest).
+_retries = threading.local()
+
+
+def transaction_retries():
+    return getattr(_retries, "count", 0)
+
+
+def _run(db, op, use_transaction):
+    if not use_transaction:
+        return op(None)
+    attempts = 0
+
+    def attempt(session):
+        nonlocal attempts
+        attempts += 1
+        if attempts > 1:
+            _retries.count = transaction_retries() + 1
+        return op(session)
+    with db.client.start_session() as session:
+        return session.with_transaction(attempt)
+
+
+def _apply(db, ops, session):
+    if ops:
+        db[COUNTERS].bulk_write(ops, ordered=False, session=session)
+
+
+def apply_deltas(db, deltas, session=None):
+    """Apply precomputed ``{(kind, key): {field: delta}}`` counter changes in one batch."""
+    _apply(db, [op for (kind, key), inc in deltas.items() for op in _inc_ops({kind: key}, inc)], session)
+
+
+# --- enrollments ---
+
+def enroll(db, enrollment, use_transaction=False):
+    """Insert an enrollment and count it for its course, instructor and student."""
+    if config.DENORMALIZED:
+        enrollment = denormalize.embed_enrollment(db, enrollment)
+
+    def op(session):
+        course = _course(db, enrollment["courseId"], session)
+        enrollment.setdefault("pricePaid", course.get("price") or 0)
+        result = db.enrollments.insert_one(enrollment, session=session)
+        keys = {"course": enrollment["courseId"], "instructor": course.get("instructorId"),
+                "student": enrollment["studentId"]}
+        _apply(db, _inc_ops(keys, {"enrollments": 1,
+                                   "completed": int(bool(enrollment.get("isCompleted"))),
+                                   "revenue": enrollment["pricePaid"]}), session)
+        return result
+    return _run(db, op, use_transaction)
+
+
+def _price_paid(enrollment, course):
+    price = enrollment.get("pricePaid")
+    return price if price is not None else course.get("price") or 0
+
+
+def unenroll(db, enrollment_id, use_transaction=False):
+    """Delete an enrollment and take it back out of the counters."""
+    def op(session):
+        removed = db.enrollments.find_one_and_delete({"enrollmentId": enrollment_id}, session=session)
+        if removed is None:
+            return None
+        course = _course(db, removed["courseId"], session)
+        keys = {"course": removed["courseId"], "instructor": course.get("instructorId"),
+                "student": removed["studentId"]}
+        _apply(db, _inc_ops(keys, {"enrollments": -1,
+                                   "completed": -int(bool(removed.get("isCompleted"))),
+                                   "revenue": -_price_paid(removed, course)}), session)
+        return removed
+    return _run(db, op, use_transaction)
+
+
+def set_progress(db, enrollment_id, progress, is_completed=None, use_transaction=False):
+    """Update progress (and optionally completion); adjusts ``completed`` if it flipped."""
+    update = {"progress": float(progress), "updatedAt": datetime.now()}
+    if is_completed is not None:
+        update["isCompleted"] = bool(is_completed)
+
+    def op(session):
+        before = db.enrollments.find_one_and_update({"enrollmentId": enrollment_id}, {"$set": update},
+                                                    session=session)
+        if before is None or is_completed is None:
+            return before
+        delta = int(bool(is_completed)) - int(bool(before.get("isCompleted")))
+        if delta:
+            course = _course(db, before["courseId"], session)
+            keys = {"course": before["courseId"], "instructor": course.get("instructorId"),
+                    "student": before["studentId"]}
+            _apply(db, _inc_ops(keys, {"completed": delta}), session)
+        return before
+
+    def recorded(session):
+        before = op(session)
+        if before is not None and config.RECORD_ACTIVITY:
+            activity.record(db, [activity.event(before["studentId"], before["courseId"], "progress",
+                                                update["updatedAt"], progress=update["progress"])],
+                            session=session)
+        return before
+    return _run(db, recorded, use_transaction)
+
+
+# --- submissions ---
+
+def _grade_keys(db, submission, session, course_of=None):
+    course_id, course = course_of or _course_of_assignment(db, submission["assignmentId"], session)
+    return {"course": course_id, "instructor": course.get("instructorId"), "student": submission["studentId"]}
+
+
+def submit(db, submission, use_transaction=False):
+    """Insert a submission; a grade already present is counted immediately."""
+    def op(session):
+        result = db.submissions.insert_one(submission, session=session)
+        grade = submission.get("grade")
+        numeric = isinstance(grade, numbers.Real) and not isinstance(grade, bool)
+        if not (numeric or config.RECORD_ACTIVITY):
+            return result
+        course_of = _course_of_assignment(db, submission["assignmentId"], session)
+        # Like reconcile, count numeric grades only (without a validator anything gets in).
+        if numeric:
+            _apply(db, _inc_ops(_grade_keys(db, submission, session, course_of),
+                                {"gradeSum": grade, "gradeCount": 1}), session)
+        if config.RECORD_ACTIVITY and course_of[0]:
+            activity.record(db, [activity.event(submission["studentId"], course_of[0], "assignment_submitted",
+                                                submission.get("submissionDate"),
+                                                assignment_id=submission["assignmentId"])], session=session)
+        return result
+    return _run(db, op, use_transaction)
+
+
+def grade(db, submission_id, grade, feedback=None, use_transaction=False):
+    """Set a submission's grade; counters move by the difference to the old grade."""
+    update = {"grade": float(grade), "updatedAt": datetime.now()}
+    if feedback is not None:
+        update["feedback"] = feedback
+
+    def op(session):
+        before = db.submissions.find_one_and_update({"submissionId": submission_id}, {"$set": update},
+                                                    session=session)
+        if before is None:
+            return None
+        old = before.get("grade")
+        inc = {"gradeSum": update["grade"] - (old or 0), "gradeCount": 0 if old is not None else 1}
+        _apply(db, _inc_ops(_grade_keys(db, before, session), inc), session)
+        return before
+    return _run(db, op, use_transaction)
+
+
+# --- reads ---
+
+def get_counters(db, kind, key):
+    return db[COUNTERS].find_one({"_id": counter_id(kind, key)}) or {}
+
+
+def completion_rate(db, course_id):
+    """Percentage of completed enrollments for a course, or None without enrollments."""
+    c = get_counters(db, "course", course_id)
+    return 100.0 * c.get("completed", 0) / c["enrollments"] if c.get("enrollments") else None
+
+
+def average_grade(db, kind, key):
+    c = get_counters(db, kind, key)
+    return c.get("gradeSum", 0) / c["gradeCount"] if c.get("gradeCount") else None
+
+
+# --- reconciliation ---
+
+def _facts_pipeline():
+    """One row per enrollment and per graded submission, tagged with all keys."""
+    zero = {"$literal": 0}
+    return [
+        {"$lookup": {"from": "courses", "localField": "courseId", "foreignField": "courseId", "as": "c"}},
+        {"$unwind": {"path": "$c", "preserveNullAndEmptyArrays": True}},
+        {"$project": {"_id": 0, "studentId": 1, "courseId": 1, "instructorId": "$c.instructorId",
+                      "enrollments": {"$literal": 1},
+                      "completed": {"$cond": [{"$eq": ["$isCompleted", True]}, 1, 0]},
+                      "revenue": {"$ifNull": ["$pricePaid", {"$ifNull": ["$c.price", 0]}]},
+                      "gradeSum": zero, "gradeCount": zero}},
+        {"$unionWith": {"coll": "submissions", "pipeline": [
+            {"$match": {"grade": {"$type": "number"}}},
+            {"$lookup": {"from": "assignments", "localField": "assignmentId", "foreignField": "assignmentId",
+                         "as": "a"}},
+            {"$unwind": {"path": "$a", "preserveNullAndEmptyArrays": True}},
+            {"$lookup": {"from": "courses", "localField": "a.courseId", "foreignField": "courseId", "as": "c"}},
+            {"$unwind": {"path": "$c", "preserveNullAndEmptyArrays": True}},
+            {"$project": {"_id": 0, "studentId": 1, "courseId": "$a.courseId", "instructorId": "$c.instructorId",
+                          "enrollments": zero, "completed": zero, "revenue": zero,
+                          "gradeSum": "$grade", "gradeCount": {"$literal": 1}}},
+        ]}},
+    ]
+
+
+def expected_counters(db, kind):
+    """Stream the counters of ``kind`` recomputed from the source collections."""
+    field = KINDS[kind]
+    pipeline = _facts_pipeline() + [
+        {"$match": {field: {"$ne": None}}},
+        {"$group": dict({"_id": f"${field}"}, **{f: {"$sum": f"${f}"} for f in FIELDS})},
+    ]
+    for doc in db.enrollments.aggregate(pipeline, allowDiskUse=True):
+        key = doc.pop("_id")
+        yield dict(doc, _id=counter_id(kind, key), kind=kind, key=key)
+
+
+def _differs(stored, expected, tolerance=1e-6):
+    return any(abs((stored.get(f) or 0) - (expected.get(f) or 0)) > tolerance for f in FIELDS)
+
+
+def reconcile(db, fix=False, batch_size=1000, sample=10):
+    """Compare every counter with a full recompute.
+
+    Returns ``{kind: {"checked": n, "mismatched": n, "examples": [...],
+    "stale": [...]}}`` with up to ``sample`` mismatches as examples;
+    ``stale`` lists counters whose key no longer has any source data.  With
+    ``fix=True`` mismatches are overwritten and stale counters removed.
+    """
+    report = {}
+    for kind in KINDS:
+        checked, mismatched, examples, seen = 0, 0, [], set()
+        batch = []
+
+        def flush():
+            nonlocal mismatched
+            stored = {d["_id"]: d for d in db[COUNTERS].find({"_id": {"$in": [e["_id"] for e in batch]}})}
+            ops = []
+            for exp in batch:
+                if _differs(stored.get(exp["_id"], {}), exp):
+                    mismatched += 1
+                    if len(examples) < sample:
+                        examples.append({"_id": exp["_id"], "stored": {f: stored.get(exp["_id"], {}).get(f)
+                                                                       for f in FIELDS},
+                                         "expected": {f: exp[f] for f in FIELDS}})
+                    ops.append(UpdateOne({"_id": exp["_id"]}, {"$set": exp}, upsert=True))
+            if fix and ops:
+                db[COUNTERS].bulk_write(ops, ordered=False)
+            batch.clear()
+
+        for expected in expected_counters(db, kind):
+            seen.add(expected["_id"])
+            batch.append(expected)
+            checked += 1
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+
+        stale = [d["_id"] for d in db[COUNTERS].find({"kind": kind}, {"_id": 1}) if d["_id"] not in seen]
+        if fix and stale:
+            db[COUNTERS].delete_many({"_id": {"$in": stale}})
+        report[kind] = {"checked": checked, "mismatched": mismatched, "examples": examples, "stale": stale}
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check EduHub counters against a full recompute.")
+    parser.add_argument("--fix", action="store_true", help="overwrite drifted counters")
+    args = parser.parse_args(argv)
+
+    db = connection.get_db()
+    ensure_indexes(db)
+    for kind, result in reconcile(db, fix=args.fix).items():
+        print(f"{kind}: {result['checked']} checked, {result['mismatched']} mismatched, "
+              f"{len(result['stale'])} stale")
+        for m in result["examples"]:
+            print("  ", m)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+"""Scalable synthetic data for the EduHub collections.
+
+Every document is a pure function of its collection, its position and the
+seed, so any worker can generate any slice of any collection without seeing
+the others and the cross references (``studentId``, ``courseId``,
+``instructorId``, ``assignmentId``) still line up.  Identifiers follow the
+format of the hand-written sample data (``stu001``, ``inst001``, ``c001``,
+``e001``, ``l001``, ``a001``, ``s001``), so the Part 3 queries keep working on
+generated data.
+
+Usage::
+
+    python -m eduhub.datagen --scale 100 --workers 8
+"""
+
+import argparse
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import islice
+
+from pymongo import MongoClient
+
+from eduhub import config, connection
+from eduhub.schemas import PREFIX_FIELD, title_prefixes
+
+# Documents generated per unit of scale.  scale=1 is a small but realistic
+# platform; scale=1000 is ~19M documents.
+PER_SCALE = {
+    "students": 1000,
+    "instructors": 50,
+    "courses": 200,
+}
+ENROLLMENTS_PER_STUDENT = 5
+LESSONS_PER_COURSE = 10
+ASSIGNMENTS_PER_COURSE = 3
+SUBMISSIONS_PER_ENROLLMENT = 2
+
+# Load order matters only for readers watching the database fill up; the
+# documents themselves never depend on what is already stored.
+COLLECTIONS = ["users", "courses", "enrollments", "lessons", "assignments", "submissions"]
+
+CATEGORIES = {
+    "Programming": ["Python", "Java", "Go", "Rust", "C++", "TypeScript"],
+    "Data Science": ["Pandas", "Statistics", "Machine Learning", "Deep Learning", "Data Visualization"],
+    "Web Development": ["HTML", "CSS", "JavaScript", "React", "Vue", "Node.js"],
+    "Cybersecurity": ["Network Security", "Ethical Hacking", "Cryptography", "Forensics"],
+    "Cloud Computing": ["AWS", "Azure", "Kubernetes", "Docker", "Serverless"],
+    "Database": ["MongoDB", "SQL", "Data Modeling", "Indexing"],
+}
+CATEGORY_NAMES = list(CATEGORIES)
+LEVELS = ["beginner", "intermediate", "advanced"]
+TITLE_PREFIXES = ["Intro to", "Mastering", "Practical", "Advanced", "Hands-on", "Fundamentals of"]
+FIRST_NAMES = ["Alice", "Bob", "Charlie", "David", "Eva", "Frank", "Grace", "Hank", "Ivy", "Jack",
+               "Kathy", "Leo", "Mia", "Noah", "Olivia", "Paul", "Quinn", "Rosa", "Sam", "Tina"]
+LAST_NAMES = ["Smith", "Brown", "Davis", "Evans", "Garcia", "Harris", "Johnson", "King", "Lee",
+              "Miller", "Wilson", "Martinez", "Rodriguez", "Lopez", "Clark", "Lewis"]
+FEEDBACK = ["Good work", "Excellent", "Needs improvement", "Well done", "Great job",
+            "Good effort", "Satisfactory", "Outstanding", ""]
+
+EPOCH = datetime(2024, 1, 1)
+SPAN_DAYS = 730
+
+_MASK64 = (1 << 64) - 1
+
+
+def _mix(*values):
+    """splitmix64 over ``values``: a cheap, stateless pseudo-random integer."""
+    x = 0x9E3779B97F4A7C15
+    for v in values:
+        x = (x + (v & _MASK64) + 0x9E3779B97F4A7C15) & _MASK64
+        x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+        x ^= x >> 31
+    return x
+
+
+def _unit(*values):
+    """Deterministic float in [0, 1) derived from ``values``."""
+    return _mix(*values) / 2.0 ** 64
+
+
+@dataclass(frozen=True)
+class ScalePlan:
+    """Document counts for every collection at a given scale factor."""
+
+    students: int
+    instructors: int
+    courses: int
+    seed: int = 42
+
+    @classmethod
+    def from_scale(cls, scale, seed=42):
+        counts = {k: max(1, int(round(v * scale))) for k, v in PER_SCALE.items()}
+        return cls(seed=seed, **counts)
+
+    @property
+    def users(self):
+        return self.students + self.instructors
+
+    @property
+    def enrollments(self):
+        return self.students * min(ENROLLMENTS_PER_STUDENT, self.courses)
+
+    @property
+    def lessons(self):
+        return self.courses * LESSONS_PER_COURSE
+
+    @property
+    def assignments(self):
+        return self.courses * ASSIGNMENTS_PER_COURSE
+
+    @property
+    def submissions(self):
+        return self.enrollments * SUBMISSIONS_PER_ENROLLMENT
+
+    def count(self, collection):
+        return getattr(self, collection)
+
+    def counts(self):
+        return {name: self.count(name) for name in COLLECTIONS}
+
+    # --- cross references, shared by every generator ---
+
+    def enrollments_per_student(self):
+        return min(ENROLLMENTS_PER_STUDENT, self.courses)
+
+    def enrollment_student(self, i):
+        return i // self.enrollments_per_student()
+
+    def enrollment_course(self, i):
+        # Squaring a uniform draw skews popularity towards low course numbers
+        # (a few best sellers, a long tail); consecutive offsets keep a
+        # student's courses distinct.
+        student = self.enrollment_student(i)
+        k = i % self.enrollments_per_student()
+        first = int(self.courses * _unit(self.seed, 3, student) ** 2)
+        return (first + k) % self.courses
+
+    def course_instructor(self, c):
+        return c % self.instructors
+
+    def course_category(self, c):
+        return CATEGORY_NAMES[_mix(self.seed, 5, c) % len(CATEGORY_NAMES)]
+
+
+def student_id(i):
+    return f"stu{i + 1:03d}"
+
+
+def instructor_id(i):
+    return f"inst{i + 1:03d}"
+
+
+def course_id(i):
+    return f"c{i + 1:03d}"
+
+
+def assignment_id(i):
+    return f"a{i + 1:03d}"
+
+
+def _date(rng, start=EPOCH, span_days=SPAN_DAYS):
+    return start + timedelta(days=rng.randrange(span_days), seconds=rng.randrange(86400))
+
+
+def _user(plan, i, rng):
+    if i < plan.students:
+        role, uid, email = "student", student_id(i), f"student{i + 1}@example.com"
+        category = CATEGORY_NAMES[rng.randrange(len(CATEGORY_NAMES))]
+        skills = rng.sample(CATEGORIES[category], rng.randint(1, 3))
+        bio = f"{rng.choice(['Beginner', 'Intermediate', 'Advanced'])} learner"
+        joined = _date(rng)
+    else:
+        n = i - plan.students
+        role, uid, email = "instructor", instructor_id(n), f"instructor{n + 1}@example.com"
+        category = CATEGORY_NAMES[n % len(CATEGORY_NAMES)]
+        skills = rng.sample(CATEGORIES[category], 2)
+        bio = f"Expert in {category}"
+        joined = _date(rng, EPOCH - timedelta(days=365), 365)
+    return {
+        "userId": uid,
+        "email": email,
+        "firstName": rng.choice(FIRST_NAMES),
+        "lastName": rng.choice(LAST_NAMES),
+        "role": role,
+        "dateJoined": joined,
+        "profile": {"bio": bio, "avatar": f"{uid}.jpg", "skills": skills},
+        "isActive": rng.random() < 0.95,
+    }
+
+
+def _course(plan, c, rng):
+    category = plan.course_category(c)
+    topic = rng.choice(CATEGORIES[category])
+    created = _date(rng)
+    title = f"{rng.choice(TITLE_PREFIXES)} {topic}"
+    return {
+        "courseId": course_id(c),
+        "title": title,
+        "description": f"Learn {topic} step by step",
+        "instructorId": instructor_id(plan.course_instructor(c)),
+        "category": category,
+        "level": rng.choice(LEVELS),
+        "duration": float(rng.randint(4, 40)) + 0.5 * rng.randrange(2),
+        "price": float(rng.randrange(1999, 19999)) / 100.0,
+        "tags": [t.lower() for t in rng.sample(CATEGORIES[category], 2)],
+        "createdAt": created,
+        "updatedAt": created + timedelta(days=rng.randrange(60)),
+        "isPublished": rng.random() < 0.9,
+        PREFIX_FIELD: title_prefixes(title),
+    }
+
+
+def _enrollment(plan, i, rng):
+    progress = float(rng.randrange(0, 101))
+    return {
+        "enrollmentId": f"e{i + 1:03d}",
+        "studentId": student_id(plan.enrollment_student(i)),
+        "courseId": course_id(plan.enrollment_course(i)),
+        "enrollDate": _date(rng),
+        "progress": progress,
+        "isCompleted": progress >= 85.0 and rng.random() < 0.8,
+    }
+
+
+def _lesson(plan, i, rng):
+    return {
+        "lessonId": f"l{i + 1:03d}",
+        "title": f"Lesson {i % LESSONS_PER_COURSE + 1}",
+        "courseId": course_id(i // LESSONS_PER_COURSE),
+        "content": "Sample content",
+        "order": i % LESSONS_PER_COURSE + 1,
+        "duration": float(rng.randint(1, 4)) / 2.0,
+    }
+
+
+def _assignment(plan, i, rng):
+    return {
+        "assignmentId": assignment_id(i),
+        "title": f"Assignment {i % ASSIGNMENTS_PER_COURSE + 1}",
+        "courseId": course_id(i // ASSIGNMENTS_PER_COURSE),
+        "dueDate": _date(rng),
+        "maxScore": 100.0,
+    }
+
+
+def _submission(plan, i, rng):
+    enrollment = i // SUBMISSIONS_PER_ENROLLMENT
+    k = i % SUBMISSIONS_PER_ENROLLMENT
+    course = plan.enrollment_course(enrollment)
+    return {
+        "submissionId": f"s{i + 1:03d}",
+        "studentId": student_id(plan.enrollment_student(enrollment)),
+        "assignmentId": assignment_id(course * ASSIGNMENTS_PER_COURSE + k % ASSIGNMENTS_PER_COURSE),
+        "submissionDate": _date(rng),
+        "fileUrl": f"submit{i + 1}.pdf",
+        "grade": float(rng.randint(40, 100)),
+        "feedback": rng.choice(FEEDBACK),
+    }
+
+
+_BUILDERS = {
+    "users": _user,
+    "courses": _course,
+    "enrollments": _enrollment,
+    "lessons": _lesson,
+    "assignments": _assignment,
+    "submissions": _submission,
+}
+
+
+def iter_documents(plan, collection, start=0, stop=None):
+    """Yield the documents of ``collection`` with positions in ``[start, stop)``."""
+    stop = plan.count(collection) if stop is None else min(stop, plan.count(collection))
+    build = _BUILDERS[collection]
+    salt = COLLECTIONS.index(collection)
+    rng = random.Random()
+    for i in range(start, stop):
+        # Reseeded per document so the output does not depend on how the range is chunked.
+        rng.seed(_mix(plan.seed, salt, i))
+        yield build(plan, i, rng)
+
+
+def iter_batches(documents, batch_size):
+    """Group an iterable of documents into lists of at most ``batch_size``."""
+    it = iter(documents)
+    while True:
+        batch = list(islice(it, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def insert_stream(coll, documents, batch_size=1000):
+    """Insert ``documents`` in unordered batches; returns the number inserted."""
+    inserted = 0
+    for batch in iter_batches(documents, batch_size):
+        inserted += len(coll.insert_many(batch, ordered=False).inserted_ids)
+    return inserted
+
+
+# --- worker pool ---
+
+_worker_client = None
+
+
+def _init_worker(uri):
+    """Per-process client for pool workers (a forked child must not reuse the parent's)."""
+    global _worker_client
+    _worker_client = MongoClient(uri, **connection.client_options())
+
+
+def _client_for(uri):
+    """The shared client for the configured server, a dedicated one otherwise (caller closes it)."""
+    if uri == config.MONGO_URI:
+        return connection.get_client(), False
+    return MongoClient(uri, **connection.client_options()), True
+
+
+def _load_chunk(uri, db_name, plan, collection, start, stop, batch_size, client=None):
+    client = client or _worker_client
+    docs = iter_documents(plan, collection, start, stop)
+    return collection, insert_stream(client[db_name][collection], docs, batch_size)
+
+
+def load(scale=1, uri=None, db_name=None, workers=None, batch_size=1000,
+         chunk_size=50_000, collections=None, seed=42, use_threads=False):
+    """Generate and insert a dataset of the given scale.
+
+    Each collection is cut into ``chunk_size`` ranges that are generated and
+    inserted by a pool of ``workers`` (processes by default, threads when
+    ``use_threads`` is set, in-process when ``workers`` is 0).  A worker holds
+    one batch at a time, so memory stays flat regardless of scale.
+    Returns the number of documents inserted per collection.
+    """
+    uri = uri or config.MONGO_URI
+    db_name = db_name or config.DB_NAME
+    plan = ScalePlan.from_scale(scale, seed=seed)
+    collections = collections or COLLECTIONS
+    workers = os.cpu_count() if workers is None else workers
+
+    tasks = [
+        (uri, db_name, plan, name, start, min(start + chunk_size, plan.count(name)), batch_size)
+        for name in collections
+        for start in range(0, plan.count(name), chunk_size)
+    ]
+    totals = dict.fromkeys(collections, 0)
+
+    if workers == 0 or use_threads:
+        # MongoClient is thread-safe; threads share one pool of connections.
+        client, owned = _client_for(uri)
+        try:
+            if workers == 0:
+                for task in tasks:
+                    name, n = _load_chunk(*task, client=client)
+                    totals[name] += n
+                return totals
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_load_chunk, *task, client=client) for task in tasks]
+                for future in as_completed(futures):
+                    name, n = future.result()
+                    totals[name] += n
+            return totals
+        finally:
+            if owned:
+                client.close()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(uri,)) as executor:
+        futures = [executor.submit(_load_chunk, *task) for task in tasks]
+        for future in as_completed(futures):
+            name, n = future.result()
+            totals[name] += n
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load synthetic EduHub data.")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--uri", default=None)
+    parser.add_argument("--db", default=None)
+    parser.add_argument("--drop", action="store_true", help="empty the collections first")
+    args = parser.parse_args(argv)
+
+    if args.drop:
+        db = MongoClient(args.uri, **connection.client_options())[args.db or config.DB_NAME] if args.uri \
+            else connection.get_db(args.db)
+        for name in COLLECTIONS:
+            db[name].delete_many({})
+
+    print("Planned counts:", ScalePlan.from_scale(args.scale, args.seed).counts())
+    totals = load(args.scale, uri=args.uri, db_name=args.db, workers=args.workers,
+                  batch_size=args.batch_size, seed=args.seed)
+    print("Inserted:", totals)
+
+
+if __name__ == "__main__":
+    main()
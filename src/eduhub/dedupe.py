@@ -0,0 +1,225 @@
+"""Duplicate-email cleanup for ``users``, ahead of the unique email index.
+
+The Part 5 cleanup ``$push``es every ``_id`` of every email into one
+aggregation result and then deletes group by group.  On a large collection
+that runs into the 100 MB stage limit and spends most of its time on round
+trips.  Here:
+
+* emails are normalized (trimmed, lowercased) before grouping, so
+  ``" Alice@Example.com"`` and ``"alice@example.com"`` count as duplicates;
+* the grouping only counts users and collects the few raw spellings of each
+  email, with ``allowDiskUse``, and streams the duplicate groups in email
+  order;
+* the members of a batch of groups are fetched through a temporary email
+  index, the survivor of each group is chosen by ``rule``, and the losers
+  are deleted with unordered ``bulk_write`` batches, each followed by a
+  batch normalizing the survivors' emails;
+* progress is checkpointed in ``dedupe_state`` after every batch, so an
+  interrupted run resumes after the last email it finished.
+
+Run with ``dry_run=True`` first: apart from the temporary index nothing is
+written, and the report lists the groups and the users that would be
+removed.  References to removed users (``enrollments.studentId``, ...) are
+not rewritten.
+
+Usage::
+
+    python -m eduhub.dedupe --dry-run
+    python -m eduhub.dedupe --rule earliest_joined --create-index
+"""
+
+import argparse
+from datetime import datetime
+
+from pymongo import DeleteOne, UpdateOne
+
+from eduhub import connection
+
+STATE_COLLECTION = "dedupe_state"
+JOB_ID = "users.email"
+HELPER_INDEX = "email_dedupe"
+
+_MAX = datetime.max
+
+
+def _joined(user):
+    return user.get("dateJoined") or _MAX
+
+
+# Survivor rules: the member with the smallest key is kept.
+RULES = {
+    "earliest_joined": lambda u: (_joined(u), u["_id"]),
+    "latest_joined": lambda u: (-_joined(u).timestamp() if u.get("dateJoined") else 0, u["_id"]),
+    "first_inserted": lambda u: u["_id"],
+    "active_first": lambda u: (not u.get("isActive", False), _joined(u), u["_id"]),
+}
+
+
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+def normalize_email(email):
+    """Trim and lowercase ASCII letters only, like the server's ``$trim``/``$toLower``."""
+    return email.strip().translate(_ASCII_LOWER) if isinstance(email, str) else email
+
+
+def duplicate_groups_pipeline(after=None):
+    """Duplicate groups ``{_id: normalized email, count, variants}`` in email order."""
+    match = {"count": {"$gt": 1}}
+    if after is not None:
+        match["_id"] = {"$gt": after}
+    return [
+        {"$match": {"email": {"$type": "string"}}},
+        {"$group": {
+            "_id": {"$toLower": {"$trim": {"input": "$email"}}},
+            "count": {"$sum": 1},
+            "variants": {"$addToSet": "$email"},
+        }},
+        {"$match": match},
+        {"$sort": {"_id": 1}},
+    ]
+
+
+def _load_state(db):
+    return db[STATE_COLLECTION].find_one({"_id": JOB_ID}) or {}
+
+
+def _save_state(db, **fields):
+    db[STATE_COLLECTION].update_one({"_id": JOB_ID}, {"$set": fields}, upsert=True)
+
+
+def reset(db):
+    """Forget the checkpoint so the next run starts from the first email."""
+    db[STATE_COLLECTION].delete_one({"_id": JOB_ID})
+
+
+def _email_index(db):
+    """Name of an index on ``email``, creating the temporary helper if there is none."""
+    for name, info in db.users.index_information().items():
+        if info["key"] == [("email", 1)]:
+            return name
+    return db.users.create_index("email", name=HELPER_INDEX)
+
+
+def _resolve(db, groups, rule, normalize, index):
+    """Members of ``groups`` -> (deletes, normalizing updates, per-group report entries)."""
+    # Members are keyed by the group the server put their spelling in, so the
+    # grouping key is never recomputed client-side.
+    group_of = {v: g["_id"] for g in groups for v in g["variants"]}
+    members = {}
+    for user in db.users.find({"email": {"$in": list(group_of)}},
+                              {"email": 1, "userId": 1, "dateJoined": 1, "isActive": 1}).hint(index):
+        members.setdefault(group_of[user["email"]], []).append(user)
+
+    deletes, updates, entries = [], [], []
+    for group in groups:
+        users = sorted(members.get(group["_id"], []), key=rule)
+        if len(users) < 2:
+            continue  # resolved since the grouping ran
+        survivor, losers = users[0], users[1:]
+        deletes.extend(DeleteOne({"_id": u["_id"]}) for u in losers)
+        if normalize and survivor["email"] != group["_id"]:
+            updates.append(UpdateOne({"_id": survivor["_id"]}, {"$set": {"email": group["_id"]}}))
+        entries.append({"email": group["_id"], "keep": survivor.get("userId", survivor["_id"]),
+                        "remove": [u.get("userId", u["_id"]) for u in losers]})
+    return deletes, updates, entries
+
+
+def run(db, rule="earliest_joined", dry_run=False, group_batch=500, write_batch=5000,
+        normalize=True, resume=True, sample=20):
+    """Remove duplicate users, keeping one per normalized email.
+
+    ``rule`` is a name from ``RULES`` or a key function over user documents
+    (smallest key survives).  With ``normalize`` the survivor's email is
+    rewritten to its normalized form so the unique index sees one spelling.
+    Returns a report with counts and up to ``sample`` example groups.
+    """
+    key = RULES[rule] if isinstance(rule, str) else rule
+    state = _load_state(db) if resume and not dry_run else {}
+    after = None if state.get("finishedAt") else state.get("lastEmail")
+    report = {"dryRun": dry_run, "rule": rule if isinstance(rule, str) else getattr(rule, "__name__", "custom"),
+              "resumedAfter": after, "groups": 0, "removed": 0, "normalized": 0, "examples": []}
+
+    index = _email_index(db)
+    if not dry_run:
+        _save_state(db, startedAt=datetime.now(), finishedAt=None, rule=report["rule"])
+
+    deletes, updates, groups = [], [], []
+
+    def flush_writes():
+        # Losers go first, in their own batch: one of them may hold the exact
+        # normalized spelling, and a unique email index would reject the
+        # survivor's $set while it exists.  (Unordered bulk writes send
+        # updates before deletes.)
+        if not dry_run:
+            if deletes:
+                db.users.bulk_write(deletes, ordered=False)
+            if updates:
+                report["normalized"] += db.users.bulk_write(updates, ordered=False).modified_count
+        elif updates:
+            report["normalized"] += len(updates)
+        deletes.clear()
+        updates.clear()
+
+    def resolve_groups():
+        batch_deletes, batch_updates, entries = _resolve(db, groups, key, normalize, index)
+        report["groups"] += len(entries)
+        report["removed"] += sum(len(e["remove"]) for e in entries)
+        room = sample - len(report["examples"])
+        report["examples"].extend(entries[:max(room, 0)])
+        deletes.extend(batch_deletes)
+        updates.extend(batch_updates)
+        if len(deletes) + len(updates) >= write_batch:
+            flush_writes()
+        if not dry_run and not deletes and not updates:
+            # Everything up to this email is written; safe to resume after it.
+            _save_state(db, lastEmail=groups[-1]["_id"])
+        groups.clear()
+
+    cursor = db.users.aggregate(duplicate_groups_pipeline(after), allowDiskUse=True, batchSize=group_batch)
+    for group in cursor:
+        groups.append(group)
+        if len(groups) == group_batch:
+            resolve_groups()
+    if groups:
+        resolve_groups()
+    flush_writes()
+    if not dry_run:
+        _save_state(db, finishedAt=datetime.now(), lastEmail=None)
+    return report
+
+
+def create_unique_index(db):
+    """Replace the non-unique email index (the helper or a plain one) with a unique one."""
+    for name, info in db.users.index_information().items():
+        if info["key"] == [("email", 1)] and not info.get("unique"):
+            db.users.drop_index(name)
+    return db.users.create_index("email", unique=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Remove users with duplicate (normalized) emails.")
+    parser.add_argument("--rule", choices=sorted(RULES), default="earliest_joined")
+    parser.add_argument("--dry-run", action="store_true", help="report only, write nothing")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint")
+    parser.add_argument("--keep-emails", action="store_true", help="do not normalize survivors' emails")
+    parser.add_argument("--group-batch", type=int, default=500)
+    parser.add_argument("--write-batch", type=int, default=5000)
+    parser.add_argument("--create-index", action="store_true", help="create the unique email index afterwards")
+    args = parser.parse_args(argv)
+
+    db = connection.get_db()
+    if args.restart:
+        reset(db)
+    report = run(db, args.rule, args.dry_run, args.group_batch, args.write_batch, not args.keep_emails)
+    verb = "would remove" if args.dry_run else "removed"
+    print(f"{report['groups']} duplicate emails, {verb} {report['removed']} users, "
+          f"{report['normalized']} emails normalized")
+    for entry in report["examples"]:
+        print(f"  {entry['email']:<40} keep {entry['keep']}, remove {', '.join(map(str, entry['remove']))}")
+    if args.create_index and not args.dry_run:
+        print("created", create_unique_index(db))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Denormalized read models for the hot catalog and roster reads.
+
+In embedding mode each course carries a summary of its instructor and each
+enrollment a summary of its course and student::
+
+    courses:     {..., "instructor": {"firstName", "lastName", "email"}}
+    enrollments: {..., "course": {"title", "category", "price"},
+                       "student": {"firstName", "lastName", "email"}}
+
+so ``course_with_instructor``, ``enrolled_in_c001`` and ``popular_cats`` run
+on a single collection without ``$lookup``.  The copies are kept current by
+``update_user`` and ``update_course``, which fan changes to summary fields out
+to the embedding documents with bulk ``UpdateMany`` writes.  These functions
+(and ``insert_user``/``insert_course``) also invalidate the catalog cache.  Fan-out only
+touches documents that already carry a summary, so calling them is safe
+whether or not ``backfill`` has run.
+
+Usage::
+
+    python -m eduhub.denormalize backfill
+    python -m eduhub.denormalize compare --iterations 50
+"""
+
+import argparse
+
+from pymongo import UpdateMany
+
+from eduhub import config, connection
+from eduhub.benchmark import time_query
+from eduhub.cache import default_cache
+from eduhub.search import prefix_update, with_prefixes
+from eduhub.workload import QUERIES_BY_NAME, IndexSpec, NamedQuery
+
+INSTRUCTOR_FIELDS = ["firstName", "lastName", "email"]
+STUDENT_FIELDS = ["firstName", "lastName", "email"]
+COURSE_FIELDS = ["title", "category", "price"]
+
+INDEXES = [
+    # backfill and embedding lookups
+    IndexSpec("users", [("userId", 1)]),
+    IndexSpec("courses", [("courseId", 1)]),
+    # fan-out targets
+    IndexSpec("courses", [("instructorId", 1)]),
+    IndexSpec("enrollments", [("studentId", 1), ("courseId", 1)]),
+    IndexSpec("enrollments", [("courseId", 1)]),
+    # embedded read paths
+    IndexSpec("courses", [("isPublished", 1)]),
+    IndexSpec("enrollments", [("course.category", 1)]),
+]
+
+# Embedded counterparts of the normalized Part 3/4 reads.
+EMBEDDED_QUERIES = {
+    "course_with_instructor": NamedQuery("course_with_instructor_embedded", "courses",
+                                         filter={"isPublished": True, "instructor.firstName": {"$exists": True}},
+                                         projection={"title": 1, "instructor.firstName": 1, "price": 1}),
+    "enrolled_in_c001": NamedQuery("enrolled_in_c001_embedded", "enrollments",
+                                   filter={"courseId": "c001", "student.firstName": {"$exists": True}},
+                                   projection={"student.firstName": 1, "progress": 1, "_id": 0}),
+    "popular_cats": NamedQuery("popular_cats_embedded", "enrollments", pipeline=[
+        # Backfill writes ``course: {}`` for a missing course; the baseline's $unwind drops those.
+        {"$match": {"course.category": {"$exists": True}}},
+        {"$group": {"_id": "$course.category", "enrollCount": {"$sum": 1}}},
+        {"$sort": {"enrollCount": -1}},
+        {"$limit": 3},
+    ]),
+}
+
+
+def ensure_indexes(db):
+    for spec in INDEXES:
+        spec.create(db)
+
+
+def _summary(doc, fields):
+    return {f: doc[f] for f in fields if f in doc}
+
+
+def _first(source, fields):
+    return {f: {"$first": f"${source}.{f}"} for f in fields}
+
+
+def backfill(db):
+    """Embed summaries into every course and enrollment (idempotent)."""
+    ensure_indexes(db)
+    db.courses.aggregate([
+        {"$lookup": {"from": "users", "localField": "instructorId", "foreignField": "userId", "as": "i"}},
+        {"$match": {"i.0": {"$exists": True}}},
+        {"$project": {"instructor": _first("i", INSTRUCTOR_FIELDS)}},
+        {"$merge": {"into": "courses", "on": "_id", "whenMatched": "merge", "whenNotMatched": "discard"}},
+    ], allowDiskUse=True)
+    db.enrollments.aggregate([
+        {"$lookup": {"from": "courses", "localField": "courseId", "foreignField": "courseId", "as": "c"}},
+        {"$lookup": {"from": "users", "localField": "studentId", "foreignField": "userId", "as": "s"}},
+        {"$project": {"course": _first("c", COURSE_FIELDS), "student": _first("s", STUDENT_FIELDS)}},
+        {"$merge": {"into": "enrollments", "on": "_id", "whenMatched": "merge", "whenNotMatched": "discard"}},
+    ], allowDiskUse=True)
+
+
+def embed_course(db, course):
+    """Return ``course`` with its instructor summary, for inserts in embedding mode."""
+    instructor = db.users.find_one({"userId": course["instructorId"]}) or {}
+    return dict(course, instructor=_summary(instructor, INSTRUCTOR_FIELDS))
+
+
+def embed_enrollment(db, enrollment):
+    """Return ``enrollment`` with course and student summaries."""
+    course = db.courses.find_one({"courseId": enrollment["courseId"]}) or {}
+    student = db.users.find_one({"userId": enrollment["studentId"]}) or {}
+    return dict(enrollment, course=_summary(course, COURSE_FIELDS), student=_summary(student, STUDENT_FIELDS))
+
+
+def _fanout(coll, match, prefix, changes):
+    """Copy changed summary fields to every document embedding them."""
+    if not changes:
+        return
+    update = {"$set": {f"{prefix}.{k}": v for k, v in changes.items()}}
+    result = coll.bulk_write([UpdateMany(dict(match, **{prefix: {"$exists": True}}), update)], ordered=False)
+    if result.modified_count:
+        default_cache.invalidate_collection(coll.name)
+
+
+def insert_user(db, user):
+    result = db.users.insert_one(user)
+    default_cache.on_write("users")
+    return result
+
+
+def update_user(db, user_id, update):
+    """Apply ``update`` to a user and fan summary changes out to courses/enrollments."""
+    result = db.users.update_one({"userId": user_id}, update)
+    default_cache.on_write("users", user_id, update)
+    changed = update.get("$set", {})
+    _fanout(db.courses, {"instructorId": user_id}, "instructor", _summary(changed, INSTRUCTOR_FIELDS))
+    _fanout(db.enrollments, {"studentId": user_id}, "student", _summary(changed, STUDENT_FIELDS))
+    return result
+
+
+def insert_course(db, course):
+    """Insert a course, embedding its instructor summary in embedding mode."""
+    course = with_prefixes(course)
+    result = db.courses.insert_one(embed_course(db, course) if config.DENORMALIZED else course)
+    default_cache.on_write("courses")
+    return result
+
+
+def update_course(db, course_id, update):
+    """Apply ``update`` to a course and fan summary changes out to its enrollments."""
+    update = prefix_update(update)
+    result = db.courses.update_one({"courseId": course_id}, update)
+    default_cache.on_write("courses", course_id, update)
+    _fanout(db.enrollments, {"courseId": course_id}, "course", _summary(update.get("$set", {}), COURSE_FIELDS))
+    return result
+
+
+def compare(db, iterations=20, warmup=3):
+    """Time each normalized read against its embedded counterpart."""
+    rows = []
+    for name, embedded in EMBEDDED_QUERIES.items():
+        normal = time_query(db, QUERIES_BY_NAME[name], iterations, warmup)
+        flat = time_query(db, embedded, iterations, warmup)
+        rows.append({
+            "query": name,
+            "normalized": normal,
+            "embedded": flat,
+            "speedupP50": normal["latencyMs"]["p50"] / flat["latencyMs"]["p50"] if flat["latencyMs"]["p50"] else None,
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the EduHub denormalized read models.")
+    parser.add_argument("command", choices=["backfill", "compare"])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    db = connection.get_db()
+    if args.command == "backfill":
+        backfill(db)
+        print("Embedded summaries written to courses and enrollments.")
+        return
+    for row in compare(db, args.iterations, args.warmup):
+        n, e = row["normalized"], row["embedded"]
+        print(f"{row['query']:<25} normalized p50={n['latencyMs']['p50']:.2f}ms docs={n['explain']['totalDocsExamined']}"
+              f" | embedded p50={e['latencyMs']['p50']:.2f}ms docs={e['explain']['totalDocsExamined']}"
+              f" | x{row['speedupP50']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Helpers for reading ``explain`` output.
+
+Find and aggregate explains come back in different shapes (classic vs. slot
+based engine, pushed-down ``$cursor`` stages, ...).  These functions pull out
+the handful of numbers the project cares about regardless of shape.
+"""
+
+
+def explain(db, command, verbosity="executionStats"):
+    """Run ``explain`` on a raw find/aggregate command document."""
+    return db.command("explain", command, verbosity=verbosity)
+
+
+def execution_stats(plan):
+    """The ``executionStats`` section of an explain, or ``{}``."""
+    if "executionStats" in plan:
+        return plan["executionStats"]
+    for stage in plan.get("stages", []):
+        if "$cursor" in stage:
+            return stage["$cursor"].get("executionStats", {})
+    return {}
+
+
+def winning_plan(plan):
+    """The winning plan tree of an explain, or ``{}``."""
+    planner = plan.get("queryPlanner")
+    if planner is None:
+        for stage in plan.get("stages", []):
+            if "$cursor" in stage:
+                planner = stage["$cursor"].get("queryPlanner")
+                break
+    if not planner:
+        return {}
+    winning = planner.get("winningPlan", {})
+    # Slot based engine nests the classic tree under "queryPlan".
+    return winning.get("queryPlan", winning)
+
+
+def _plan_nodes(node):
+    """Every stage of a plan tree, root first."""
+    todo = [node]
+    while todo:
+        current = todo.pop(0)
+        if not isinstance(current, dict):
+            continue
+        yield current
+        for key in ("inputStage", "innerStage", "outerStage"):
+            if key in current:
+                todo.append(current[key])
+        todo.extend(current.get("inputStages", []))
+
+
+def plan_stages(node):
+    """Stage names of a plan tree, root first (e.g. ``['PROJECTION', 'IXSCAN']``)."""
+    return [n["stage"] for n in _plan_nodes(node) if "stage" in n]
+
+
+def plan_indexes(node):
+    """Names of the indexes a plan tree scans, root first, without repeats."""
+    return list(dict.fromkeys(n["indexName"] for n in _plan_nodes(node) if "indexName" in n))
+
+
+def pipeline_stages(plan):
+    """Names of the aggregation stages that ran after the initial cursor."""
+    return [next(iter(stage)) for stage in plan.get("stages", [])]
+
+
+def lookup_collection_scans(plan):
+    """Collection scans done by ``$lookup`` stages (one per input doc when the
+    foreign field has no index)."""
+    return sum(stage.get("collectionScans", 0) for stage in plan.get("stages", []) if "$lookup" in stage)
+
+
+def summarize(plan):
+    """Compact, JSON-friendly digest of an explain document."""
+    stats = execution_stats(plan)
+    tree = winning_plan(plan)
+    stages = plan_stages(tree)
+    return {
+        "executionTimeMillis": stats.get("executionTimeMillis"),
+        "totalKeysExamined": stats.get("totalKeysExamined"),
+        "totalDocsExamined": stats.get("totalDocsExamined"),
+        "nReturned": stats.get("nReturned"),
+        "planStages": stages,
+        "indexesUsed": plan_indexes(tree),
+        "pipelineStages": pipeline_stages(plan),
+        "collscan": "COLLSCAN" in stages,
+        "inMemorySort": "SORT" in stages,
+        "lookupCollectionScans": lookup_collection_scans(plan),
+    }
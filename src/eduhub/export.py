@@ -0,0 +1,238 @@
+"""Streaming export of EduHub collections.
+
+Documents are read through a batched cursor and written out as they arrive,
+so memory stays constant whatever the collection size:
+
+* ``ndjson``  - one relaxed Extended JSON document per line (gzip by default)
+* ``bson``    - raw BSON, copied byte for byte without decoding (gzip optional)
+* ``parquet`` - columnar, one row group per batch (needs ``pyarrow``)
+
+Collections are exported in parallel, and a large collection can be split
+into ``_id`` ranges exported by separate workers, one file per range.  A
+``manifest.json`` lists every file with its document count.
+
+Usage::
+
+    python -m eduhub.export --format ndjson --collections users enrollments --partitions 8
+"""
+
+import argparse
+import gzip
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from bson import ObjectId, json_util
+from bson.codec_options import CodecOptions
+from bson.json_util import RELAXED_JSON_OPTIONS
+from bson.raw_bson import RawBSONDocument
+
+from eduhub import config, connection, datagen
+
+FORMATS = ["ndjson", "bson", "parquet"]
+EXTENSIONS = {"ndjson": ".ndjson", "bson": ".bson", "parquet": ".parquet"}
+
+
+def id_ranges(coll, partitions, samples_per_partition=20):
+    """Split ``coll`` into about ``partitions`` contiguous ``_id`` ranges.
+
+    Boundaries are quantiles of a ``$sample`` of ``_id`` values, so the parts
+    are balanced without a full scan.  Ranges are ``(low, high)`` with
+    ``low`` inclusive, ``high`` exclusive and ``None`` meaning unbounded.
+    """
+    if partitions <= 1:
+        return [(None, None)]
+    size = partitions * samples_per_partition
+    ids = sorted(d["_id"] for d in coll.aggregate([{"$sample": {"size": size}}, {"$project": {"_id": 1}}]))
+    if len(ids) < partitions:
+        return [(None, None)]
+    step = len(ids) / partitions
+    bounds = sorted(set(ids[int(i * step)] for i in range(1, partitions)))
+    edges = [None] + bounds + [None]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _range_filter(low, high):
+    cond = {}
+    if low is not None:
+        cond["$gte"] = low
+    if high is not None:
+        cond["$lt"] = high
+    return {"_id": cond} if cond else {}
+
+
+def _open(path, compress, mode):
+    return gzip.open(path, mode, compresslevel=6) if compress else open(path, mode)
+
+
+def _write_ndjson(cursor, path, compress):
+    n = 0
+    with _open(path, compress, "wt") as f:
+        for doc in cursor:
+            f.write(json_util.dumps(doc, json_options=RELAXED_JSON_OPTIONS))
+            f.write("\n")
+            n += 1
+    return n
+
+
+def _write_bson(cursor, path, compress):
+    n = 0
+    with _open(path, compress, "wb") as f:
+        for doc in cursor:
+            f.write(doc.raw)
+            n += 1
+    return n
+
+
+def _arrow_value(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, dict):
+        return {k: _arrow_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_arrow_value(v) for v in value]
+    return value
+
+
+def _write_parquet(cursor, path, batch_size):
+    """Write one row group per batch.
+
+    The schema is inferred from the first batch; later fields it does not
+    contain are dropped, so pass a projection when documents are irregular.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer, schema, n, batch = None, None, 0, []
+
+    def flush():
+        nonlocal writer, schema
+        rows = [{k: _arrow_value(v) for k, v in doc.items()} for doc in batch]
+        table = pa.Table.from_pylist(rows, schema=schema)
+        if writer is None:
+            schema = table.schema
+            writer = pq.ParquetWriter(path, schema, compression="zstd")
+        writer.write_table(table)
+        batch.clear()
+
+    try:
+        for doc in cursor:
+            batch.append(doc)
+            n += 1
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    finally:
+        if writer is not None:
+            writer.close()
+    return n
+
+
+def export_collection(db, name, out_dir=None, fmt="ndjson", compress=True, batch_size=1000,
+                      filter=None, projection=None, id_range=(None, None), part=None):
+    """Stream one collection (or one ``_id`` range of it) to a file.
+
+    Returns a manifest entry ``{"collection", "path", "documents", ...}``.
+    """
+    out_dir = out_dir or config.DATA_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    suffix = "" if part is None else f".part-{part:04d}"
+    ext = EXTENSIONS[fmt] + (".gz" if compress and fmt != "parquet" else "")
+    path = os.path.join(out_dir, f"{name}{suffix}{ext}")
+
+    flt = dict(filter or {}, **_range_filter(*id_range))
+    coll = db[name]
+    if fmt == "bson":
+        # Skip decoding entirely: the server's bytes go straight to disk.
+        coll = coll.with_options(codec_options=CodecOptions(document_class=RawBSONDocument))
+    cursor = coll.find(flt, projection, batch_size=batch_size)
+    if id_range != (None, None):
+        cursor = cursor.hint([("_id", 1)])
+
+    if fmt == "ndjson":
+        n = _write_ndjson(cursor, path, compress)
+    elif fmt == "bson":
+        n = _write_bson(cursor, path, compress)
+    elif fmt == "parquet":
+        n = _write_parquet(cursor, path, batch_size)
+    else:
+        raise ValueError(f"unknown format {fmt!r}, expected one of {FORMATS}")
+    return {"collection": name, "path": path, "format": fmt, "documents": n,
+            "idRange": [json_util.dumps(b) if b is not None else None for b in id_range]}
+
+
+def export(db, collections=None, out_dir=None, fmt="ndjson", compress=True, workers=4,
+           partitions=1, batch_size=1000):
+    """Export several collections in parallel, each split into ``partitions`` ``_id`` ranges.
+
+    Writes ``manifest.json`` next to the files and returns its content.
+    """
+    out_dir = out_dir or config.DATA_DIR
+    collections = collections or datagen.COLLECTIONS
+    tasks = []
+    for name in collections:
+        ranges = id_ranges(db[name], partitions)
+        for i, id_range in enumerate(ranges):
+            tasks.append(dict(name=name, id_range=id_range, part=i if len(ranges) > 1 else None))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(export_collection, db, out_dir=out_dir, fmt=fmt, compress=compress,
+                                   batch_size=batch_size, **task) for task in tasks]
+        files = [f.result() for f in futures]
+
+    manifest = {"createdAt": datetime.now().isoformat(), "database": db.name, "files": files}
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def write_sample(db, path=None, sections=None):
+    """Write the Part 2 ``sample_data.json`` by streaming each section.
+
+    ``sections`` maps a key to ``(collection, filter, projection, limit)``.
+    The output matches ``json.dump(..., indent=2)`` of the equivalent dict,
+    without holding the documents in memory.
+    """
+    path = path or os.path.join(config.DATA_DIR, "sample_data.json")
+    sections = sections or {
+        "users": ("users", {}, {"_id": 0}, 5),
+        "courses": ("courses", {}, {"_id": 0}, 0),
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        f.write("{")
+        for i, (key, (name, flt, projection, limit)) in enumerate(sections.items()):
+            f.write("," if i else "")
+            f.write(f"\n  {json.dumps(key)}: [")
+            n = 0
+            for doc in db[name].find(flt, projection).limit(limit):
+                body = json.dumps(doc, default=json_util.default, indent=2).replace("\n", "\n    ")
+                f.write(("," if n else "") + "\n    " + body)
+                n += 1
+            f.write("\n  ]" if n else "]")
+        f.write("\n}")
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream EduHub collections to files.")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    parser.add_argument("--collections", nargs="*")
+    parser.add_argument("--out", default=None, help="output directory (default: EDUHUB_DATA_DIR)")
+    parser.add_argument("--no-compress", action="store_true")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--partitions", type=int, default=1, help="_id ranges per collection")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    db = connection.get_db()
+    manifest = export(db, args.collections, args.out, args.format, not args.no_compress,
+                      args.workers, args.partitions, args.batch_size)
+    for entry in manifest["files"]:
+        print(f"{entry['collection']:<12} {entry['documents']:>10} docs -> {entry['path']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Cursor to pandas DataFrame without a list of dicts in between.
+
+``pd.DataFrame(list(cursor))`` keeps every document as a Python dict and
+then copies the dicts into columns, so peak memory is the whole result
+twice over.  Here a schema (field -> type) drives both the server-side
+projection, so unused fields are never sent or decoded, and the column
+layout: documents are turned into typed NumPy/pandas columns one chunk at a
+time, so only a chunk of dicts is ever alive.  ``iter_frames`` yields those
+chunks for out-of-core processing; ``to_frame`` concatenates them.
+
+When ``pymongoarrow`` is installed and the schema has no dotted paths, BSON
+is decoded straight into Arrow columns in C and no dicts are built at all.
+
+Types are ``"str"``, ``"float"``, ``"int"``, ``"bool"`` and ``"datetime"``;
+missing values become NaN/NaT/<NA>/None as appropriate.
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    from pymongoarrow.api import Schema, aggregate_pandas_all, find_pandas_all
+except ImportError:  # optional fast path
+    Schema = None
+
+ENROLLMENT_SCHEMA = {"enrollmentId": "str", "studentId": "str", "courseId": "str",
+                     "enrollDate": "datetime", "progress": "float", "isCompleted": "bool"}
+SUBMISSION_SCHEMA = {"submissionId": "str", "studentId": "str", "assignmentId": "str",
+                     "submissionDate": "datetime", "grade": "float"}
+COURSE_SCHEMA = {"courseId": "str", "title": "str", "instructorId": "str", "category": "str",
+                 "level": "str", "duration": "float", "price": "float", "isPublished": "bool"}
+USER_SCHEMA = {"userId": "str", "email": "str", "role": "str", "dateJoined": "datetime", "isActive": "bool"}
+
+_ARROW_TYPES = {} if Schema is None else {
+    "str": pa.string(), "float": pa.float64(), "int": pa.int64(),
+    "bool": pa.bool_(), "datetime": pa.timestamp("ms"),
+}
+
+
+def projection_for(schema):
+    return dict({field: 1 for field in schema}, _id=0)
+
+
+def _getter(field):
+    path = field.split(".")
+    if len(path) == 1:
+        return lambda doc: doc.get(field)
+
+    def get(doc):
+        for part in path:
+            if not isinstance(doc, dict):
+                return None
+            doc = doc.get(part)
+        return doc
+    return get
+
+
+def _column(values, kind):
+    if kind == "float":
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    if kind == "datetime":
+        return pd.array(values, dtype="datetime64[ms]")
+    if kind == "int":
+        return pd.array(values, dtype="Int64")
+    if kind == "bool":
+        return pd.array(values, dtype="boolean")
+    return np.array(values, dtype=object)
+
+
+def _chunk_frame(docs, schema, getters):
+    return pd.DataFrame({field: _column([get(d) for d in docs], kind)
+                         for (field, kind), get in zip(schema.items(), getters)}, copy=False)
+
+
+def frames_from_cursor(cursor, schema, chunk_size=100_000):
+    """Yield DataFrames of at most ``chunk_size`` rows from any document cursor.
+
+    Only one chunk of documents is alive at a time; each chunk is turned into
+    typed columns field by field and released.
+    """
+    getters = [_getter(f) for f in schema]
+    chunk = []
+    for doc in cursor:
+        chunk.append(doc)
+        if len(chunk) == chunk_size:
+            yield _chunk_frame(chunk, schema, getters)
+            chunk = []
+    if chunk:
+        yield _chunk_frame(chunk, schema, getters)
+
+
+def iter_frames(coll, filter=None, schema=None, chunk_size=100_000, pipeline=None, batch_size=10_000):
+    """Yield DataFrame chunks for a find (``filter``) or an aggregation (``pipeline``)."""
+    if pipeline is not None:
+        cursor = coll.aggregate(pipeline + [{"$project": projection_for(schema)}],
+                                batchSize=batch_size, allowDiskUse=True)
+    else:
+        cursor = coll.find(filter or {}, projection_for(schema), batch_size=batch_size)
+    yield from frames_from_cursor(cursor, schema, chunk_size)
+
+
+def _arrow_ok(schema):
+    return Schema is not None and not any("." in f for f in schema)
+
+
+def to_frame(coll, filter=None, schema=None, pipeline=None, chunk_size=100_000):
+    """Whole result as one DataFrame, columnar from the start."""
+    if _arrow_ok(schema):
+        arrow_schema = Schema({f: _ARROW_TYPES[k] for f, k in schema.items()})
+        if pipeline is not None:
+            return aggregate_pandas_all(coll, pipeline, schema=arrow_schema)
+        return find_pandas_all(coll, filter or {}, schema=arrow_schema)
+    chunks = list(iter_frames(coll, filter, schema, chunk_size, pipeline))
+    if not chunks:
+        return _chunk_frame([], schema, [_getter(f) for f in schema])
+    return chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
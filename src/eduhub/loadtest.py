@@ -0,0 +1,373 @@
+"""Concurrent load test of the EduHub write and read paths.
+
+Simulated students and instructors run a weighted mix of the project's own
+operations against the configured server:
+
+=============  ============================================================
+``enroll``     ``counters.enroll`` of a new enrollment
+``progress``   ``counters.set_progress`` on an existing enrollment
+``submit``     ``counters.submit`` of a new submission
+``grade``      ``counters.grade`` of an existing submission
+``search``     ``search.search`` for a catalog word
+``dashboard``  ``analytics.dashboard`` (the Task 4.2 dashboards, live)
+=============  ============================================================
+
+Work is spread over ``processes`` worker processes with ``threads`` threads
+each.  With a target ``rate`` (operations per second, across all workers)
+every thread follows a fixed schedule.  Latency is measured from the
+scheduled start, so a server that falls behind shows up in the percentiles
+instead of silently lowering the request rate.  Without a rate every thread
+runs flat out.
+
+Per operation the report has throughput, latency percentiles, write
+conflicts, validation failures (server ``$jsonSchema``), duplicate keys and
+other errors.  With ``use_transaction`` the write-conflict count includes
+every transaction attempt that ``with_transaction`` retried (see
+``counters.transaction_retries``), not only errors that reached the client.
+Without transactions the server retries single-document write conflicts
+internally, so they show only as latency.  ``invalid_rate`` sends that
+fraction of submissions with a malformed grade to exercise the validators.
+It requires the ``submissions`` validator (``python -m eduhub setup``).
+Reports are JSON and ``compare`` flags regressions against a previous one::
+
+    python -m eduhub.loadtest --duration 30 --rate 500 --threads 8 --processes 2 --out load.json
+    python -m eduhub.loadtest --mix enroll=1,progress=4,search=4 --baseline load.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+
+import pymongo
+from pymongo.errors import DuplicateKeyError, OperationFailure, PyMongoError
+
+from eduhub import analytics, connection, counters, search
+from eduhub.benchmark import percentile
+from eduhub.datagen import CATEGORIES
+
+DEFAULT_MIX = {"enroll": 1, "progress": 4, "submit": 2, "grade": 2, "search": 6, "dashboard": 0.2}
+SAMPLE_SIZE = 5000
+WRITE_CONFLICT = 112
+VALIDATION_FAILED = 121
+SEARCH_WORDS = sorted({w.lower() for topics in CATEGORIES.values() for t in topics for w in t.split()})
+
+
+@dataclass
+class LoadConfig:
+    mix: dict = field(default_factory=lambda: dict(DEFAULT_MIX))
+    duration: float = 30.0
+    rate: float = 0.0
+    threads: int = 4
+    processes: int = 1
+    use_transaction: bool = False
+    invalid_rate: float = 0.0
+    seed: int = 42
+
+    @property
+    def workers(self):
+        return self.threads * self.processes
+
+
+class _Context:
+    """Ids the operations pick from; ids created during the run are added."""
+
+    def __init__(self, db):
+        def sample(collection, field_name, match=None):
+            pipeline = ([{"$match": match}] if match else []) + [
+                {"$sample": {"size": SAMPLE_SIZE}}, {"$project": {"_id": 0, field_name: 1}}]
+            return [d[field_name] for d in db[collection].aggregate(pipeline) if d.get(field_name)]
+
+        self.students = sample("users", "userId", {"role": "student"})
+        self.courses = sample("courses", "courseId")
+        self.assignments = sample("assignments", "assignmentId")
+        self.enrollments = sample("enrollments", "enrollmentId")
+        self.submissions = sample("submissions", "submissionId")
+        self.prefix = f"lt-{uuid.uuid4().hex[:8]}"
+        self._seq = 0
+        self._lock = threading.Lock()
+        if not (self.students and self.courses and self.assignments):
+            raise ValueError("load test needs users, courses and assignments; run `python -m eduhub seed` first")
+
+    def new_id(self, kind):
+        with self._lock:
+            self._seq += 1
+            return f"{self.prefix}-{kind}{self._seq}"
+
+
+# --- operations: (db, ctx, rng, config) -> None ---
+
+def _enroll(db, ctx, rng, config):
+    enrollment_id = ctx.new_id("e")
+    counters.enroll(db, {"enrollmentId": enrollment_id, "studentId": rng.choice(ctx.students),
+                         "courseId": rng.choice(ctx.courses), "enrollDate": datetime.now(),
+                         "progress": 0.0, "isCompleted": False}, use_transaction=config.use_transaction)
+    ctx.enrollments.append(enrollment_id)
+
+
+def _progress(db, ctx, rng, config):
+    if not ctx.enrollments:
+        return _enroll(db, ctx, rng, config)
+    progress = float(rng.randrange(101))
+    counters.set_progress(db, rng.choice(ctx.enrollments), progress, is_completed=progress >= 85,
+                          use_transaction=config.use_transaction)
+
+
+def _submit(db, ctx, rng, config):
+    submission_id = ctx.new_id("s")
+    submission = {"submissionId": submission_id, "studentId": rng.choice(ctx.students),
+                  "assignmentId": rng.choice(ctx.assignments), "submissionDate": datetime.now(),
+                  "fileUrl": f"{submission_id}.pdf"}
+    if rng.random() < config.invalid_rate:
+        submission["grade"] = "A+"  # not a double: rejected by the submissions validator
+    counters.submit(db, submission, use_transaction=config.use_transaction)
+    ctx.submissions.append(submission_id)
+
+
+def _grade(db, ctx, rng, config):
+    if not ctx.submissions:
+        return _submit(db, ctx, rng, config)
+    counters.grade(db, rng.choice(ctx.submissions), float(rng.randint(40, 100)), "Graded under load",
+                   use_transaction=config.use_transaction)
+
+
+def _search(db, ctx, rng, config):
+    search.search(db, rng.choice(SEARCH_WORDS), limit=20)
+
+
+def _dashboard(db, ctx, rng, config):
+    analytics.dashboard(db)
+
+
+OPERATIONS = {
+    "enroll": _enroll,
+    "progress": _progress,
+    "submit": _submit,
+    "grade": _grade,
+    "search": _search,
+    "dashboard": _dashboard,
+}
+
+
+def classify(exc):
+    """Outcome name for an exception raised by an operation."""
+    if isinstance(exc, DuplicateKeyError):
+        return "duplicateKeys"
+    if isinstance(exc, OperationFailure):
+        if exc.code == VALIDATION_FAILED:
+            return "validationFailures"
+        if exc.code == WRITE_CONFLICT or exc.has_error_label("TransientTransactionError"):
+            return "writeConflicts"
+    return "errors"
+
+
+# --- workers ---
+
+def _new_stats():
+    return defaultdict(lambda: {"latencies": [], "ok": 0, "writeConflicts": 0, "validationFailures": 0,
+                                "duplicateKeys": 0, "errors": 0, "lastError": None})
+
+
+def _merge(into, stats):
+    for op, s in stats.items():
+        target = into[op]
+        target["latencies"].extend(s["latencies"])
+        for key in ("ok", "writeConflicts", "validationFailures", "duplicateKeys", "errors"):
+            target[key] += s[key]
+        target["lastError"] = s["lastError"] or target["lastError"]
+
+
+def _thread(db, ctx, config, worker, deadline, stats, lock):
+    rng = random.Random(config.seed * 10_000 + worker)
+    names = [n for n, w in config.mix.items() if w > 0]
+    weights = [config.mix[n] for n in names]
+    interval = config.workers / config.rate if config.rate else 0.0
+    local = _new_stats()
+    next_at = time.perf_counter() + rng.random() * interval  # spread the threads' first requests
+    while True:
+        now = time.perf_counter()
+        if interval:
+            if next_at > now:
+                time.sleep(next_at - now)
+            start, next_at = next_at, next_at + interval
+        else:
+            start = now
+        if time.time() >= deadline:
+            break
+        op = rng.choices(names, weights)[0]
+        s = local[op]
+        retries = counters.transaction_retries()
+        try:
+            OPERATIONS[op](db, ctx, rng, config)
+            s["ok"] += 1
+        except PyMongoError as e:
+            s[classify(e)] += 1
+            s["lastError"] = str(e)[:200]
+        s["writeConflicts"] += counters.transaction_retries() - retries
+        s["latencies"].append((time.perf_counter() - start) * 1000.0)
+    with lock:
+        _merge(stats, local)
+
+
+def _process(config, index, deadline):
+    """Run ``config.threads`` threads in this process; returns their merged stats."""
+    db = connection.get_db()
+    ctx = _Context(db)
+    stats, lock = _new_stats(), threading.Lock()
+    threads = [threading.Thread(target=_thread, args=(db, ctx, config, index * config.threads + t,
+                                                      deadline, stats, lock))
+               for t in range(config.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return dict(stats)
+
+
+def _has_validator(db, collection):
+    info = next(db.list_collections(filter={"name": collection}), None)
+    return bool(info and info.get("options", {}).get("validator"))
+
+
+def run(config):
+    """Run the load test described by ``config``; returns a report dict."""
+    unknown = set(config.mix) - set(OPERATIONS)
+    if unknown:
+        raise ValueError(f"unknown operations {sorted(unknown)}")
+    if config.invalid_rate > 0 and not _has_validator(connection.get_db(), "submissions"):
+        raise ValueError("invalid_rate needs the submissions validator; run `python -m eduhub setup` first")
+    started = time.time()
+    deadline = started + config.duration
+    stats = _new_stats()
+    if config.processes <= 1:
+        _merge(stats, _process(config, 0, deadline))
+    else:
+        connection.close()  # don't carry the parent's pool into the workers
+        with ProcessPoolExecutor(max_workers=config.processes) as executor:
+            futures = [executor.submit(_process, config, i, deadline) for i in range(config.processes)]
+            for f in futures:
+                _merge(stats, f.result())
+    elapsed = time.time() - started
+    return _report(config, stats, elapsed)
+
+
+def _summary(s, elapsed):
+    lat = s["latencies"]
+    attempts = len(lat)
+    return {
+        "attempts": attempts,
+        "ok": s["ok"],
+        "throughput": s["ok"] / elapsed if elapsed else None,
+        "latencyMs": {"p50": percentile(lat, 50), "p95": percentile(lat, 95), "p99": percentile(lat, 99),
+                      "max": max(lat) if lat else None},
+        "writeConflicts": s["writeConflicts"],
+        "validationFailures": s["validationFailures"],
+        "duplicateKeys": s["duplicateKeys"],
+        "errors": s["errors"],
+        "lastError": s["lastError"],
+    }
+
+
+def _report(config, stats, elapsed):
+    operations = {op: _summary(s, elapsed) for op, s in sorted(stats.items())}
+    total = _new_stats()
+    for s in stats.values():
+        _merge(total, {"all": s})
+    return {
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "serverVersion": connection.get_client().server_info().get("version"),
+        "pymongoVersion": pymongo.version,
+        "python": platform.python_version(),
+        "host": platform.node(),
+        "config": asdict(config),
+        "seconds": round(elapsed, 3),
+        "total": _summary(total["all"], elapsed),
+        "operations": operations,
+    }
+
+
+def compare(baseline, current, threshold=0.2):
+    """Operations whose p95 grew or throughput dropped by more than ``threshold``.
+
+    Runs are only comparable at the same mix and rate; with a target rate
+    throughput should match it, so a drop means the server fell behind.
+    """
+    regressions = []
+    for op, now in current["operations"].items():
+        old = baseline["operations"].get(op)
+        if old is None:
+            continue
+        p95_before, p95_after = old["latencyMs"]["p95"], now["latencyMs"]["p95"]
+        slower = p95_before and p95_after and p95_after > p95_before * (1 + threshold)
+        fewer = old["throughput"] and (now["throughput"] or 0) < old["throughput"] * (1 - threshold)
+        if slower or fewer:
+            regressions.append({"operation": op, "p95Before": p95_before, "p95After": p95_after,
+                                "throughputBefore": old["throughput"], "throughputAfter": now["throughput"]})
+    return regressions
+
+
+def _ms(value):
+    return f"{value:8.2f}" if value is not None else f"{'-':>8}"
+
+
+def print_report(report):
+    print(f"{'operation':<10} {'ok':>7} {'ops/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} "
+          f"{'conflicts':>9} {'invalid':>7} {'dupes':>5} {'errors':>6}")
+    for op, r in list(report["operations"].items()) + [("total", report["total"])]:
+        lat = r["latencyMs"]
+        print(f"{op:<10} {r['ok']:>7} {r['throughput'] or 0:8.1f} {_ms(lat['p50'])} {_ms(lat['p95'])} "
+              f"{_ms(lat['p99'])} {r['writeConflicts']:>9} {r['validationFailures']:>7} "
+              f"{r['duplicateKeys']:>5} {r['errors']:>6}")
+
+
+def _parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the EduHub operations.")
+    parser.add_argument("--mix", type=_parse_mix, default=dict(DEFAULT_MIX),
+                        help="weights, e.g. enroll=1,progress=4,search=6 (default: %(default)s)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--rate", type=float, default=0.0, help="target operations/s in total (0: unthrottled)")
+    parser.add_argument("--threads", type=int, default=4, help="threads per process")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--transactions", action="store_true", help="counter updates in transactions")
+    parser.add_argument("--invalid-rate", type=float, default=0.0, help="fraction of invalid submissions")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="load_results.json")
+    parser.add_argument("--baseline", help="previous report to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    config = LoadConfig(mix=args.mix, duration=args.duration, rate=args.rate, threads=args.threads,
+                        processes=args.processes, use_transaction=args.transactions,
+                        invalid_rate=args.invalid_rate, seed=args.seed)
+    report = run(config)
+    print_report(report)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"Report written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(json.load(f), report, threshold=args.threshold)
+        for reg in regressions:
+            print("REGRESSION:", reg)
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
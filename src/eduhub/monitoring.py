@@ -0,0 +1,341 @@
+"""Command-level instrumentation through PyMongo's monitoring API.
+
+``Monitor`` is a command listener plus a connection pool listener.  Once
+registered on a client it records:
+
+* ``eduhub_command_duration_ms{command, collection, query}`` - server round
+  trip of every command; ``query`` is the name of the ``NamedQuery`` that
+  issued it (sent as the command ``comment``) or the label set with
+  ``label(...)``, so find/getMore/aggregate of one named read add up;
+* ``eduhub_reply_bytes{command, collection, query}`` - BSON size of a
+  ``reply_sample_rate`` fraction of replies (off by default: measuring means
+  re-encoding the reply on the application's thread);
+* ``eduhub_pool_checkout_ms{address}`` - time waiting for a pooled connection;
+* ``eduhub_command_failures_total`` and ``eduhub_pool_checkout_failures_total``.
+
+Finds and aggregations slower than ``slow_ms`` are, with probability
+``sample_rate``, explained in a background thread (never inside the
+listener, which runs on the application's thread) and kept in a bounded
+slow-query log with the plan digest and the docs examined / returned ratio.
+
+Everything exports as Prometheus text (``to_prometheus``) or JSON
+(``to_json``).  ``enable()`` turns on the process-wide monitor for the
+shared client (``EDUHUB_MONITORING=1`` does the same at startup)::
+
+    python -m eduhub.monitoring --iterations 10 --slow-ms 20 --format prometheus
+"""
+
+import argparse
+import contextlib
+import contextvars
+import json
+import queue
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import bson
+from pymongo import monitoring
+
+from eduhub import config, connection
+from eduhub.explain import summarize
+
+DURATION_BUCKETS_MS = [0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+SIZE_BUCKETS_BYTES = [256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216]
+EXPLAINABLE = {"find", "aggregate", "count", "distinct"}
+# Envelope fields the driver adds to every command; not part of what to explain.
+_ENVELOPE = {"lsid", "txnNumber", "autocommit", "startTransaction", "readConcern", "writeConcern",
+             "$clusterTime", "$db", "$readPreference", "maxTimeMS"}
+
+_label = contextvars.ContextVar("eduhub_query_label", default=None)
+
+
+@contextlib.contextmanager
+def label(name):
+    """Attribute commands issued inside the block to ``name`` (e.g. ``"enroll"``)."""
+    token = _label.set(name)
+    try:
+        yield
+    finally:
+        _label.reset(token)
+
+
+class Histogram:
+    """Fixed-bucket histogram (Prometheus semantics: ``le`` upper bounds)."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Estimate from the buckets (upper bound of the bucket holding the quantile)."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, n in zip(self.buckets + [float("inf")], self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def as_dict(self):
+        return {"count": self.count, "sum": self.sum, "mean": self.sum / self.count if self.count else None,
+                "p50": self.quantile(0.5), "p95": self.quantile(0.95), "p99": self.quantile(0.99),
+                "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], self.counts))}
+
+
+class Monitor(monitoring.CommandListener, monitoring.ConnectionPoolListener):
+    """Collects latency/size histograms and a sampled slow-query log."""
+
+    def __init__(self, slow_ms=100.0, sample_rate=1.0, slow_log_size=200, reply_sample_rate=0.0,
+                 explain_client=None):
+        self.slow_ms = slow_ms
+        self.sample_rate = sample_rate
+        self.reply_sample_rate = reply_sample_rate
+        self.explain_client = explain_client
+        self.slow_log = deque(maxlen=slow_log_size)
+        self._histograms = {}
+        self._counters = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._checkout = threading.local()
+        self._explains = queue.Queue(maxsize=100)
+        self._worker = None
+
+    # --- recording ---
+
+    def _observe(self, name, labels, value, buckets):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram(buckets)
+            hist.observe(value)
+
+    def _inc(self, name, labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self.slow_log.clear()
+
+    # --- command events ---
+
+    def started(self, event):
+        cmd = event.command
+        name = event.command_name
+        collection = cmd.get(name) if isinstance(cmd.get(name), str) else cmd.get("collection", "")
+        comment = cmd.get("comment")
+        query = _label.get() or (comment if isinstance(comment, str) else "")
+        keep = cmd if name in EXPLAINABLE else None
+        with self._lock:
+            self._inflight[(event.connection_id, event.request_id)] = (collection, query, keep)
+
+    def _finish(self, event):
+        with self._lock:
+            return self._inflight.pop((event.connection_id, event.request_id), ("", "", None))
+
+    def succeeded(self, event):
+        collection, query, cmd = self._finish(event)
+        ms = event.duration_micros / 1000.0
+        labels = {"command": event.command_name, "collection": collection, "query": query}
+        self._observe("eduhub_command_duration_ms", labels, ms, DURATION_BUCKETS_MS)
+        if self.reply_sample_rate and random.random() < self.reply_sample_rate:
+            self._observe("eduhub_reply_bytes", labels, len(bson.encode(event.reply)), SIZE_BUCKETS_BYTES)
+        if cmd is not None and ms >= self.slow_ms and random.random() < self.sample_rate:
+            self._queue_explain(event.database_name, cmd, ms, labels)
+
+    def failed(self, event):
+        collection, query, _ = self._finish(event)
+        labels = {"command": event.command_name, "collection": collection, "query": query}
+        self._observe("eduhub_command_duration_ms", labels, event.duration_micros / 1000.0, DURATION_BUCKETS_MS)
+        self._inc("eduhub_command_failures_total", labels)
+
+    # --- pool events ---
+
+    def connection_check_out_started(self, event):
+        self._checkout.start = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        duration = getattr(event, "duration", None)  # pymongo >= 4.7
+        if duration is None:
+            duration = time.perf_counter() - getattr(self._checkout, "start", time.perf_counter())
+        self._observe("eduhub_pool_checkout_ms", {"address": "%s:%s" % event.address}, duration * 1000.0,
+                      DURATION_BUCKETS_MS)
+
+    def connection_check_out_failed(self, event):
+        self._inc("eduhub_pool_checkout_failures_total", {"address": "%s:%s" % event.address,
+                                                          "reason": str(event.reason)})
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_created(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_checked_in(self, event): pass
+    def connection_closed(self, event): pass
+
+    # --- slow-query log ---
+
+    def _queue_explain(self, database, cmd, ms, labels):
+        body = {k: v for k, v in cmd.items() if k not in _ENVELOPE}
+        try:
+            self._explains.put_nowait((database, body, ms, labels))
+        except queue.Full:
+            return  # shed load rather than slow the application down
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._explain_loop, name="eduhub-explain", daemon=True)
+                self._worker.start()
+
+    def _explain_loop(self):
+        while True:
+            database, body, ms, labels = self._explains.get()
+            entry = dict(labels, at=datetime.now().isoformat(), durationMs=ms, command=_jsonable(body))
+            try:
+                client = self.explain_client or connection.get_client()
+                # Label the explain itself so it is not mistaken for application traffic.
+                with label("explain"):
+                    digest = summarize(client[database].command("explain", body, verbosity="executionStats"))
+                returned = digest.get("nReturned") or 0
+                entry.update(explain=digest, docsExaminedPerReturned=(
+                    (digest.get("totalDocsExamined") or 0) / returned if returned else None))
+            except Exception as e:  # the log is best effort
+                entry["explainError"] = repr(e)
+            self.slow_log.append(entry)
+            self._explains.task_done()
+
+    def flush(self, timeout=10.0):
+        """Wait (up to ``timeout`` seconds) for queued explains to finish."""
+        deadline = time.monotonic() + timeout
+        while self._explains.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    # --- export ---
+
+    def snapshot(self):
+        """Copies of ``(histograms, counters)``, keyed by ``(name, labels)``."""
+        with self._lock:
+            histograms = {}
+            for key, hist in self._histograms.items():
+                copy = histograms[key] = Histogram(hist.buckets)
+                copy.counts, copy.count, copy.sum = list(hist.counts), hist.count, hist.sum
+            return histograms, dict(self._counters)
+
+    def to_json(self):
+        histograms, counters = self.snapshot()
+
+        def rows(items, render):
+            return [dict(name=name, labels=dict(labels), **render(v)) for (name, labels), v in sorted(items)]
+        return {
+            "histograms": rows(histograms.items(), Histogram.as_dict),
+            "counters": rows(counters.items(), lambda v: {"value": v}),
+            "slowQueries": list(self.slow_log),
+        }
+
+    def to_prometheus(self):
+        histograms, counters = self.snapshot()
+        lines, typed = [], set()
+        for (name, labels), hist in sorted(histograms.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for bound, n in zip(hist.buckets + ["+Inf"], hist.counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{_labels(labels + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {hist.sum}")
+            lines.append(f"{name}_count{_labels(labels)} {hist.count}")
+        for (name, labels), value in sorted(counters.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _jsonable(doc):
+    return json.loads(bson.json_util.dumps(doc))
+
+
+# --- process-wide monitor for the shared client ---
+
+default_monitor = None
+
+
+def enable(**kwargs):
+    """Create the process-wide ``Monitor`` and attach it to the shared client.
+
+    The shared client is closed if it already exists, so the next
+    ``connection.get_client()`` is created with the listeners.
+    """
+    global default_monitor
+    if default_monitor is None:
+        default_monitor = Monitor(**kwargs)
+        connection.close()
+    return default_monitor
+
+
+def listeners():
+    """Event listeners for ``MongoClient(event_listeners=...)``; empty when disabled.
+
+    Called by ``connection.get_client()`` while it builds the client, so it
+    must not close the shared client the way ``enable()`` does.
+    """
+    global default_monitor
+    if default_monitor is None and config.MONITORING:
+        default_monitor = Monitor(slow_ms=config.SLOW_QUERY_MS)
+    return [default_monitor] if default_monitor is not None else []
+
+
+def main(argv=None):
+    from eduhub.workload import get_queries
+
+    parser = argparse.ArgumentParser(description="Run the workload under command monitoring and export metrics.")
+    parser.add_argument("names", nargs="*", help="query names (default: all)")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--slow-ms", type=float, default=config.SLOW_QUERY_MS)
+    parser.add_argument("--sample-rate", type=float, default=1.0)
+    parser.add_argument("--reply-sample-rate", type=float, default=0.0,
+                        help="fraction of replies whose BSON size is measured")
+    parser.add_argument("--format", choices=["prometheus", "json"], default="prometheus")
+    args = parser.parse_args(argv)
+
+    monitor = enable(slow_ms=args.slow_ms, sample_rate=args.sample_rate, reply_sample_rate=args.reply_sample_rate)
+    db = connection.get_db()
+    for _ in range(args.iterations):
+        for query in get_queries(args.names):
+            query.run(db)
+    monitor.flush()
+    if args.format == "json":
+        print(json.dumps(monitor.to_json(), indent=2, default=str))
+    else:
+        print(monitor.to_prometheus(), end="")
+
+
+if __name__ == "__main__":
+    main()
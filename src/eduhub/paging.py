@@ -0,0 +1,211 @@
+"""Keyset (seek) pagination for catalog, roster and user listings.
+
+``skip``/``limit`` paging makes the server walk and discard every earlier
+row, so page 1000 costs a thousand pages.  Here each page starts where the
+previous one ended: the sort key of the last row is packed into an opaque
+token, and the next query seeks past it with a range condition on an index
+whose keys match the sort.  Every page costs one index seek plus
+``page_size`` rows, however deep the reader scrolls.
+
+Sorts must end in a unique key; ``_id`` is appended unless the last key is
+the collection's business id (``courseId``, ``userId``, ...).  Tokens are bound to the query they came from and rejected otherwise.
+"""
+
+import base64
+import hashlib
+import re
+from dataclasses import dataclass, field
+
+from bson import json_util
+
+from eduhub.cache import ID_FIELDS
+from eduhub.workload import IndexSpec
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# count="estimate" stops counting here and reports a lower bound.
+COUNT_LIMIT = 10_000
+
+
+class InvalidToken(ValueError):
+    pass
+
+
+@dataclass
+class Page:
+    items: list
+    next_token: str = None
+    total: int = None
+    total_is_exact: bool = None
+    page_size: int = 0
+    sort: list = field(default_factory=list)
+
+    @property
+    def has_more(self):
+        return self.next_token is not None
+
+
+def _fingerprint(collection, flt, sort):
+    shape = json_util.dumps([collection, flt, sort], sort_keys=True)
+    return hashlib.sha1(shape.encode()).hexdigest()[:12]
+
+
+def encode_token(values, fingerprint):
+    raw = json_util.dumps({"k": values, "q": fingerprint})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_token(token, fingerprint):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json_util.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, TypeError) as e:
+        raise InvalidToken("malformed page token") from e
+    if not isinstance(data, dict) or data.get("q") != fingerprint:
+        raise InvalidToken("page token belongs to a different query")
+    return data["k"]
+
+
+def _value(doc, path):
+    for part in path.split("."):
+        doc = doc.get(part) if isinstance(doc, dict) else None
+    return doc
+
+
+def _seek_filter(sort, values):
+    """Rows strictly after ``values`` in ``sort`` order.
+
+    For keys (a, b, c) this is a > va OR (a = va AND b > vb) OR
+    (a = va AND b = vb AND c > vc), with > flipped to < for descending keys.
+    """
+    clauses = []
+    for i, (key, direction) in enumerate(sort):
+        clause = {k: v for (k, _), v in zip(sort[:i], values[:i])}
+        clause[key] = {"$gt" if direction == 1 else "$lt": values[i]}
+        clauses.append(clause)
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+
+def _with_sort_fields(projection, sort):
+    """Projection that also returns the sort keys, and the keys to strip again."""
+    keys = [k for k, _ in sort]
+    if not projection:
+        return projection, []
+    inclusion = any(v for k, v in projection.items() if k != "_id")
+    if inclusion:
+        extra = [k for k in keys if not projection.get(k)]
+        return dict(projection, **{k: 1 for k in extra}), extra
+    extra = [k for k in keys if k in projection]
+    return {k: v for k, v in projection.items() if k not in extra} or None, extra
+
+
+def _strip(doc, path):
+    *parents, last = path.split(".")
+    for part in parents:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(last, None)
+
+
+def paginate(coll, filter=None, sort=None, page_size=DEFAULT_PAGE_SIZE, token=None, projection=None,
+             count=None):
+    """Fetch one page.
+
+    ``count`` is ``None`` (no total), ``"estimate"`` (exact up to
+    ``COUNT_LIMIT``, then a lower bound; collection metadata when unfiltered)
+    or ``"exact"``.
+    """
+    filter = filter or {}
+    sort = [tuple(s) for s in (sort or [("_id", 1)])]
+    if sort[-1][0] not in ("_id", ID_FIELDS.get(coll.name)):
+        sort.append(("_id", 1))
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+    fingerprint = _fingerprint(coll.name, filter, sort)
+
+    query = filter
+    if token:
+        values = decode_token(token, fingerprint)
+        if len(values) != len(sort):
+            raise InvalidToken("page token does not match the sort")
+        seek = _seek_filter(sort, values)
+        query = {"$and": [filter, seek]} if filter else seek
+
+    projection, extra = _with_sort_fields(projection, sort)
+    docs = list(coll.find(query, projection).sort(sort).limit(page_size + 1))
+    next_token = None
+    if len(docs) > page_size:
+        docs = docs[:page_size]
+        next_token = encode_token([_value(docs[-1], k) for k, _ in sort], fingerprint)
+    for doc in docs:
+        for key in extra:
+            _strip(doc, key)
+
+    page = Page(docs, next_token, page_size=page_size, sort=sort)
+    if count == "exact":
+        page.total, page.total_is_exact = coll.count_documents(filter), True
+    elif count == "estimate":
+        if not filter:
+            page.total, page.total_is_exact = coll.estimated_document_count(), False
+        else:
+            n = coll.count_documents(filter, limit=COUNT_LIMIT)
+            page.total, page.total_is_exact = n, n < COUNT_LIMIT
+    return page
+
+
+def iter_pages(coll, filter=None, sort=None, page_size=DEFAULT_PAGE_SIZE, projection=None):
+    """Walk every page of a listing."""
+    token = None
+    while True:
+        page = paginate(coll, filter, sort, page_size, token, projection)
+        yield page
+        if not page.has_more:
+            return
+        token = page.next_token
+
+
+# --- listings used by the project, each with its supporting index ---
+
+INDEXES = [
+    IndexSpec("courses", [("category", 1), ("courseId", 1)]),
+    IndexSpec("courses", [("price", 1), ("courseId", 1)]),
+    IndexSpec("courses", [("courseId", 1)]),
+    IndexSpec("users", [("role", 1), ("isActive", 1), ("userId", 1)]),
+    IndexSpec("enrollments", [("courseId", 1), ("studentId", 1), ("_id", 1)]),
+]
+
+
+def ensure_indexes(db):
+    for spec in INDEXES:
+        spec.create(db)
+
+
+def courses_in_category(db, category, token=None, page_size=DEFAULT_PAGE_SIZE, count=None):
+    """Catalog by category (``programming_courses`` with ``category="Programming"``)."""
+    return paginate(db.courses, {"category": category}, [("category", 1), ("courseId", 1)],
+                    page_size, token, {"_id": 0}, count)
+
+
+def courses_in_price_range(db, low, high, token=None, page_size=DEFAULT_PAGE_SIZE, count=None):
+    """``mid_price``, paged in price order."""
+    return paginate(db.courses, {"price": {"$gte": low, "$lte": high}}, [("price", 1), ("courseId", 1)],
+                    page_size, token, {"_id": 0, "title": 1, "price": 1}, count)
+
+
+def search_titles(db, text, token=None, page_size=DEFAULT_PAGE_SIZE, count=None):
+    """``search_results`` (case-insensitive partial title match), paged by courseId."""
+    return paginate(db.courses, {"title": {"$regex": re.escape(text), "$options": "i"}}, [("courseId", 1)],
+                    page_size, token, {"_id": 0}, count)
+
+
+def active_students(db, token=None, page_size=DEFAULT_PAGE_SIZE, count=None):
+    """``active_students``, paged by userId."""
+    return paginate(db.users, {"role": "student", "isActive": True},
+                    [("role", 1), ("isActive", 1), ("userId", 1)],
+                    page_size, token, {"_id": 0, "userId": 1, "email": 1}, count)
+
+
+def course_roster(db, course_id, token=None, page_size=DEFAULT_PAGE_SIZE, count=None):
+    """Enrollments of one course, paged by studentId."""
+    return paginate(db.enrollments, {"courseId": course_id}, [("courseId", 1), ("studentId", 1)],
+                    page_size, token, {"_id": 0, "studentId": 1, "progress": 1, "isCompleted": 1}, count)
@@ -0,0 +1,42 @@
+"""Run the registered Part 3-4 reads (``eduhub.workload``) and show the results.
+
+::
+
+    python -m eduhub queries                          # every query: row counts and timings
+    python -m eduhub queries active_students --show   # print the documents
+"""
+
+import argparse
+import time
+
+from bson import json_util
+
+from eduhub import connection
+from eduhub.workload import get_queries
+
+
+def run(db, names=None):
+    """``{name: (documents, milliseconds)}`` for the named queries (all by default)."""
+    results = {}
+    for query in get_queries(names):
+        start = time.perf_counter()
+        docs = query.run(db)
+        results[query.name] = (docs, (time.perf_counter() - start) * 1000)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the EduHub Part 3-4 queries.")
+    parser.add_argument("names", nargs="*", help="query names (default: all)")
+    parser.add_argument("--show", action="store_true", help="print the result documents")
+    args = parser.parse_args(argv)
+
+    for name, (docs, ms) in run(connection.get_db(), args.names).items():
+        print(f"{name:<30} {len(docs):>6} docs {ms:8.2f}ms")
+        if args.show:
+            for doc in docs:
+                print("   ", json_util.dumps(doc))
+
+
+if __name__ == "__main__":
+    main()
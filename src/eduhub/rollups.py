@@ -0,0 +1,322 @@
+"""Materialized rollups behind the Task 4.2 dashboards.
+
+The Part 4 pipelines scan all of ``enrollments`` or ``submissions`` and
+``$lookup`` into ``courses``/``users`` on every run.  Here their results are
+kept in small summary collections instead:
+
+==============================  ==========  ===================================
+collection                      ``_id``     serves
+==============================  ==========  ===================================
+``rollup_course_enrollments``   courseId    enroll_stats, completion_rates,
+                                            popular_cats
+``rollup_student_grades``       studentId   student_grades
+``rollup_instructor_stats``     instructor  instructor_stats
+``rollup_monthly_enrollments``  ``YYYY-MM`` monthly_trends
+==============================  ==========  ===================================
+
+A refresh only looks at source documents inserted (``_id``) or modified
+(``updatedAt``) since the watermark stored in ``rollup_state``, collects the
+rollup keys they touch, recomputes just those keys and writes them with
+``$merge``.  Recomputing whole keys makes refreshes idempotent, so the
+watermark keeps a safety overlap rather than trying to be exact.
+
+Writers must set ``updatedAt`` when they modify enrollments or submissions
+(inserts are picked up from ``_id``).  Deletes and key changes (an enrollment
+moved to another course or month) are not visible to the watermark; call
+``refresh_keys`` for the affected keys or ``rebuild`` periodically.  The
+same goes for the student names copied into ``rollup_student_grades``: a
+``users`` edit shows up on that student's next refresh.
+"""
+
+import argparse
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Callable
+
+from bson import ObjectId
+from pymongo import DESCENDING
+
+from eduhub import connection
+from eduhub.workload import IndexSpec
+
+STATE_COLLECTION = "rollup_state"
+# Overlap between consecutive refreshes, to absorb client clock skew and
+# writes that were in flight while the previous refresh ran.
+DEFAULT_LAG = timedelta(minutes=5)
+
+
+@dataclass
+class ChangeSource:
+    """A collection whose changes invalidate rollup keys.
+
+    ``key_stages`` run after the "changed since watermark" ``$match`` and must
+    emit one ``{"_id": <rollup key>}`` document per affected key.
+    """
+
+    collection: str
+    key_stages: list
+
+
+@dataclass
+class Rollup:
+    name: str
+    target: str
+    source: str
+    # keys (or None for everything) -> pipeline on ``source`` producing one
+    # document per rollup key, ``_id`` being the key.
+    pipeline: Callable
+    changes: list
+    indexes: list = field(default_factory=list)
+
+
+def _course_pipeline(keys):
+    match = [{"$match": {"courseId": {"$in": keys}}}] if keys is not None else []
+    return match + [
+        {"$group": {"_id": "$courseId", "total": {"$sum": 1},
+                    "completed": {"$sum": {"$cond": [{"$eq": ["$isCompleted", True]}, 1, 0]}}}},
+        {"$lookup": {"from": "courses", "localField": "_id", "foreignField": "courseId", "as": "course"}},
+        {"$project": {
+            "total": 1,
+            "completed": 1,
+            "hasCourse": {"$gt": [{"$size": "$course"}, 0]},
+            "category": {"$first": "$course.category"},
+            "instructorId": {"$first": "$course.instructorId"},
+            "title": {"$first": "$course.title"},
+            "price": {"$first": "$course.price"},
+        }},
+    ]
+
+
+# Only what student_grades displays; the full users document would go stale
+# with every profile edit and bloat each rollup row.
+STUDENT_FIELDS = ["firstName", "lastName", "email"]
+
+
+def _student_pipeline(keys):
+    match = [{"$match": {"studentId": {"$in": keys}}}] if keys is not None else []
+    return match + [
+        {"$group": {"_id": "$studentId", "gradeSum": {"$sum": "$grade"},
+                    "gradeCount": {"$sum": {"$cond": [{"$isNumber": "$grade"}, 1, 0]}}}},
+        {"$lookup": {"from": "users", "localField": "_id", "foreignField": "userId", "as": "student"}},
+        {"$project": {
+            "gradeSum": 1,
+            "gradeCount": 1,
+            "avgGrade": {"$cond": [{"$gt": ["$gradeCount", 0]},
+                                   {"$divide": ["$gradeSum", "$gradeCount"]}, None]},
+            "student": {"$cond": [{"$gt": [{"$size": "$student"}, 0]},
+                                  {f: {"$first": f"$student.{f}"} for f in STUDENT_FIELDS}, "$$REMOVE"]},
+        }},
+    ]
+
+
+def _instructor_pipeline(keys):
+    match = [{"$match": {"instructorId": {"$in": keys}}}] if keys is not None else []
+    return match + [
+        {"$lookup": {"from": "enrollments", "localField": "courseId", "foreignField": "courseId", "as": "enrolls"}},
+        {"$unwind": "$enrolls"},
+        {"$group": {"_id": "$instructorId", "students": {"$addToSet": "$enrolls.studentId"},
+                    "revenue": {"$sum": "$price"}}},
+        {"$project": {"totalStudents": {"$size": "$students"}, "totalRevenue": "$revenue"}},
+    ]
+
+
+_MONTH = {"$dateToString": {"format": "%Y-%m", "date": "$enrollDate"}}
+
+
+def _month_range(month):
+    year, mon = map(int, month.split("-"))
+    start = datetime(year, mon, 1)
+    end = datetime(year + mon // 12, mon % 12 + 1, 1)
+    return {"enrollDate": {"$gte": start, "$lt": end}}
+
+
+def _monthly_pipeline(keys):
+    match = [{"$match": {"$or": [_month_range(k) for k in keys]}}] if keys is not None else []
+    return match + [{"$group": {"_id": _MONTH, "count": {"$sum": 1}}}]
+
+
+ROLLUPS = [
+    Rollup("course_enrollments", "rollup_course_enrollments", "enrollments", _course_pipeline,
+           changes=[ChangeSource("enrollments", [{"$group": {"_id": "$courseId"}}]),
+                    ChangeSource("courses", [{"$group": {"_id": "$courseId"}}])],
+           indexes=[IndexSpec("rollup_course_enrollments", [("category", 1)])]),
+    Rollup("student_grades", "rollup_student_grades", "submissions", _student_pipeline,
+           changes=[ChangeSource("submissions", [{"$group": {"_id": "$studentId"}}])],
+           indexes=[IndexSpec("rollup_student_grades", [("avgGrade", DESCENDING)])]),
+    Rollup("instructor_stats", "rollup_instructor_stats", "courses", _instructor_pipeline,
+           changes=[ChangeSource("enrollments", [
+                        {"$group": {"_id": "$courseId"}},
+                        {"$lookup": {"from": "courses", "localField": "_id", "foreignField": "courseId",
+                                     "as": "course"}},
+                        {"$unwind": "$course"},
+                        {"$group": {"_id": "$course.instructorId"}}]),
+                    ChangeSource("courses", [{"$group": {"_id": "$instructorId"}}])]),
+    Rollup("monthly_enrollments", "rollup_monthly_enrollments", "enrollments", _monthly_pipeline,
+           changes=[ChangeSource("enrollments", [{"$group": {"_id": _MONTH}}])]),
+]
+
+ROLLUPS_BY_NAME = {r.name: r for r in ROLLUPS}
+
+# Change detection filters on _id and updatedAt; both need to be indexed for
+# the refresh to stay proportional to the number of changes.
+SOURCE_INDEXES = [
+    IndexSpec("enrollments", [("updatedAt", 1)]),
+    IndexSpec("submissions", [("updatedAt", 1)]),
+    IndexSpec("courses", [("updatedAt", 1)]),
+]
+
+
+def ensure_indexes(db):
+    for spec in SOURCE_INDEXES:
+        spec.create(db)
+    for rollup in ROLLUPS:
+        for spec in rollup.indexes:
+            spec.create(db)
+
+
+def _merge(rollup, keys, token):
+    return rollup.pipeline(keys) + [
+        {"$set": {"refreshId": token}},
+        {"$merge": {"into": rollup.target, "on": "_id", "whenMatched": "replace", "whenNotMatched": "insert"}},
+    ]
+
+
+def refresh_keys(db, rollup, keys):
+    """Recompute the given rollup keys; keys with no source data left are removed."""
+    keys = list(keys)
+    if not keys:
+        return 0
+    token = ObjectId()
+    db[rollup.source].aggregate(_merge(rollup, keys, token), allowDiskUse=True)
+    db[rollup.target].delete_many({"_id": {"$in": keys}, "refreshId": {"$ne": token}})
+    return len(keys)
+
+
+def rebuild(db, rollup):
+    """Recompute a rollup from scratch and reset its watermark."""
+    started_utc, started_local = datetime.now(timezone.utc), datetime.now()
+    token = ObjectId()
+    db[rollup.source].aggregate(_merge(rollup, None, token), allowDiskUse=True)
+    db[rollup.target].delete_many({"refreshId": {"$ne": token}})
+    _save_watermark(db, rollup, started_utc, started_local, DEFAULT_LAG)
+
+
+def _save_watermark(db, rollup, started_utc, started_local, lag):
+    db[STATE_COLLECTION].update_one(
+        {"_id": rollup.name},
+        {"$set": {"idWatermark": ObjectId.from_datetime(started_utc - lag),
+                  "updatedAtWatermark": started_local - lag,
+                  "refreshedAt": started_local}},
+        upsert=True,
+    )
+
+
+def changed_keys(db, rollup, state):
+    """Stream the rollup keys touched since the watermark in ``state``."""
+    changed = {"$or": [{"_id": {"$gte": state["idWatermark"]}},
+                       {"updatedAt": {"$gte": state["updatedAtWatermark"]}}]}
+    for source in rollup.changes:
+        cursor = db[source.collection].aggregate([{"$match": changed}] + source.key_stages, allowDiskUse=True)
+        for doc in cursor:
+            if doc["_id"] is not None:
+                yield doc["_id"]
+
+
+def refresh(db, rollup, batch_size=1000, lag=DEFAULT_LAG):
+    """Incrementally refresh one rollup; returns the number of keys recomputed.
+
+    The first refresh (no stored watermark) is a full rebuild.
+    """
+    state = db[STATE_COLLECTION].find_one({"_id": rollup.name})
+    if state is None:
+        rebuild(db, rollup)
+        return db[rollup.target].estimated_document_count()
+
+    started_utc, started_local = datetime.now(timezone.utc), datetime.now()
+    keys = changed_keys(db, rollup, state)
+    refreshed = 0
+    seen = set()
+    while True:
+        chunk = list(islice(keys, batch_size))
+        if not chunk:
+            break
+        # The same key can come from several change sources.
+        batch = [k for k in chunk if k not in seen]
+        seen.update(batch)
+        refreshed += refresh_keys(db, rollup, batch)
+    _save_watermark(db, rollup, started_utc, started_local, lag)
+    return refreshed
+
+
+def refresh_all(db, **kwargs):
+    return {rollup.name: refresh(db, rollup, **kwargs) for rollup in ROLLUPS}
+
+
+# --- dashboard reads (same shapes as the Task 4.2 pipelines) ---
+
+def enroll_stats(db):
+    return list(db.rollup_course_enrollments.aggregate([
+        {"$match": {"hasCourse": True}},
+        {"$group": {"_id": "$category", "avgEnrollments": {"$avg": "$total"}}},
+    ]))
+
+
+def student_grades(db, limit=5):
+    cursor = db.rollup_student_grades.find(
+        {"student": {"$exists": True}}, {"gradeSum": 0, "gradeCount": 0, "refreshId": 0})
+    return list(cursor.sort("avgGrade", DESCENDING).limit(limit))
+
+
+def completion_rates(db):
+    return list(db.rollup_course_enrollments.aggregate([
+        {"$project": {"completionRate": {"$multiply": [{"$divide": ["$completed", "$total"]}, 100]}}},
+    ]))
+
+
+def instructor_stats(db):
+    return list(db.rollup_instructor_stats.find({}, {"refreshId": 0}))
+
+
+def monthly_trends(db):
+    return list(db.rollup_monthly_enrollments.find({}, {"refreshId": 0}).sort("_id", 1))
+
+
+def popular_cats(db, limit=3):
+    return list(db.rollup_course_enrollments.aggregate([
+        {"$match": {"hasCourse": True}},
+        {"$group": {"_id": "$category", "enrollCount": {"$sum": "$total"}}},
+        {"$sort": {"enrollCount": -1}},
+        {"$limit": limit},
+    ]))
+
+
+def dashboard(db):
+    return {
+        "enroll_stats": enroll_stats(db),
+        "student_grades": student_grades(db),
+        "completion_rates": completion_rates(db),
+        "instructor_stats": instructor_stats(db),
+        "monthly_trends": monthly_trends(db),
+        "popular_cats": popular_cats(db),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh the EduHub dashboard rollups.")
+    parser.add_argument("--rebuild", action="store_true", help="recompute everything from scratch")
+    parser.add_argument("--only", nargs="*", choices=list(ROLLUPS_BY_NAME))
+    args = parser.parse_args(argv)
+
+    db = connection.get_db()
+    ensure_indexes(db)
+    for rollup in (ROLLUPS_BY_NAME[n] for n in args.only) if args.only else ROLLUPS:
+        if args.rebuild:
+            rebuild(db, rollup)
+            print(f"{rollup.name}: rebuilt ({db[rollup.target].estimated_document_count()} docs)")
+        else:
+            print(f"{rollup.name}: {refresh(db, rollup)} keys refreshed")
+
+
+if __name__ == "__main__":
+    main()
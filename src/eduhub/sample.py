@@ -0,0 +1,112 @@
+"""The hand-written EduHub sample dataset (Part 2).
+
+20 users (15 students, 5 instructors), 8 courses, 15 enrollments, 25
+lessons, 10 assignments and 12 submissions, keyed by collection in
+``SAMPLE``.  ``eduhub.seed`` loads it; ``eduhub.datagen`` generates larger
+datasets in the same format.
+"""
+
+from datetime import datetime
+
+# Users: 15 students, 5 instructors
+USERS = [
+    {"userId": "stu001", "email": "student1@example.com", "firstName": "Alice", "lastName": "Smith", "role": "student", "dateJoined": datetime(2025, 1, 15), "profile": {"bio": "Beginner learner", "avatar": "avatar1.jpg", "skills": ["Python"]}, "isActive": True},
+    {"userId": "stu002", "email": "student2@example.com", "firstName": "Bob", "lastName": "Brown", "role": "student", "dateJoined": datetime(2025, 1, 16), "profile": {"bio": "Intermediate learner", "avatar": "avatar2.jpg", "skills": ["Python", "Data Science"]}, "isActive": True},
+    {"userId": "stu003", "email": "student3@example.com", "firstName": "Charlie", "lastName": "Davis", "role": "student", "dateJoined": datetime(2025, 1, 17), "profile": {"bio": "Advanced learner", "avatar": "avatar3.jpg", "skills": ["Python", "Machine Learning"]}, "isActive": True},
+    {"userId": "stu004", "email": "student4@example.com", "firstName": "David", "lastName": "Evans", "role": "student", "dateJoined": datetime(2025, 1, 18), "profile": {"bio": "Beginner learner", "avatar": "avatar4.jpg", "skills": ["Python"]}, "isActive": True},
+    {"userId": "stu005", "email": "student5@example.com", "firstName": "Eva", "lastName": "Garcia", "role": "student", "dateJoined": datetime(2025, 1, 19), "profile": {"bio": "Intermediate learner", "avatar": "avatar5.jpg", "skills": ["Python", "Data Science"]}, "isActive": True},
+    {"userId": "stu006", "email": "student6@example.com", "firstName": "Frank", "lastName": "Harris", "role": "student", "dateJoined": datetime(2025, 1, 20), "profile": {"bio": "Advanced learner", "avatar": "avatar6.jpg", "skills": ["Python", "Machine Learning"]}, "isActive": True},
+    {"userId": "stu007", "email": "student7@example.com", "firstName": "Grace", "lastName": "Johnson", "role": "student", "dateJoined": datetime(2025, 1, 21), "profile": {"bio": "Beginner learner", "avatar": "avatar7.jpg", "skills": ["Python"]}, "isActive": True},
+    {"userId": "stu008", "email": "student8@example.com", "firstName": "Hank", "lastName": "King", "role": "student", "dateJoined": datetime(2025, 1, 22), "profile": {"bio": "Intermediate learner", "avatar": "avatar8.jpg", "skills": ["Python", "Data Science"]}, "isActive": True},
+    {"userId": "stu009", "email": "student9@example.com", "firstName": "Ivy", "lastName": "Lee", "role": "student", "dateJoined": datetime(2025, 1, 23), "profile": {"bio": "Advanced learner", "avatar": "avatar9.jpg", "skills": ["Python", "Machine Learning"]}, "isActive": True},
+    {"userId": "stu010", "email": "student10@example.com", "firstName": "Jack", "lastName": "Miller", "role": "student", "dateJoined": datetime(2025, 1, 24), "profile": {"bio": "Beginner learner", "avatar": "avatar10.jpg", "skills": ["Python"]}, "isActive": True},
+    {"userId": "stu011", "email": "student11@example.com", "firstName": "Kathy", "lastName": "Wilson", "role": "student", "dateJoined": datetime(2025, 1, 25), "profile": {"bio": "Intermediate learner", "avatar": "avatar11.jpg", "skills": ["Python", "Data Science"]}, "isActive": True},
+    {"userId": "stu012", "email": "student12@example.com", "firstName": "Leo", "lastName": "Martinez", "role": "student", "dateJoined": datetime(2025, 1, 26), "profile": {"bio": "Advanced learner", "avatar": "avatar12.jpg", "skills": ["Python", "Machine Learning"]}, "isActive": True},
+    {"userId": "stu013", "email": "student13@example.com", "firstName": "Mia", "lastName": "Garcia", "role": "student", "dateJoined": datetime(2025, 1, 27), "profile": {"bio": "Beginner learner", "avatar": "avatar13.jpg", "skills": ["Python"]}, "isActive": True},
+    {"userId": "stu014", "email": "student14@example.com", "firstName": "Noah", "lastName": "Rodriguez", "role": "student", "dateJoined": datetime(2025, 1, 28), "profile": {"bio": "Intermediate learner", "avatar": "avatar14.jpg", "skills": ["Python", "Data Science"]}, "isActive": True},
+    {"userId": "stu015", "email": "student15@example.com", "firstName": "Olivia", "lastName": "Martinez", "role": "student", "dateJoined": datetime(2025, 1, 29), "profile": {"bio": "Advanced learner", "avatar": "avatar15.jpg", "skills": ["Python", "Machine Learning"]}, "isActive": True},
+    {"userId": "inst001", "email": "instructor1@example.com", "firstName": "Dr. Bob", "lastName": "Johnson", "role": "instructor", "dateJoined": datetime(2024, 12, 1), "profile": {"bio": "Expert in AI", "avatar": "inst1.jpg", "skills": ["MongoDB", "PyMongo"]}, "isActive": True},
+    {"userId": "inst002", "email": "instructor2@example.com", "firstName": "Dr. Alice", "lastName": "Smith", "role": "instructor", "dateJoined": datetime(2024, 12, 2), "profile": {"bio": "Expert in Data Science", "avatar": "inst2.jpg", "skills": ["Pandas", "NumPy"]}, "isActive": True},
+    {"userId": "inst003", "email": "instructor3@example.com", "firstName": "Dr. Charlie", "lastName": "Brown", "role": "instructor", "dateJoined": datetime(2024, 12, 3), "profile": {"bio": "Expert in Web Development", "avatar": "inst3.jpg", "skills": ["HTML", "CSS", "JavaScript"]}, "isActive": True},
+    {"userId": "inst004", "email": "instructor4@example.com", "firstName": "Dr. David", "lastName": "Wilson", "role": "instructor", "dateJoined": datetime(2024, 12, 4), "profile": {"bio": "Expert in Cybersecurity", "avatar": "inst4.jpg", "skills": ["Network Security", "Ethical Hacking"]}, "isActive": True},
+    {"userId": "inst005", "email": "instructor5@example.com", "firstName": "Dr. Eva", "lastName": "Garcia", "role": "instructor", "dateJoined": datetime(2024, 12, 5), "profile": {"bio": "Expert in Cloud Computing", "avatar": "inst5.jpg", "skills": ["AWS", "Azure"]}, "isActive": True},
+    # Total: 20 users
+]
+
+# Courses: 8 across categories (Programming, Data Science, etc.)
+COURSES = [
+    {"courseId": "c001", "title": "Intro to Python", "description": "Basics of Python", "instructorId": "inst001", "category": "Programming", "level": "beginner", "duration": 10.5, "price": 49.99, "tags": ["python", "coding"], "createdAt": datetime(2025, 1, 10), "updatedAt": datetime.now(), "isPublished": True},
+    {"courseId": "c002", "title": "Data Science with Python", "description": "Learn Data Science", "instructorId": "inst002", "category": "Data Science", "level": "intermediate", "duration": 15.0, "price": 79.99, "tags": ["data science", "python"], "createdAt": datetime(2025, 1, 12), "updatedAt": datetime.now(), "isPublished": True},
+    {"courseId": "c003", "title": "Web Development Basics", "description": "HTML, CSS, JS", "instructorId": "inst003", "category": "Web Development", "level": "beginner", "duration": 12.0, "price": 59.99, "tags": ["web", "html", "css", "javascript"], "createdAt": datetime(2025, 1, 14), "updatedAt": datetime.now(), "isPublished": True},
+    {"courseId": "c004", "title": "Advanced Python", "description": "Deep dive into Python", "instructorId": "inst001", "category": "Programming", "level": "advanced", "duration": 20.0, "price": 99.99, "tags": ["python", "advanced"], "createdAt": datetime(2025, 1, 16), "updatedAt": datetime.now(), "isPublished": True},
+    {"courseId": "c005", "title": "Machine Learning", "description": "Intro to ML", "instructorId": "inst002", "category": "Data Science", "level": "advanced", "duration": 18.0, "price": 89.99, "tags": ["machine learning", "python"], "createdAt": datetime(2025, 1, 18), "updatedAt": datetime.now(), "isPublished": True},
+    {"courseId": "c006", "title": "Frontend Development", "description": "React and Vue", "instructorId": "inst003", "category": "Web Development", "level": "intermediate", "duration": 14.0, "price": 69.99, "tags": ["react", "vue", "javascript"], "createdAt": datetime(2025, 1, 20), "updatedAt": datetime.now(), "isPublished": True},
+    {"courseId": "c007", "title": "Cybersecurity Fundamentals", "description": "Basics of Cybersecurity", "instructorId": "inst004", "category": "Cybersecurity", "level": "beginner", "duration": 11.0, "price": 54.99, "tags": ["cybersecurity", "network"], "createdAt": datetime(2025, 1, 22), "updatedAt": datetime.now(), "isPublished": True},
+    {"courseId": "c008", "title": "Cloud Computing 101", "description": "Intro to Cloud", "instructorId": "inst005", "category": "Cloud Computing", "level": "beginner", "duration": 13.0, "price": 64.99, "tags": ["cloud", "aws", "azure"], "createdAt": datetime(2025, 1, 24), "updatedAt": datetime.now(), "isPublished": True},
+    # Total: 8 courses
+]
+
+# Enrollments: 15
+ENROLLMENTS = [
+    {"enrollmentId": "e001", "studentId": "stu001", "courseId": "c001", "enrollDate": datetime(2025, 2, 1), "progress": 75.0, "isCompleted": False},
+    {"enrollmentId": "e002", "studentId": "stu002", "courseId": "c002", "enrollDate": datetime(2025, 2, 2), "progress": 50.0, "isCompleted": False},
+    {"enrollmentId": "e003", "studentId": "stu003", "courseId": "c003", "enrollDate": datetime(2025, 2, 3), "progress": 20.0, "isCompleted": False},
+    {"enrollmentId": "e004", "studentId": "stu004", "courseId": "c004", "enrollDate": datetime(2025, 2, 4), "progress": 90.0, "isCompleted": True},
+    {"enrollmentId": "e005", "studentId": "stu005", "courseId": "c005", "enrollDate": datetime(2025, 2, 5), "progress": 60.0, "isCompleted": False},
+    {"enrollmentId": "e006", "studentId": "stu006", "courseId": "c006", "enrollDate": datetime(2025, 2, 6), "progress": 30.0, "isCompleted": False},
+    {"enrollmentId": "e007", "studentId": "stu007", "courseId": "c007", "enrollDate": datetime(2025, 2, 7), "progress": 80.0, "isCompleted": False},
+    {"enrollmentId": "e008", "studentId": "stu008", "courseId": "c008", "enrollDate": datetime(2025, 2, 8), "progress": 40.0, "isCompleted": False},
+    {"enrollmentId": "e009", "studentId": "stu009", "courseId": "c001", "enrollDate": datetime(2025, 2, 9), "progress": 10.0, "isCompleted": False},
+    {"enrollmentId": "e010", "studentId": "stu010", "courseId": "c002", "enrollDate": datetime(2025, 2, 10), "progress": 55.0, "isCompleted": False},
+    {"enrollmentId": "e011", "studentId": "stu011", "courseId": "c003", "enrollDate": datetime(2025, 2, 11), "progress": 70.0, "isCompleted": False},
+    {"enrollmentId": "e012", "studentId": "stu012", "courseId": "c004", "enrollDate": datetime(2025, 2, 12), "progress": 85.0, "isCompleted": True},
+    {"enrollmentId": "e013", "studentId": "stu013", "courseId": "c005", "enrollDate": datetime(2025, 2, 13), "progress": 25.0, "isCompleted": False},
+    {"enrollmentId": "e014", "studentId": "stu014", "courseId": "c006", "enrollDate": datetime(2025, 2, 14), "progress": 95.0, "isCompleted": True},
+    {"enrollmentId": "e015", "studentId": "stu015", "courseId": "c007", "enrollDate": datetime(2025, 2, 15), "progress": 15.0, "isCompleted": False},
+    # Total: 15 enrollments
+]
+
+# Lessons: 25 across courses
+LESSONS = [{"lessonId": f"l{i:03d}", "title": f"Lesson {i}", "courseId": "c001" if i<4 else "c002", "content": "Sample content", "order": i, "duration": 1.0} for i in range(1, 26)]
+
+# Assignments: 10
+ASSIGNMENTS = [
+    {"assignmentId": "a001", "title": "Python Homework 1", "courseId": "c001", "dueDate": datetime(2025, 3, 15), "maxScore": 100.0},
+    {"assignmentId": "a002", "title": "Data Science Project", "courseId": "c002", "dueDate": datetime(2025, 3, 20), "maxScore": 100.0},
+    {"assignmentId": "a003", "title": "Web Dev Assignment", "courseId": "c003", "dueDate": datetime(2025, 3, 25), "maxScore": 100.0},
+    {"assignmentId": "a004", "title": "Advanced Python Quiz", "courseId": "c004", "dueDate": datetime(2025, 3, 30), "maxScore": 100.0},
+    {"assignmentId": "a005", "title": "ML Case Study", "courseId": "c005", "dueDate": datetime(2025, 4, 5), "maxScore": 100.0},
+    {"assignmentId": "a006", "title": "Frontend Project", "courseId": "c006", "dueDate": datetime(2025, 4, 10), "maxScore": 100.0},
+    {"assignmentId": "a007", "title": "Cybersecurity Report", "courseId": "c007", "dueDate": datetime(2025, 4, 15), "maxScore": 100.0},
+    {"assignmentId": "a008", "title": "Cloud Deployment", "courseId": "c008", "dueDate": datetime(2025, 4, 20), "maxScore": 100.0},
+    {"assignmentId": "a009", "title": "Python Homework 2", "courseId": "c001", "dueDate": datetime(2025, 4, 25), "maxScore": 100.0},
+    {"assignmentId": "a010", "title": "Data Science Final Project", "courseId": "c002", "dueDate": datetime(2025, 4, 30), "maxScore": 100.0},
+    # Total: 10 assignments
+]
+
+# Submissions: 12
+SUBMISSIONS = [
+    {"submissionId": "s001", "studentId": "stu001", "assignmentId": "a001", "submissionDate": datetime(2025, 3, 10), "fileUrl": "submit1.pdf", "grade": 85.0, "feedback": "Good work"},
+    {"submissionId": "s002", "studentId": "stu002", "assignmentId": "a002", "submissionDate": datetime(2025, 3, 18), "fileUrl": "submit2.pdf", "grade": 90.0, "feedback": "Excellent"},
+    {"submissionId": "s003", "studentId": "stu003", "assignmentId": "a003", "submissionDate": datetime(2025, 3, 22), "fileUrl": "submit3.pdf", "grade": 75.0, "feedback": "Needs improvement"},
+    {"submissionId": "s004", "studentId": "stu004", "assignmentId": "a004", "submissionDate": datetime(2025, 3, 28), "fileUrl": "submit4.pdf", "grade": 88.0, "feedback": "Well done"},
+    {"submissionId": "s005", "studentId": "stu005", "assignmentId": "a005", "submissionDate": datetime(2025, 4, 2), "fileUrl": "submit5.pdf", "grade": 92.0, "feedback": "Great job"},
+    {"submissionId": "s006", "studentId": "stu006", "assignmentId": "a006", "submissionDate": datetime(2025, 4, 8), "fileUrl": "submit6.pdf", "grade": 80.0, "feedback": "Good effort"},
+    {"submissionId": "s007", "studentId": "stu007", "assignmentId": "a007", "submissionDate": datetime(2025, 4, 12), "fileUrl": "submit7.pdf", "grade": 78.0, "feedback": "Satisfactory"},
+    {"submissionId": "s008", "studentId": "stu008", "assignmentId": "a008", "submissionDate": datetime(2025, 4, 18), "fileUrl": "submit8.pdf", "grade": 95.0, "feedback": "Outstanding"},
+    {"submissionId": "s009", "studentId": "stu009", "assignmentId": "a009", "submissionDate": datetime(2025, 4, 22), "fileUrl": "submit9.pdf", "grade": 82.0, "feedback": "Good job"},
+    {"submissionId": "s010", "studentId": "stu010", "assignmentId": "a010", "submissionDate": datetime(2025, 4, 29), "fileUrl": "submit10.pdf", "grade": 89.0, "feedback": "Very good"},
+    {"submissionId": "s011", "studentId": "stu011", "assignmentId": "a001", "submissionDate": datetime(2025, 3, 11), "fileUrl": "submit11.pdf", "grade": 84.0, "feedback": ""},
+    {"submissionId": "s012", "studentId": "stu012", "assignmentId": "a002", "submissionDate": datetime(2025, 3, 19), "fileUrl": "submit12.pdf", "grade": 91.0, "feedback": ""},
+    # Total: 12 submissions
+]
+
+
+SAMPLE = {
+    "users": USERS,
+    "courses": COURSES,
+    "enrollments": ENROLLMENTS,
+    "lessons": LESSONS,
+    "assignments": ASSIGNMENTS,
+    "submissions": SUBMISSIONS,
+}
@@ -0,0 +1,114 @@
+"""The ``$jsonSchema`` validators of the EduHub collections.
+
+Defined once here and used both to create the collections (Part 1) and by
+``eduhub.validation`` to check documents in process before they are sent.
+``enrollments`` has no validator.
+
+It also defines ``titlePrefixes``, the search field derived from a course
+title, so every writer of courses (``eduhub.search``, ``eduhub.denormalize``,
+``eduhub.datagen``) fills it in the same way.
+"""
+
+import re
+import unicodedata
+
+SCHEMAS = {
+    "users": {
+        "bsonType": "object",
+        "required": ["email", "firstName", "lastName", "role"],
+        "properties": {
+            "userId": {"bsonType": "string"},
+            "email": {"bsonType": "string", "pattern": "^.+@.+$"},
+            "firstName": {"bsonType": "string"},
+            "lastName": {"bsonType": "string"},
+            "role": {"enum": ["student", "instructor"]},
+            "dateJoined": {"bsonType": "date"},
+            "profile": {
+                "bsonType": "object",
+                "properties": {
+                    "bio": {"bsonType": "string"},
+                    "avatar": {"bsonType": "string"},
+                    "skills": {"bsonType": "array", "items": {"bsonType": "string"}}
+                }
+            },
+            "isActive": {"bsonType": "bool"}
+        }
+    },
+    "courses": {
+        "bsonType": "object",
+        "required": ["title", "instructorId"],
+        "properties": {
+            "courseId": {"bsonType": "string"},
+            "title": {"bsonType": "string"},
+            "description": {"bsonType": "string"},
+            "instructorId": {"bsonType": "string"},
+            "category": {"bsonType": "string"},
+            "level": {"enum": ["beginner", "intermediate", "advanced"]},
+            "duration": {"bsonType": "double"},
+            "price": {"bsonType": "double"},
+            "tags": {"bsonType": "array", "items": {"bsonType": "string"}},
+            "createdAt": {"bsonType": "date"},
+            "updatedAt": {"bsonType": "date"},
+            "isPublished": {"bsonType": "bool"}
+        }
+    },
+    "lessons": {
+        "bsonType": "object",
+        "required": ["title", "courseId"],
+        "properties": {
+            "lessonId": {"bsonType": "string"},
+            "title": {"bsonType": "string"},
+            "courseId": {"bsonType": "string"},
+            "content": {"bsonType": "string"},
+            "order": {"bsonType": "int"},
+            "duration": {"bsonType": "double"}
+        }
+    },
+    "assignments": {
+        "bsonType": "object",
+        "required": ["title", "courseId"],
+        "properties": {
+            "assignmentId": {"bsonType": "string"},
+            "title": {"bsonType": "string"},
+            "courseId": {"bsonType": "string"},
+            "dueDate": {"bsonType": "date"},
+            "maxScore": {"bsonType": "double"}
+        }
+    },
+    "submissions": {
+        "bsonType": "object",
+        "required": ["studentId", "assignmentId"],
+        "properties": {
+            "submissionId": {"bsonType": "string"},
+            "studentId": {"bsonType": "string"},
+            "assignmentId": {"bsonType": "string"},
+            "submissionDate": {"bsonType": "date"},
+            "fileUrl": {"bsonType": "string"},
+            "grade": {"bsonType": "double"},
+            "feedback": {"bsonType": "string"}
+        }
+    },
+}
+
+
+# Edge n-grams of the normalized title words ("py", "pyt", ... "python"),
+# stored on courses for search-as-you-type (see eduhub.search).
+PREFIX_FIELD = "titlePrefixes"
+MIN_GRAM = 1
+MAX_GRAM = 20
+
+
+def normalize(text):
+    """Lowercase words with accents stripped: ``"Café-Basics"`` -> ``["cafe", "basics"]``."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    plain = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return re.findall(r"[a-z0-9]+", plain.lower())
+
+
+def title_prefixes(title):
+    """Edge n-grams of every title word, deduplicated, in first-seen order."""
+    grams = {}
+    for word in normalize(title):
+        for n in range(MIN_GRAM, min(len(word), MAX_GRAM) + 1):
+            grams[word[:n]] = None
+    return list(grams)
@@ -0,0 +1,180 @@
+"""Course search: relevance-ranked full text and search-as-you-type.
+
+Task 3.2 searches titles with an unanchored case-insensitive ``$regex``,
+which cannot use an index and scans every course.  This module replaces it
+with two index-backed paths:
+
+* ``search`` - ``$text`` on the Part 5 ``title``/``category`` text index,
+  ranked by ``textScore`` plus a boost per course tag that matches a search
+  term, with optional category, level and price filters.
+* ``autocomplete`` - exact matches on ``titlePrefixes``, the edge n-grams of
+  the normalized title words ("py", "pyt", ... "python"), kept on write by
+  ``eduhub.denormalize`` and ``eduhub.datagen``.  A multikey index on
+  ``(titlePrefixes, title)`` answers a prefix with one index seek and returns
+  suggestions already in title order.
+
+Existing catalogs get the field with ``backfill``::
+
+    python -m eduhub.search backfill
+    python -m eduhub.search autocomplete "intro py"
+"""
+
+import argparse
+
+from pymongo import UpdateOne
+
+from eduhub import connection
+from eduhub.schemas import MAX_GRAM, PREFIX_FIELD, normalize, title_prefixes
+from eduhub.workload import IndexSpec, NamedQuery
+
+# textScore added per course tag that equals a search term (or the whole query).
+TAG_BOOST = 1.0
+
+INDEXES = [
+    IndexSpec("courses", [(PREFIX_FIELD, 1), ("title", 1)]),
+    # The Part 5 text index; a collection can only have one.
+    IndexSpec("courses", [("title", "text"), ("category", 1)]),
+]
+
+RESULT_PROJECTION = {"_id": 0, "courseId": 1, "title": 1, "category": 1, "level": 1,
+                     "price": 1, "tags": 1, "score": 1}
+
+
+def ensure_indexes(db):
+    for spec in INDEXES:
+        spec.create(db)
+
+
+def with_prefixes(course):
+    """Return ``course`` with ``titlePrefixes`` filled in from its title."""
+    if "title" not in course:
+        return course
+    return dict(course, **{PREFIX_FIELD: title_prefixes(course["title"])})
+
+
+def prefix_update(update):
+    """Extend an update that ``$set``s the title so it also refreshes the prefixes."""
+    title = update.get("$set", {}).get("title")
+    if title is None:
+        return update
+    return dict(update, **{"$set": dict(update["$set"], **{PREFIX_FIELD: title_prefixes(title)})})
+
+
+def backfill(db, batch_size=1000, only_missing=True):
+    """Compute ``titlePrefixes`` for existing courses with batched unordered writes."""
+    flt = {PREFIX_FIELD: {"$exists": False}} if only_missing else {}
+    batch, updated = [], 0
+    for course in db.courses.find(flt, {"title": 1}, batch_size=batch_size):
+        batch.append(UpdateOne({"_id": course["_id"]},
+                               {"$set": {PREFIX_FIELD: title_prefixes(course.get("title", ""))}}))
+        if len(batch) == batch_size:
+            updated += db.courses.bulk_write(batch, ordered=False).modified_count
+            batch = []
+    if batch:
+        updated += db.courses.bulk_write(batch, ordered=False).modified_count
+    return updated
+
+
+def _filters(category=None, level=None, min_price=None, max_price=None, published_only=True):
+    flt = {}
+    if category is not None:
+        flt["category"] = category
+    if level is not None:
+        flt["level"] = level
+    price = {}
+    if min_price is not None:
+        price["$gte"] = float(min_price)
+    if max_price is not None:
+        price["$lte"] = float(max_price)
+    if price:
+        flt["price"] = price
+    if published_only:
+        flt["isPublished"] = True
+    return flt
+
+
+def search_query(text, category=None, level=None, min_price=None, max_price=None,
+                 published_only=True, limit=20, tag_boost=TAG_BOOST):
+    """The ranked search as a ``NamedQuery`` (so it can be benchmarked and explained)."""
+    terms = normalize(text)
+    phrase = " ".join(terms)
+    match = dict(_filters(category, level, min_price, max_price, published_only),
+                 **{"$text": {"$search": text}})
+    boost = {"$multiply": [tag_boost, {"$size": {"$setIntersection": [
+        {"$map": {"input": {"$ifNull": ["$tags", []]}, "in": {"$toLower": "$$this"}}},
+        sorted(set(terms) | {phrase}),
+    ]}}]}
+    return NamedQuery("course_search", "courses", pipeline=[
+        {"$match": match},
+        {"$addFields": {"score": {"$add": [{"$meta": "textScore"}, boost]}}},
+        {"$sort": {"score": -1, "courseId": 1}},
+        {"$limit": limit},
+        {"$project": RESULT_PROJECTION},
+    ])
+
+
+def search(db, text, category=None, level=None, min_price=None, max_price=None,
+           published_only=True, limit=20):
+    """Courses matching ``text``, best first, each with its relevance ``score``.
+
+    Without search terms this is a plain filtered listing in courseId order.
+    """
+    if not normalize(text):
+        projection = {k: v for k, v in RESULT_PROJECTION.items() if k != "score"}
+        return list(db.courses.find(_filters(category, level, min_price, max_price, published_only),
+                                    projection).sort("courseId", 1).limit(limit))
+    return search_query(text, category, level, min_price, max_price, published_only, limit).run(db)
+
+
+def autocomplete_query(prefix, limit=10, published_only=True):
+    """Suggestions for what the user has typed so far, as a ``NamedQuery``.
+
+    Every typed word must start a title word.  The longest one goes first in
+    ``$all`` so that it, the most selective, becomes the index bound.
+    """
+    words = sorted({w[:MAX_GRAM] for w in normalize(prefix)}, key=len, reverse=True)
+    flt = {PREFIX_FIELD: words[0] if len(words) == 1 else {"$all": words}}
+    if published_only:
+        flt["isPublished"] = True
+    return NamedQuery("title_autocomplete", "courses", filter=flt,
+                      projection={"_id": 0, "courseId": 1, "title": 1},
+                      sort=[("title", 1)], limit=limit)
+
+
+def autocomplete(db, prefix, limit=10, published_only=True):
+    if not normalize(prefix):
+        return []
+    return autocomplete_query(prefix, limit, published_only).run(db)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EduHub course search.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("backfill", help="create the search indexes and fill titlePrefixes")
+    p = sub.add_parser("search")
+    p.add_argument("text")
+    p.add_argument("--category")
+    p.add_argument("--level")
+    p.add_argument("--min-price", type=float)
+    p.add_argument("--max-price", type=float)
+    p.add_argument("--limit", type=int, default=20)
+    p = sub.add_parser("autocomplete")
+    p.add_argument("prefix")
+    p.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    db = connection.get_db()
+    if args.command == "backfill":
+        ensure_indexes(db)
+        print(f"updated {backfill(db)} courses")
+    elif args.command == "search":
+        for c in search(db, args.text, args.category, args.level, args.min_price, args.max_price,
+                        limit=args.limit):
+            print(f"{c.get('score', 0):6.2f}  {c['courseId']:<8} {c['title']}")
+    else:
+        for c in autocomplete(db, args.prefix, args.limit):
+            print(f"{c['courseId']:<8} {c['title']}")
+
+
+if __name__ == "__main__":
+    main()
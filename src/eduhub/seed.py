@@ -0,0 +1,55 @@
+"""Load the EduHub data: the Part 2 sample or a generated dataset.
+
+::
+
+    python -m eduhub seed                 # hand-written sample (eduhub.sample)
+    python -m eduhub seed --scale 100     # generated, via eduhub.datagen
+"""
+
+import argparse
+
+from eduhub import connection, datagen
+from eduhub.sample import SAMPLE
+from eduhub.validation import insert_validated
+
+
+def reset(db, collections=None):
+    """Empty ``collections`` (every collection in the database by default)."""
+    for name in collections or db.list_collection_names():
+        db[name].delete_many({})
+
+
+def load_sample(db, rejects=None):
+    """Insert the hand-written sample, validated in process; returns counts per collection."""
+    rejects = [] if rejects is None else rejects
+    # insert_many adds _id to the documents it is given; keep SAMPLE pristine.
+    return {name: insert_validated(db, name, [dict(d) for d in docs], rejects=rejects)["inserted"]
+            for name, docs in SAMPLE.items()}
+
+
+def seed(db, scale=0, clear=True, rejects=None, **load_kwargs):
+    """Reset the database and load the sample (``scale=0``) or generated data."""
+    if clear:
+        reset(db)
+    if scale:
+        return datagen.load(scale, db_name=db.name, **load_kwargs)
+    return load_sample(db, rejects)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load EduHub data.")
+    parser.add_argument("--scale", type=float, default=0, help="generated data at this scale (0: sample)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--keep", action="store_true", help="do not empty the collections first")
+    args = parser.parse_args(argv)
+
+    db = connection.get_db()
+    rejects = []
+    kwargs = {"workers": args.workers} if args.scale else {}
+    print("Inserted:", seed(db, args.scale, not args.keep, rejects, **kwargs))
+    for doc, errors in rejects:
+        print("Rejected:", doc, errors)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Create the EduHub collections (with their validators) and indexes.
+
+Part 1 and Part 5 of the walkthrough as a reusable step::
+
+    python -m eduhub setup
+    python -m eduhub.setup_db --no-indexes
+"""
+
+import argparse
+
+from eduhub import activity, analytics, connection, counters, paging, rollups, search, workload
+from eduhub.datagen import COLLECTIONS
+from eduhub.schemas import SCHEMAS
+
+
+def create_collections(db):
+    """Create missing collections; those in ``SCHEMAS`` get their ``$jsonSchema`` validator."""
+    existing = set(db.list_collection_names())
+    created = []
+    for name in COLLECTIONS:
+        if name in existing:
+            continue
+        if name in SCHEMAS:
+            db.create_collection(name, validator={"$jsonSchema": SCHEMAS[name]})
+        else:
+            db.create_collection(name)
+        created.append(name)
+    return created
+
+
+def create_indexes(db):
+    """The Part 5 index set plus the indexes the eduhub modules rely on.
+
+    Returns ``{index name: error}`` for indexes that could not be built, e.g.
+    the unique email index while duplicate users remain (see ``eduhub.dedupe``).
+    """
+    specs = (workload.INDEXES + counters.INDEXES + search.INDEXES + paging.INDEXES + activity.INDEXES
+             + analytics.INDEXES)
+    failed = workload.create_indexes(db, specs)
+    rollups.ensure_indexes(db)
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create the EduHub collections and indexes.")
+    parser.add_argument("--no-indexes", action="store_true")
+    args = parser.parse_args(argv)
+
+    db = connection.get_db()
+    print("Created collections:", create_collections(db) or "none")
+    if not args.no_indexes:
+        for name, error in create_indexes(db).items():
+            print(f"Index {name} not created: {error}")
+        print("Indexes ready.")
+
+
+if __name__ == "__main__":
+    main()
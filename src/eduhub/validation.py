@@ -0,0 +1,235 @@
+"""In-process ``$jsonSchema`` validation for bulk loads.
+
+The server checks every insert against the collection validator, but a bad
+document only shows up as a ``WriteError`` after the round trip, and in an
+ordered ``insert_many`` it stops the rest of the batch.  ``compile_schema``
+turns the same definitions (``eduhub.schemas``) into nested closures once, so
+checking a document is a handful of ``isinstance`` calls.  ``insert_validated``
+uses them to split a document stream into full batches of valid documents
+and a reject stream, with server-side validation still the final authority:
+anything the server rejects anyway is added to the rejects.
+
+Supported keywords: ``bsonType``, ``required``, ``properties``, ``enum``,
+``pattern``, ``items``, ``minimum``/``maximum``, ``minLength``/``maxLength``,
+``minItems``/``maxItems`` and ``additionalProperties: false``.  Others are
+left to the server.  BSON types follow how PyMongo encodes Python values
+(``int`` is ``int`` when it fits in 32 bits, ``long`` otherwise).
+
+Usage::
+
+    python -m eduhub.validation --bench 100000
+"""
+
+import argparse
+import re
+import time
+from datetime import datetime
+
+from bson import Decimal128, Int64, ObjectId
+from pymongo.errors import BulkWriteError
+
+from eduhub.schemas import SCHEMAS
+
+_INT32 = (-2 ** 31, 2 ** 31 - 1)
+
+
+def _is_int32(v):
+    return type(v) is int and _INT32[0] <= v <= _INT32[1]
+
+
+def _is_long(v):
+    return isinstance(v, Int64) or (type(v) is int and not _is_int32(v))
+
+
+BSON_TYPES = {
+    "double": lambda v: type(v) is float,
+    "string": lambda v: isinstance(v, str),
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, (list, tuple)),
+    "objectId": lambda v: isinstance(v, ObjectId),
+    "bool": lambda v: isinstance(v, bool),
+    "date": lambda v: isinstance(v, datetime),
+    "null": lambda v: v is None,
+    "int": _is_int32,
+    "long": _is_long,
+    "decimal": lambda v: isinstance(v, Decimal128),
+    "number": lambda v: type(v) in (int, float) or isinstance(v, (Int64, Decimal128)),
+}
+
+
+def compile_schema(schema, path=""):
+    """Compile ``schema`` into ``check(value, errors)`` that appends error strings."""
+    checks = []
+    where = path or "document"
+
+    types = schema.get("bsonType")
+    if types is not None:
+        names = [types] if isinstance(types, str) else list(types)
+        preds = [BSON_TYPES[n] for n in names]
+        expected = "/".join(names)
+        if len(preds) == 1:
+            pred = preds[0]
+            checks.append(lambda v, e: pred(v) or e.append(f"{where}: expected {expected}"))
+        else:
+            checks.append(lambda v, e: any(p(v) for p in preds) or e.append(f"{where}: expected {expected}"))
+
+    if "enum" in schema:
+        allowed = schema["enum"]
+        checks.append(lambda v, e: v in allowed or e.append(f"{where}: {v!r} not in {allowed}"))
+
+    if "pattern" in schema:
+        regex = re.compile(schema["pattern"])
+        checks.append(lambda v, e: not isinstance(v, str) or regex.search(v)
+                      or e.append(f"{where}: does not match {regex.pattern!r}"))
+
+    for key, op, fn in (("minimum", lambda v, b: v >= b, None), ("maximum", lambda v, b: v <= b, None),
+                        ("minLength", lambda v, b: len(v) >= b, str), ("maxLength", lambda v, b: len(v) <= b, str),
+                        ("minItems", lambda v, b: len(v) >= b, list), ("maxItems", lambda v, b: len(v) <= b, list)):
+        if key in schema:
+            bound = schema[key]
+            applies = BSON_TYPES["number"] if fn is None else (lambda v, t=fn: isinstance(v, t))
+            checks.append(lambda v, e, key=key, op=op, bound=bound, applies=applies:
+                          not applies(v) or op(v, bound) or e.append(f"{where}: {key} {bound}"))
+
+    if "items" in schema:
+        item_check = compile_schema(schema["items"], f"{path}[]")
+
+        def items(v, e):
+            if isinstance(v, (list, tuple)):
+                for x in v:
+                    item_check(x, e)
+        checks.append(items)
+
+    required = list(schema.get("required", []))
+    properties = {name: compile_schema(sub, f"{path}.{name}" if path else name)
+                  for name, sub in schema.get("properties", {}).items()}
+    closed = schema.get("additionalProperties") is False
+    if required or properties or closed:
+        allowed_keys = set(properties) | {"_id"}
+
+        def obj(v, e):
+            if not isinstance(v, dict):
+                return
+            for name in required:
+                if name not in v:
+                    e.append(f"{where}: missing required {name!r}")
+            for name, check in properties.items():
+                if name in v:
+                    check(v[name], e)
+            if closed:
+                extra = [k for k in v if k not in allowed_keys]
+                if extra:
+                    e.append(f"{where}: unexpected {extra}")
+        checks.append(obj)
+
+    if len(checks) == 1:
+        return checks[0]
+
+    def check(v, e):
+        for c in checks:
+            c(v, e)
+    return check
+
+
+class Validator:
+    """A compiled schema: ``errors(doc)`` lists problems, empty when valid."""
+
+    def __init__(self, schema):
+        self.schema = schema
+        self._check = compile_schema(schema)
+
+    def errors(self, doc):
+        errors = []
+        self._check(doc, errors)
+        return errors
+
+    def is_valid(self, doc):
+        return not self.errors(doc)
+
+
+_VALIDATORS = {}
+
+
+def validator_for(collection):
+    """Cached ``Validator`` for a collection, or None if it has no schema."""
+    if collection not in _VALIDATORS:
+        schema = SCHEMAS.get(collection)
+        _VALIDATORS[collection] = Validator(schema) if schema else None
+    return _VALIDATORS[collection]
+
+
+def split(docs, validator, rejects):
+    """Yield valid documents; append ``(doc, errors)`` for invalid ones to ``rejects``."""
+    for doc in docs:
+        errors = validator.errors(doc)
+        if errors:
+            rejects.append((doc, errors))
+        else:
+            yield doc
+
+
+def insert_validated(db, collection, docs, batch_size=1000, rejects=None):
+    """Insert ``docs`` in full unordered batches, skipping invalid ones.
+
+    ``rejects`` (a list by default) receives ``(doc, errors)`` for documents
+    that failed in process or were refused by the server.  Returns
+    ``{"inserted", "rejected", "rejects"}``.
+    """
+    rejects = [] if rejects is None else rejects
+    before = len(rejects)
+    validator = validator_for(collection)
+    stream = split(docs, validator, rejects) if validator else iter(docs)
+    inserted, batch = 0, []
+
+    def flush():
+        nonlocal inserted
+        try:
+            inserted += len(db[collection].insert_many(batch, ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            failed = {err["index"]: err for err in e.details.get("writeErrors", [])}
+            inserted += e.details.get("nInserted", 0)
+            rejects.extend((batch[i], [f"server: {err.get('errmsg')}"]) for i, err in sorted(failed.items()))
+        batch.clear()
+
+    for doc in stream:
+        batch.append(doc)
+        if len(batch) == batch_size:
+            flush()
+    if batch:
+        flush()
+    return {"inserted": inserted, "rejected": len(rejects) - before, "rejects": rejects}
+
+
+def benchmark(n=100_000, collections=None, seed=42):
+    """Time validation of ``n`` generated documents per collection.
+
+    Returns ``{collection: {"documents", "seconds", "msPer100k", "invalid"}}``.
+    """
+    from eduhub import datagen
+
+    plan = datagen.ScalePlan.from_scale(1, seed)
+    results = {}
+    for name in collections or [c for c in datagen.COLLECTIONS if c in SCHEMAS]:
+        docs = list(datagen.iter_documents(plan, name, 0, n))
+        while len(docs) < n:  # small plans: repeat to reach n
+            docs.extend(docs[:n - len(docs)])
+        validator = Validator(SCHEMAS[name])
+        start = time.perf_counter()
+        invalid = sum(1 for d in docs if validator.errors(d))
+        seconds = time.perf_counter() - start
+        results[name] = {"documents": n, "seconds": seconds, "msPer100k": seconds * 1000 * 100_000 / n,
+                         "invalid": invalid}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark in-process schema validation.")
+    parser.add_argument("--bench", type=int, default=100_000, metavar="N", help="documents per collection")
+    parser.add_argument("--collections", nargs="*")
+    args = parser.parse_args(argv)
+    for name, r in benchmark(args.bench, args.collections).items():
+        print(f"{name:<12} {r['documents']:>8} docs  {r['msPer100k']:8.1f} ms/100k  {r['invalid']} invalid")
+
+
+if __name__ == "__main__":
+    main()
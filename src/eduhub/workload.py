@@ -0,0 +1,207 @@
+"""The EduHub query workload as named, reusable definitions.
+
+These are the reads from Parts 3-5 of ``eduhub_queries.py`` (find filters and
+aggregation pipelines) plus the Part 5 index set, written down once so that the
+benchmark, the index advisor and the other tools all exercise exactly the same
+queries the walkthrough runs.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from pymongo.errors import OperationFailure
+
+
+@dataclass
+class NamedQuery:
+    """A find or an aggregation against one collection.
+
+    ``filter`` and ``pipeline`` may be callables for queries that depend on the
+    current time (e.g. "users joined in the last 6 months").
+    """
+
+    name: str
+    collection: str
+    filter: object = None
+    projection: dict = None
+    sort: list = None
+    limit: int = 0
+    pipeline: object = None
+
+    @property
+    def kind(self):
+        return "aggregate" if self.pipeline is not None else "find"
+
+    def resolved_filter(self):
+        f = self.filter() if callable(self.filter) else self.filter
+        return f or {}
+
+    def resolved_pipeline(self):
+        return self.pipeline() if callable(self.pipeline) else self.pipeline
+
+    def cursor(self, db, **kwargs):
+        """Open a cursor for this query; extra kwargs go to find/aggregate.
+
+        The query name is sent as the command ``comment`` so that it shows up
+        in the profiler, ``currentOp`` and ``eduhub.monitoring``.
+        """
+        kwargs.setdefault("comment", self.name)
+        coll = db[self.collection]
+        if self.kind == "aggregate":
+            return coll.aggregate(self.resolved_pipeline(), **kwargs)
+        cursor = coll.find(self.resolved_filter(), self.projection, **kwargs)
+        if self.sort:
+            cursor = cursor.sort(self.sort)
+        if self.limit:
+            cursor = cursor.limit(self.limit)
+        return cursor
+
+    def run(self, db, **kwargs):
+        return list(self.cursor(db, **kwargs))
+
+    def command(self):
+        """The raw find/aggregate command document, e.g. for ``explain``."""
+        if self.kind == "aggregate":
+            return {"aggregate": self.collection, "pipeline": self.resolved_pipeline(), "cursor": {}}
+        cmd = {"find": self.collection, "filter": self.resolved_filter()}
+        if self.projection:
+            cmd["projection"] = self.projection
+        if self.sort:
+            cmd["sort"] = dict(self.sort)
+        if self.limit:
+            cmd["limit"] = self.limit
+        return cmd
+
+
+@dataclass
+class IndexSpec:
+    """An index on one collection, in ``create_index`` terms."""
+
+    collection: str
+    keys: list
+    options: dict = field(default_factory=dict)
+
+    @property
+    def name(self):
+        return self.options.get("name") or "_".join(f"{k}_{v}" for k, v in self.keys)
+
+    def create(self, db):
+        return db[self.collection].create_index(self.keys, **self.options)
+
+    def drop(self, db):
+        db[self.collection].drop_index(self.name)
+
+
+# --- Part 3 & 4 reads ---
+
+QUERIES = [
+    # Task 3.2
+    NamedQuery("active_students", "users",
+               filter={"role": "student", "isActive": True},
+               projection={"_id": 0, "userId": 1, "email": 1}),
+    NamedQuery("course_with_instructor", "courses", pipeline=[
+        {"$match": {"isPublished": True}},
+        {"$lookup": {"from": "users", "localField": "instructorId", "foreignField": "userId", "as": "instructor"}},
+        {"$unwind": "$instructor"},
+        {"$project": {"title": 1, "instructor.firstName": 1, "price": 1}},
+    ]),
+    NamedQuery("programming_courses", "courses",
+               filter={"category": "Programming"}, projection={"_id": 0}),
+    NamedQuery("enrolled_in_c001", "enrollments", pipeline=[
+        {"$match": {"courseId": "c001"}},
+        {"$lookup": {"from": "users", "localField": "studentId", "foreignField": "userId", "as": "student"}},
+        {"$unwind": "$student"},
+        {"$project": {"student.firstName": 1, "progress": 1, "_id": 0}},
+    ]),
+    NamedQuery("search_results", "courses",
+               filter={"title": {"$regex": "Python", "$options": "i"}}, projection={"_id": 0}),
+    # Task 4.1
+    NamedQuery("mid_price", "courses",
+               filter={"price": {"$gte": 50, "$lte": 200}}, projection={"_id": 0, "title": 1, "price": 1}),
+    NamedQuery("recent_users", "users",
+               filter=lambda: {"dateJoined": {"$gte": datetime.now() - timedelta(days=180)}},
+               projection={"_id": 0, "email": 1}),
+    NamedQuery("tagged", "courses",
+               filter={"tags": {"$in": ["python"]}}, projection={"_id": 0, "title": 1}),
+    NamedQuery("due_soon", "assignments",
+               filter=lambda: {"dueDate": {"$lte": datetime.now() + timedelta(days=7), "$gte": datetime.now()}},
+               projection={"_id": 0}),
+    # Task 4.2
+    NamedQuery("enroll_stats", "enrollments", pipeline=[
+        {"$group": {"_id": "$courseId", "totalEnrollments": {"$sum": 1}}},
+        {"$lookup": {"from": "courses", "localField": "_id", "foreignField": "courseId", "as": "course"}},
+        {"$unwind": "$course"},
+        {"$group": {"_id": "$course.category", "avgEnrollments": {"$avg": "$totalEnrollments"}}},
+    ]),
+    NamedQuery("student_grades", "submissions", pipeline=[
+        {"$group": {"_id": "$studentId", "avgGrade": {"$avg": "$grade"}}},
+        {"$lookup": {"from": "users", "localField": "_id", "foreignField": "userId", "as": "student"}},
+        {"$unwind": "$student"},
+        {"$sort": {"avgGrade": -1}},
+        {"$limit": 5},
+    ]),
+    NamedQuery("completion_rates", "enrollments", pipeline=[
+        {"$group": {"_id": "$courseId", "total": {"$sum": 1},
+                    "completed": {"$sum": {"$cond": [{"$eq": ["$isCompleted", True]}, 1, 0]}}}},
+        {"$project": {"completionRate": {"$multiply": [{"$divide": ["$completed", "$total"]}, 100]}}},
+    ]),
+    NamedQuery("instructor_stats", "courses", pipeline=[
+        {"$lookup": {"from": "enrollments", "localField": "courseId", "foreignField": "courseId", "as": "enrolls"}},
+        {"$unwind": "$enrolls"},
+        {"$group": {"_id": "$instructorId", "totalStudents": {"$addToSet": "$enrolls.studentId"},
+                    "revenue": {"$sum": "$price"}}},
+        {"$project": {"totalStudents": {"$size": "$totalStudents"}, "totalRevenue": "$revenue"}},
+    ]),
+    NamedQuery("monthly_trends", "enrollments", pipeline=[
+        {"$group": {"_id": {"$dateToString": {"format": "%Y-%m", "date": "$enrollDate"}}, "count": {"$sum": 1}}},
+        {"$sort": {"_id": 1}},
+    ]),
+    NamedQuery("popular_cats", "enrollments", pipeline=[
+        {"$lookup": {"from": "courses", "localField": "courseId", "foreignField": "courseId", "as": "course"}},
+        {"$unwind": "$course"},
+        {"$group": {"_id": "$course.category", "enrollCount": {"$sum": 1}}},
+        {"$sort": {"enrollCount": -1}},
+        {"$limit": 3},
+    ]),
+    # Part 5 comparisons
+    NamedQuery("title_regex", "courses", filter={"title": {"$regex": "Python"}}),
+    NamedQuery("title_text", "courses", filter={"$text": {"$search": "Python"}}),
+    NamedQuery("enrollment_by_student_course", "enrollments",
+               filter={"studentId": "stu001", "courseId": "c001"}),
+]
+
+QUERIES_BY_NAME = {q.name: q for q in QUERIES}
+
+# --- Part 5 indexes ---
+
+INDEXES = [
+    IndexSpec("users", [("email", 1)], {"unique": True}),
+    IndexSpec("users", [("userId", 1)]),
+    IndexSpec("courses", [("title", "text"), ("category", 1)]),
+    IndexSpec("courses", [("tags", 1)]),
+    IndexSpec("assignments", [("dueDate", 1)]),
+    IndexSpec("enrollments", [("studentId", 1), ("courseId", 1)]),
+]
+
+
+def get_queries(names=None):
+    """Look up registered queries by name (all of them when ``names`` is empty)."""
+    if not names:
+        return list(QUERIES)
+    return [QUERIES_BY_NAME[n] for n in names]
+
+
+def create_indexes(db, specs=None):
+    """Create ``specs`` (the Part 5 index set by default).
+
+    Returns ``{index name: error}`` for the indexes that could not be built,
+    e.g. the unique email index while duplicate users remain (see
+    ``eduhub.dedupe``); the others are created regardless.
+    """
+    failed = {}
+    for spec in (INDEXES if specs is None else specs):
+        try:
+            spec.create(db)
+        except OperationFailure as e:  # DuplicateKeyError included
+            failed[spec.name] = str(e)
+    return failed
@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from eduhub import config, connection  # noqa: E402
+
+TEST_DB = os.environ.get("EDUHUB_TEST_DB_NAME", "eduhub_test")
+
+
+@pytest.fixture(scope="session")
+def mongo_client():
+    """A client for ``EDUHUB_MONGO_URI``; tests using it are skipped without a server."""
+    client = MongoClient(config.MONGO_URI, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError as exc:
+        client.close()
+        pytest.skip(f"no MongoDB server at {config.MONGO_URI}: {exc}")
+    yield client
+    client.close()
+    connection.close()
+
+
+@pytest.fixture
+def empty_db(mongo_client):
+    """A scratch database, dropped before and after the test."""
+    mongo_client.drop_database(TEST_DB)
+    yield mongo_client[TEST_DB]
+    mongo_client.drop_database(TEST_DB)
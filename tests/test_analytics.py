@@ -0,0 +1,31 @@
+import pytest
+
+from eduhub import analytics, datagen
+
+
+@pytest.fixture
+def seeded_db(empty_db):
+    datagen.load(scale=0.05, db_name=empty_db.name, workers=0, seed=7)
+    analytics.ensure_indexes(empty_db)
+    return empty_db
+
+
+def test_dashboards_match_workload_pipelines(seeded_db):
+    report = analytics.check_equivalence(seeded_db)
+
+    assert set(report) == set(analytics.COMPARE)
+    assert {name for name, r in report.items() if not r["equal"]} == set()
+    assert all(r["expected"] > 0 for r in report.values())
+
+
+def test_top_students_widens_past_students_without_users(seeded_db):
+    top = [row["_id"] for row in analytics.top_students(seeded_db, k=8)]
+    # The best graded students lose their user documents; the Part 4 pipeline
+    # drops them at its $unwind, so the optimized one has to look further down.
+    seeded_db.users.delete_many({"userId": {"$in": top[:3]}})
+
+    expected = analytics._original(seeded_db, "student_grades")
+    actual = analytics.top_students(seeded_db, k=5)
+
+    assert len(actual) == 5
+    assert analytics.COMPARE["student_grades"](expected, actual)